@@ -21,7 +21,9 @@ from tensorflow.keras.layers import Input, Dense, Lambda, Add
 from tensorflow.keras.optimizers import Adam
 from keras import backend as K
 
-env = gym.make("RollAndRake-v0")
+# uint8 observations, the replay memory keeps one byte per value, split into
+# the features and the legal actions mask by the env
+env = gym.make("RollAndRake-v0", observation_format="uint8", dict_observation=True)
 
 class StepExperience(NamedTuple):
     """
@@ -121,7 +123,7 @@ class DuelingPerDoubleDQNModel(object):
     target network weights are updated at each time step towards the online network weigths 
     based on the tau parameter
     """
-    def __init__(self, observation_space, action_space, memory_size=5_000, batch_size=32, alpha=0.001, gamma=0.5, tau=0.1, learning_start=500):
+    def __init__(self, features_space, action_space, features_scales, memory_size=5_000, batch_size=32, alpha=0.001, gamma=0.5, tau=0.1, learning_start=500):
         self.memory = Memory(memory_size)
         self.batch_size = batch_size
         self.gamma = gamma
@@ -130,7 +132,8 @@ class DuelingPerDoubleDQNModel(object):
         # collect this many experiences before learning
         self.learning_start = learning_start
 
-        self.observation_space = observation_space
+        self.features_space = features_space
+        self.features_scales = np.asarray(features_scales, dtype=np.float32)
         self.action_space = action_space
 
         self.online_network = ValueModel(action_space=action_space)
@@ -144,10 +147,9 @@ class DuelingPerDoubleDQNModel(object):
             self.target_network.load_weights("online_network_model_v0_zero_five.h5")
 
     def get_obs_legal_actions(self, observation):
-        obs = tf.slice(observation, [0], [self.observation_space - self.action_space])
-        obs = tf.reshape(obs, shape=(1, self.observation_space - self.action_space))
-        legal_actions = tf.slice(observation, [self.observation_space - self.action_space], [self.action_space])
-        legal_actions = tf.reshape(legal_actions, shape=(1, self.action_space))
+        # uint8 features decoded as in ObservationCodec, batches of one observation
+        obs = observation["features"][np.newaxis] / self.features_scales
+        legal_actions = observation["action_mask"][np.newaxis].astype(np.float32)
         return obs, legal_actions
 
     def get_greedy_action_for(self, *, state):
@@ -172,11 +174,11 @@ class DuelingPerDoubleDQNModel(object):
         batches = self.memory.sample(self.batch_size)
 
         # vectorized approach for speed performance concernes
-        obs_batch = np.zeros((self.batch_size, self.observation_space - self.action_space))
+        obs_batch = np.zeros((self.batch_size, self.features_space))
         legal_actions_batch = np.zeros((self.batch_size, self.action_space))
         action_batch = []
         reward_batch = []
-        new_obs_batch = np.zeros((self.batch_size, self.observation_space - self.action_space))
+        new_obs_batch = np.zeros((self.batch_size, self.features_space))
         new_legal_actions_batch = np.zeros((self.batch_size, self.action_space))
         done_batch = []
 
@@ -240,15 +242,15 @@ class DuelingPerDoubleDQNAgent(object):
 
     def __init__(self, *, env):
         self.env = env
-        self.observation_space = env.observation_space.shape[0]
+        self.features_space = env.observation_space["features"].shape[0]
         self.action_space = env.action_space.n
-        self.model = DuelingPerDoubleDQNModel(observation_space=env.observation_space.shape[0], action_space=env.action_space.n)
+        self.model = DuelingPerDoubleDQNModel(features_space=self.features_space, action_space=env.action_space.n, features_scales=env.unwrapped.observation_codec.scales[:self.features_space])
 
     def epsilon_greedy_policy(self, *, state, epsilon):
         """
         Creates an epsilon-greedy policy based on a given Q-function and epsilon
         """
-        legal_actions = state[-self.action_space:]
+        legal_actions = state["action_mask"]
         greedy_action = self.model.get_greedy_action_for(state=state)
         probs = legal_actions * (epsilon / sum(legal_actions))
         probs[greedy_action] += 1 - epsilon
@@ -259,8 +261,6 @@ class DuelingPerDoubleDQNAgent(object):
         agent training phase
         """
         #print("\nTRAINING (with DuelingPerDoubleDQN learning method)")
-        observations_count = self.env.observation_space.shape[0]
-        actions_count = self.env.action_space.n
 
         episode = 0
         rewards = []
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+import os.path
+import statistics
+
+from roll_and_rake.envs.model_v2.expectimax_planner import ExpectimaxPlanner
+from roll_and_rake.envs.model_v2.roll_and_rake_state import RollAndRakeState
+
+# values computed by previous runs, the table keeps growing with the states met
+values_path = "expectimax_values_v2.npz"
+# green track looked ahead at every move, exact only once the green track is below it
+planner = ExpectimaxPlanner(horizon=6)
+if os.path.exists(values_path):
+    planner.load(values_path)
+
+game_state = RollAndRakeState()
+scores = []
+
+for episode in range(1, 100 + 1):
+    game_state.reset()
+
+    while not game_state.is_done:
+        action = planner.get_best_action(game_state)
+        game_state.step(with_env_action_index=action)
+
+    scores.append(game_state.get_current_score())
+    print(f"episode: {episode}, score: {game_state.get_current_score()}")
+
+planner.save(values_path)
+print(f"mean score: {statistics.mean(scores)}")
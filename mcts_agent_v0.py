@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+
+import math
+import random
+import time
+import statistics
+import multiprocessing
+
+from roll_and_rake.envs import RollAndRakeEnvV0
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+
+class DecisionNode(object):
+    """
+    game state reached by the search where the agent chooses an action
+    """
+    __slots__ = ("visits", "untried_actions", "children")
+
+    def __init__(self, legal_actions):
+        self.visits = 0
+        self.untried_actions = legal_actions
+        random.shuffle(self.untried_actions)
+        self.children = {}
+
+class ChanceNode(object):
+    """
+    action taken from a decision node, the dice rolled after it
+    (reroll or new turn) lead to different decision nodes
+    """
+    __slots__ = ("visits", "value_sum", "outcomes")
+
+    def __init__(self):
+        self.visits = 0
+        self.value_sum = 0
+        self.outcomes = {}
+
+class MCTSSearch(object):
+    """
+    Monte Carlo Tree Search over a RollAndRakeState with chance nodes:
+    the outcomes of an action are told apart by the zobrist hash of the
+    game they lead to, rollouts play random actions for a few turns
+    """
+
+    def __init__(self, *, exploration_weight=5.0, rollout_turns=2):
+        self.exploration_weight = exploration_weight
+        self.rollout_turns = rollout_turns
+
+    def search(self, *, game_state, iterations=None, time_budget=None):
+        """
+        runs the search from game_state (left untouched) until the iterations or
+        the time budget (in seconds) run out, returns the visits and value sums of the root actions
+        """
+        if iterations is None and time_budget is None:
+            raise Exception("an iterations or time budget is needed")
+
+        working_state = game_state.clone()
+        root_snapshot = working_state.snapshot()
+        root = DecisionNode(working_state.get_legal_env_actions_indices())
+
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        iteration = 0
+        while (iterations is None or iteration < iterations) and (deadline is None or time.perf_counter() < deadline):
+            working_state.restore(root_snapshot)
+            self._run_iteration(root, working_state)
+            iteration += 1
+
+        return {action: (chance_node.visits, chance_node.value_sum) for action, chance_node in root.children.items()}
+
+    def _run_iteration(self, root, working_state):
+        path = []
+        rewards = []
+        node = root
+
+        while True:
+            node.visits += 1
+            if node.untried_actions:
+                action = node.untried_actions.pop()
+                chance_node = ChanceNode()
+                node.children[action] = chance_node
+            else:
+                action, chance_node = self._select_child(node)
+
+            path.append(chance_node)
+            rewards.append(working_state.step_unchecked(with_env_action_index=action))
+
+            if working_state.is_done:
+                break
+
+            outcome = working_state.get_zobrist_hash()
+            if outcome not in chance_node.outcomes:
+                chance_node.outcomes[outcome] = DecisionNode(working_state.get_legal_env_actions_indices())
+                rewards[-1] += self._rollout(working_state)
+                break
+            node = chance_node.outcomes[outcome]
+
+        # every chance node gets the score made from its action onwards
+        value = 0
+        for chance_node, reward in zip(reversed(path), reversed(rewards)):
+            value += reward
+            chance_node.visits += 1
+            chance_node.value_sum += value
+
+    def _select_child(self, node):
+        log_visits = math.log(node.visits)
+        best_ucb = -math.inf
+        for action, chance_node in node.children.items():
+            ucb = chance_node.value_sum / chance_node.visits + self.exploration_weight * math.sqrt(log_visits / chance_node.visits)
+            if ucb > best_ucb:
+                best_ucb = ucb
+                best_action, best_chance_node = action, chance_node
+        return (best_action, best_chance_node)
+
+    def _rollout(self, working_state):
+        # random actions, passing only when nothing else is legal
+        rollout_reward = 0
+        last_turn = working_state.current_turn + self.rollout_turns
+        while not working_state.is_done and working_state.current_turn < last_turn:
+            legal_actions = working_state.get_legal_env_actions_indices()
+            if len(legal_actions) >= 2:
+                legal_actions.pop()
+            rollout_reward += working_state.step_unchecked(with_env_action_index=random.choice(legal_actions))
+        return rollout_reward
+
+_worker_search = None
+_worker_state = None
+
+def _init_worker(exploration_weight, rollout_turns):
+    global _worker_search, _worker_state
+    _worker_search = MCTSSearch(exploration_weight=exploration_weight, rollout_turns=rollout_turns)
+    _worker_state = RollAndRakeState()
+
+def _run_worker_search(arguments):
+    snapshot, iterations, time_budget, seed = arguments
+    random.seed(seed)
+    _worker_state.dice_source.seed(seed)
+    _worker_state.restore(snapshot)
+    return _worker_search.search(game_state=_worker_state, iterations=iterations, time_budget=time_budget)
+
+class MCTSAgent(object):
+    """
+    chooses the v0 actions with a Monte Carlo Tree Search per move,
+    with workers > 1 independent searches run in worker processes
+    and their root statistics are merged (root parallelism)
+    """
+
+    def __init__(self, *, iterations=None, time_budget=None, exploration_weight=5.0, rollout_turns=2, workers=1):
+        if iterations is None and time_budget is None:
+            raise Exception("an iterations or time budget is needed")
+
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.workers = workers
+        self.mcts_search = MCTSSearch(exploration_weight=exploration_weight, rollout_turns=rollout_turns)
+
+        self.pool = None
+        if workers > 1:
+            self.pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(exploration_weight, rollout_turns))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_action_for(self, *, game_state):
+        legal_actions = game_state.get_legal_env_actions_indices()
+        if len(legal_actions) == 1:
+            return legal_actions[0]
+
+        if self.pool is None:
+            roots_statistics = [self.mcts_search.search(game_state=game_state, iterations=self.iterations, time_budget=self.time_budget)]
+        else:
+            # every worker gets its share of the iterations and the whole time budget
+            iterations = None if self.iterations is None else max(1, self.iterations // self.workers)
+            snapshot = game_state.snapshot()
+            seeds = [random.randrange(2**32) for _ in range(self.workers)]
+            roots_statistics = self.pool.map(_run_worker_search, [(snapshot, iterations, self.time_budget, seed) for seed in seeds])
+
+        actions_visits = {}
+        for root_statistics in roots_statistics:
+            for action, (visits, _) in root_statistics.items():
+                actions_visits[action] = actions_visits.get(action, 0) + visits
+
+        return max(actions_visits, key=actions_visits.get)
+
+if __name__ == "__main__":
+    env = RollAndRakeEnvV0()
+
+    rewards = []
+
+    with MCTSAgent(time_budget=0.5, workers=4) as mcts_agent:
+        for episode in range(1, 10 + 1):
+            env.reset()
+
+            done = False
+            episode_reward = 0
+
+            while not done:
+                action = mcts_agent.get_action_for(game_state=env.unwrapped.game_state)
+                _, reward, done, _ = env.step(action)
+                episode_reward += reward
+
+            rewards.append(episode_reward)
+            print(f"episode: {episode}, score: {episode_reward}")
+
+    print(f"mean score: {statistics.mean(rewards)}")
@@ -1,3 +1,6 @@
 from .roll_and_rake_v0 import RollAndRakeEnvV0
 from .roll_and_rake_v1 import RollAndRakeEnvV1
-from .roll_and_rake_v2 import RollAndRakeEnvV2
\ No newline at end of file
+from .roll_and_rake_v2 import RollAndRakeEnvV2
+from .roll_and_rake_vector_v0 import RollAndRakeVectorEnvV0
+from .roll_and_rake_vector_v1 import RollAndRakeVectorEnvV1
+from .roll_and_rake_vector_v2 import RollAndRakeVectorEnvV2
\ No newline at end of file
@@ -0,0 +1,97 @@
+from .dice_subsets import DICE_COLOR_NAMES, DICE_NUMBER
+
+# die values go from 1 to 6, a taken die has value 0
+DIE_VALUES_NUMBER = 7
+
+# die views of every die factory, shared by all the arrays
+_die_views = {}
+
+def _get_die_views(die_factory):
+    if die_factory not in _die_views:
+        _die_views[die_factory] = tuple(tuple(die_factory(color_name, value) for value in range(DIE_VALUES_NUMBER)) for color_name in DICE_COLOR_NAMES)
+    return _die_views[die_factory]
+
+class DiceArray(object):
+    """
+    dice of a game as a fixed uint8 array of values (a bytearray, 0 for a taken die) next to
+    the constant colors of DICE_COLOR_NAMES and a bitmask of the taken dice (bit i for die i).
+    it reads like a list of dice: indexing returns Die views, prebuilt once per (position, value)
+    with die_factory, so no die is created while playing. version grows on every change of the
+    dice, caches built from them compare it to tell whether they are still current
+    """
+    __slots__ = ("values", "taken_mask", "die_views", "version")
+
+    def __init__(self, die_factory, values=None):
+        self.die_views = _get_die_views(die_factory)
+        self.values = bytearray(DICE_NUMBER)
+        self.taken_mask = 0
+        self.version = 0
+        if values is not None:
+            self.set_values(values)
+
+    def set_values(self, values):
+        self.values[:] = bytes(values)
+        self.taken_mask = sum(1 << index for index, value in enumerate(self.values) if value == 0)
+        self.version += 1
+
+    def set_dice(self, dice):
+        self.set_values([die.value for die in dice])
+
+    def roll(self, indices, values):
+        # new values (never 0) of the dice at indices
+        for index, value in zip(indices, values):
+            self.values[index] = value
+        self.taken_mask &= ~sum(1 << index for index in indices)
+        self.version += 1
+
+    def take(self, dice):
+        # every die equal to one of dice (same color and value) is taken with it
+        die_views = self.die_views
+        for index, value in enumerate(self.values):
+            if value != 0 and die_views[index][value] in dice:
+                self.values[index] = 0
+                self.taken_mask |= 1 << index
+        self.version += 1
+
+    def get_key(self):
+        # hashable copy of the values, to tell whether the dice changed
+        return bytes(self.values)
+
+    def copy(self):
+        dice_array = DiceArray.__new__(DiceArray)
+        dice_array.die_views = self.die_views
+        dice_array.values = bytearray(self.values)
+        dice_array.taken_mask = self.taken_mask
+        dice_array.version = self.version
+        return dice_array
+
+    def __len__(self):
+        return DICE_NUMBER
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[die_index] for die_index in range(DICE_NUMBER)[index]]
+        return self.die_views[index][self.values[index]]
+
+    def __setitem__(self, index, die):
+        index = range(DICE_NUMBER)[index]
+        self.values[index] = die.value
+        if die.value == 0:
+            self.taken_mask |= 1 << index
+        else:
+            self.taken_mask &= ~(1 << index)
+        self.version += 1
+
+    def __iter__(self):
+        die_views = self.die_views
+        for index, value in enumerate(self.values):
+            yield die_views[index][value]
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,61 @@
+import collections
+from itertools import combinations_with_replacement, product
+
+FACES_NUMBER = 6
+COLOR_NAMES = ("Orange", "Brown", "Green")
+# bits reserved in the dice code for the count of each (color, value) pair
+COUNT_BITS = 3
+
+# every die adds the weight of its (color, value) pair to the dice code,
+# so equal dice multisets share the same code whatever the dice order
+DIE_CODES = {
+    (color_name, value): 1 << (COUNT_BITS * (color_index * FACES_NUMBER + value - 1))
+    for color_index, color_name in enumerate(COLOR_NAMES)
+    for value in range(1, FACES_NUMBER + 1)
+}
+
+def get_dice_code(dice):
+    # canonical code of the dice (color, value) multiset, None for dice out of the faces range
+    dice_code = 0
+    for die in dice:
+        die_code = DIE_CODES.get((die.color.name, die.value))
+        if die_code is None:
+            return None
+        dice_code += die_code
+    return dice_code
+
+def _get_dice_pairs_with(colors):
+    colors_counter = collections.Counter(colors)
+    colors_pairs = [
+        [tuple((color_name, value) for value in values) for values in combinations_with_replacement(range(1, FACES_NUMBER + 1), count)]
+        for color_name, count in sorted(colors_counter.items())
+    ]
+    for pairs in product(*colors_pairs):
+        yield [pair for color_pairs in pairs for pair in color_pairs]
+
+_compiled_dice_conditions = {}
+
+def compile_dice_condition(condition, *, colors, die_factory):
+    """
+    returns the frozenset of the codes of every dice multiset
+    with the given colors satisfying the condition
+    """
+    key = (condition, tuple(sorted(colors)))
+    if key not in _compiled_dice_conditions:
+        dice_codes = set()
+        for dice_pairs in _get_dice_pairs_with(colors):
+            dice = [die_factory(color_name, value) for color_name, value in dice_pairs]
+            if condition(dice):
+                dice_codes.add(sum(DIE_CODES[dice_pair] for dice_pair in dice_pairs))
+        _compiled_dice_conditions[key] = frozenset(dice_codes)
+    return _compiled_dice_conditions[key]
+
+def compile_dice_requirements(dice_requirements, *, die_factory, tick_condition=None):
+    # codes of the dice satisfying at least one requirement (and the tick condition, if any)
+    dice_codes = set()
+    for dice_requirement in dice_requirements:
+        requirement_codes = compile_dice_condition(dice_requirement.condition, colors=dice_requirement.colors, die_factory=die_factory)
+        if tick_condition is not None:
+            requirement_codes = requirement_codes & compile_dice_condition(tick_condition, colors=dice_requirement.colors, die_factory=die_factory)
+        dice_codes |= requirement_codes
+    return frozenset(dice_codes)
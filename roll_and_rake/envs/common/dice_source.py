@@ -0,0 +1,49 @@
+import numpy as np
+
+# dice values drawn from the generator at once
+DICE_BLOCK_SIZE = 1024
+
+class DiceSource(object):
+    """
+    dice values of a game drawn from its own numpy Generator: a block of values is
+    drawn with a single call and then handed out die by die. sources built from the
+    same seed roll the same dice, spawn derives independent substreams from a source
+    (e.g. one per worker process or per searched clone)
+    """
+
+    def __init__(self, seed=None, *, block_size=DICE_BLOCK_SIZE):
+        self.block_size = block_size
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        # seed is an int, a numpy SeedSequence or None for fresh entropy
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.generator = np.random.default_rng(self.seed_sequence)
+        self._block = ()
+        self._position = 0
+
+    def roll(self, dice_number):
+        # values (1-6) of dice_number dice
+        if self._position + dice_number > len(self._block):
+            self._block = self._block[self._position:] + tuple(self.generator.integers(1, 7, size=self.block_size).tolist())
+            self._position = 0
+
+        values = self._block[self._position:self._position + dice_number]
+        self._position += dice_number
+        return values
+
+    def spawn(self, sources_number):
+        return [DiceSource(seed_sequence, block_size=self.block_size) for seed_sequence in self.seed_sequence.spawn(sources_number)]
+
+    def get_state(self):
+        return (self.generator.bit_generator.state, self._block, self._position)
+
+    def set_state(self, state):
+        bit_generator_state, self._block, self._position = state
+        self.generator.bit_generator.state = bit_generator_state
+
+    def copy(self):
+        # same stream at the same position, both sources roll the same dice from now on
+        dice_source = DiceSource(self.seed_sequence, block_size=self.block_size)
+        dice_source.set_state(self.get_state())
+        return dice_source
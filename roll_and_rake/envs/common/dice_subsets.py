@@ -0,0 +1,35 @@
+import numpy as np
+from operator import itemgetter
+
+DICE_NUMBER = 6
+# colors of the dice by position, as rolled by generate_new_dice in every model
+DICE_COLOR_NAMES = ("Orange", "Orange", "Orange", "Brown", "Brown", "Green")
+# every subset of dice is identified by its action index (bit i set when die i is chosen)
+SUBSETS_NUMBER = 2**DICE_NUMBER
+
+def _get_subset_indices(action_index):
+    return tuple(i for i in range(DICE_NUMBER) if action_index & (1 << i))
+
+def _get_subset_getter(dice_indices):
+    if len(dice_indices) > 1:
+        return itemgetter(*dice_indices)
+    if len(dice_indices) == 1:
+        dice_index = dice_indices[0]
+        return lambda dice: (dice[dice_index],)
+    return lambda dice: ()
+
+# dice indices chosen by each action index
+SUBSET_INDICES = tuple(_get_subset_indices(action_index) for action_index in range(SUBSETS_NUMBER))
+
+SUBSET_INDICES_ARRAYS = tuple(np.array(dice_indices, dtype=np.int64) for dice_indices in SUBSET_INDICES)
+for dice_indices_array in SUBSET_INDICES_ARRAYS:
+    dice_indices_array.setflags(write=False)
+
+SUBSET_POPCOUNTS = np.array([len(dice_indices) for dice_indices in SUBSET_INDICES], dtype=np.uint8)
+SUBSET_POPCOUNTS.setflags(write=False)
+
+# sorted color names of the chosen dice, compared against the colors of the dice requirements
+SUBSET_COLOR_SIGNATURES = tuple(tuple(sorted(DICE_COLOR_NAMES[i] for i in dice_indices)) for dice_indices in SUBSET_INDICES)
+
+# returns the chosen dice of a roll as a tuple
+SUBSET_GETTERS = tuple(_get_subset_getter(dice_indices) for dice_indices in SUBSET_INDICES)
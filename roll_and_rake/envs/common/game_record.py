@@ -0,0 +1,241 @@
+import importlib
+import re
+import struct
+from typing import NamedTuple, Optional
+import numpy as np
+
+from .dice_source import DiceSource
+
+RECORD_MAGIC = b"RR"
+RECORD_VERSION = 1
+# magic, version, variant, 1 when the dice are given by a seed, 0 when they are stored
+RECORD_HEADER = struct.Struct("<2sBBB")
+RECORD_SEED = struct.Struct("<Q")
+RECORD_COUNT = struct.Struct("<I")
+
+class GameRecord(NamedTuple):
+    """
+    a game as the seed of its dice (or every die rolled, in order) and the env actions stepped,
+    the game states and observations are derived again by replaying it
+    """
+    variant: int
+    seed: Optional[int]
+    dice: Optional[tuple]
+    actions: bytes
+
+    def to_bytes(self):
+        """
+        header, seed (8 bytes) or dice stream (two dice per byte), then one byte per action
+        """
+        data = bytearray(RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, self.variant, self.seed is not None))
+        if self.seed is not None:
+            data += RECORD_SEED.pack(self.seed)
+        else:
+            data += RECORD_COUNT.pack(len(self.dice))
+            dice = list(self.dice) + [0] * (len(self.dice) % 2)
+            data += bytes(dice[index] | (dice[index + 1] << 4) for index in range(0, len(dice), 2))
+        data += RECORD_COUNT.pack(len(self.actions))
+        data += self.actions
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, variant, has_seed = RECORD_HEADER.unpack_from(data, 0)
+        if magic != RECORD_MAGIC or version != RECORD_VERSION:
+            raise Exception("not a game record")
+        offset = RECORD_HEADER.size
+
+        seed = None
+        dice = None
+        if has_seed:
+            seed, = RECORD_SEED.unpack_from(data, offset)
+            offset += RECORD_SEED.size
+        else:
+            dice_number, = RECORD_COUNT.unpack_from(data, offset)
+            offset += RECORD_COUNT.size
+            packed_dice = data[offset:offset + (dice_number + 1) // 2]
+            dice = tuple(value for byte in packed_dice for value in (byte & 0xF, byte >> 4))[:dice_number]
+            offset += len(packed_dice)
+
+        actions_number, = RECORD_COUNT.unpack_from(data, offset)
+        offset += RECORD_COUNT.size
+        return cls(variant=variant, seed=seed, dice=dice, actions=bytes(data[offset:offset + actions_number]))
+
+def write_records(path, records):
+    # every record is prefixed by its size
+    with open(path, "wb") as records_file:
+        for record in records:
+            data = record.to_bytes()
+            records_file.write(RECORD_COUNT.pack(len(data)))
+            records_file.write(data)
+
+def read_records(path):
+    with open(path, "rb") as records_file:
+        data = records_file.read()
+
+    offset = 0
+    while offset < len(data):
+        size, = RECORD_COUNT.unpack_from(data, offset)
+        offset += RECORD_COUNT.size
+        yield GameRecord.from_bytes(data[offset:offset + size])
+        offset += size
+
+class RecordingDiceSource(object):
+    """
+    dice source keeping every die rolled by the wrapped one,
+    reseeding starts a new game so the dice kept are dropped
+    """
+
+    def __init__(self, dice_source):
+        self.dice_source = dice_source
+        self.values = []
+
+    def seed(self, seed=None):
+        self.dice_source.seed(seed)
+        self.values = []
+
+    def roll(self, dice_number):
+        values = self.dice_source.roll(dice_number)
+        self.values.extend(values)
+        return values
+
+    def spawn(self, sources_number):
+        return self.dice_source.spawn(sources_number)
+
+    def copy(self):
+        return self.dice_source.copy()
+
+    def get_state(self):
+        return self.dice_source.get_state()
+
+    def set_state(self, state):
+        self.dice_source.set_state(state)
+
+class ReplayDiceSource(object):
+    """
+    dice source rolling the dice stored in a record, reseeding goes back to the first die
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self.position = 0
+
+    def seed(self, seed=None):
+        self.position = 0
+
+    def roll(self, dice_number):
+        if self.position + dice_number > len(self.values):
+            raise Exception("the recorded dice are over")
+        values = self.values[self.position:self.position + dice_number]
+        self.position += dice_number
+        return values
+
+    def spawn(self, sources_number):
+        # the record holds no dice after the ones rolled, clones roll fresh ones
+        return DiceSource().spawn(sources_number)
+
+    def copy(self):
+        dice_source = ReplayDiceSource(self.values)
+        dice_source.position = self.position
+        return dice_source
+
+    def get_state(self):
+        return self.position
+
+    def set_state(self, state):
+        self.position = state
+
+def get_variant(game_state):
+    return int(re.search(r"model_v(\d+)", type(game_state).__module__).group(1))
+
+class GameRecorder(object):
+    """
+    records a new game on game_state: the state is reset (with seed when given) and
+    every action must be stepped through the recorder. without a seed the dice
+    are recorded one by one, with a seed the seed alone replays them
+    """
+
+    def __init__(self, game_state, *, seed=None):
+        self.game_state = game_state
+        self.seed = seed
+
+        dice_source = game_state.dice_source
+        if isinstance(dice_source, RecordingDiceSource):
+            dice_source = dice_source.dice_source
+        if seed is None:
+            dice_source = RecordingDiceSource(dice_source)
+        game_state.dice_source = dice_source
+
+        self.actions = bytearray()
+        game_state.reset(seed=seed)
+
+    def step(self, *, with_env_action_index):
+        # the action applied is recorded, canonical actions are mapped first
+        env_action_index = with_env_action_index
+        if getattr(self.game_state, "canonical_actions", False):
+            env_action_index = self.game_state.get_canonical_env_action_index(env_action_index=env_action_index)
+
+        self.actions.append(env_action_index)
+        return self.game_state.step(with_env_action_index=env_action_index)
+
+    def get_record(self):
+        dice = None
+        if self.seed is None:
+            dice = tuple(self.game_state.dice_source.values)
+        return GameRecord(variant=get_variant(self.game_state), seed=self.seed, dice=dice, actions=bytes(self.actions))
+
+def _get_state_class(variant):
+    return importlib.import_module(f"..model_v{variant}.roll_and_rake_state", __package__).RollAndRakeState
+
+def _reset_for(record, game_state):
+    if record.seed is not None:
+        game_state.dice_source = DiceSource()
+        game_state.reset(seed=record.seed)
+    else:
+        game_state.dice_source = ReplayDiceSource(record.dice)
+        game_state.reset()
+
+def replay_states(record, *, game_state=None):
+    """
+    yields the state of the game before each action and after the last one,
+    the same state object is yielded every time (clone it to keep it), game_state
+    is reused when given (it must be a state of the record variant)
+    """
+    if game_state is None:
+        game_state = _get_state_class(record.variant)()
+
+    _reset_for(record, game_state)
+    yield game_state
+    for env_action_index in record.actions:
+        game_state.step(with_env_action_index=env_action_index)
+        yield game_state
+
+def replay(record, *, moves_number=None):
+    """
+    state of the game after its first moves_number actions (all of them by default)
+    """
+    if moves_number is None:
+        moves_number = len(record.actions)
+
+    for move_index, game_state in enumerate(replay_states(record)):
+        if move_index == moves_number:
+            return game_state
+    raise Exception("the record has fewer moves")
+
+def get_records_observations(records):
+    """
+    observations of every state met by the records (of the same variant) stacked,
+    with the index of the record each observation belongs to
+    """
+    game_states = {}
+    observations = []
+    records_indices = []
+    for record_index, record in enumerate(records):
+        if record.variant not in game_states:
+            game_states[record.variant] = _get_state_class(record.variant)()
+
+        for game_state in replay_states(record, game_state=game_states[record.variant]):
+            observations.append(game_state.to_observation())
+            records_indices.append(record_index)
+
+    return (np.array(observations), np.array(records_indices))
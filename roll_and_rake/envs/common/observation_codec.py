@@ -0,0 +1,63 @@
+import numpy as np
+
+# formats of the observations emitted by the envs
+OBSERVATION_FORMATS = ("float32", "uint8", "packed")
+
+class ObservationCodec(object):
+    """
+    compact formats of the observations of a state, from the scales of its observation writer
+    (1 for the 0/1 features, the divisor of every counter, e.g. 40 for the green track):
+    - float32: the observation as written by the state
+    - uint8: one byte per value, value * scale (the counter itself), decoded as byte / scale
+    - packed: the 0/1 features (scale 1) in order, bit-packed with np.packbits (first feature
+      in the high bit of the first byte, last byte zero padded), followed by one uint8 byte per
+      counter (scale > 1) in order. binary_indices and counter_indices are the positions in the
+      observation of the bits and of the counter bytes
+
+    decode accepts a single observation or a batch of them (one per row)
+    """
+
+    def __init__(self, scales, *, observation_format="float32"):
+        if observation_format not in OBSERVATION_FORMATS:
+            raise Exception(f"unknown observation format {observation_format}")
+
+        self.observation_format = observation_format
+        self.scales = np.asarray(scales, dtype=np.float32)
+        self.binary_indices = np.flatnonzero(self.scales == 1)
+        self.counter_indices = np.flatnonzero(self.scales != 1)
+        self.binary_bytes_number = (len(self.binary_indices) + 7) // 8
+
+    @property
+    def size(self):
+        # length of an encoded observation
+        if self.observation_format == "packed":
+            return self.binary_bytes_number + len(self.counter_indices)
+        return len(self.scales)
+
+    @property
+    def dtype(self):
+        return np.float32 if self.observation_format == "float32" else np.uint8
+
+    def encode(self, observation):
+        if self.observation_format == "float32":
+            return np.array(observation, dtype=np.float32)
+
+        if self.observation_format == "uint8":
+            return np.rint(observation * self.scales).astype(np.uint8)
+
+        binary_bytes = np.packbits(observation[..., self.binary_indices] != 0, axis=-1)
+        counter_bytes = np.rint(observation[..., self.counter_indices] * self.scales[self.counter_indices]).astype(np.uint8)
+        return np.concatenate([binary_bytes, counter_bytes], axis=-1)
+
+    def decode(self, data):
+        data = np.asarray(data)
+        if self.observation_format == "float32":
+            return data.astype(np.float32)
+
+        if self.observation_format == "uint8":
+            return data.astype(np.float32) / self.scales
+
+        observation = np.zeros(data.shape[:-1] + (len(self.scales),), dtype=np.float32)
+        observation[..., self.binary_indices] = np.unpackbits(data[..., :self.binary_bytes_number], axis=-1, count=len(self.binary_indices))
+        observation[..., self.counter_indices] = data[..., self.binary_bytes_number:].astype(np.float32) / self.scales[self.counter_indices]
+        return observation
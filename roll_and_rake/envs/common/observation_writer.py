@@ -0,0 +1,50 @@
+import numpy as np
+
+class ObservationWriter(object):
+    """
+    fixed observation buffer split into named slices,
+    states rewrite only the slices whose content changed.
+    a slice is given as (name, size) for 0/1 features or (name, size, scales)
+    for counters written divided by their scales (one per value), see ObservationCodec
+    """
+
+    def __init__(self, slices_sizes, dtype=np.float32):
+        self.slices = {}
+        observation_size = 0
+        for name, size, *_ in slices_sizes:
+            self.slices[name] = slice(observation_size, observation_size + size)
+            observation_size += size
+
+        self.scales = np.ones(observation_size, dtype=dtype)
+        for name, _, *scales in slices_sizes:
+            if scales:
+                self.scales[self.slices[name]] = scales[0]
+        self.scales.setflags(write=False)
+
+        self.buffer = np.zeros(observation_size, dtype=dtype)
+        self._read_only_buffer = self.buffer.view()
+        self._read_only_buffer.setflags(write=False)
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def get_slice(self, name):
+        # writable view over the named slice of the buffer
+        return self.buffer[self.slices[name]]
+
+    def write(self, name, values):
+        self.buffer[self.slices[name]] = values
+
+    def get_observation(self, *, copy=True):
+        if copy:
+            return self.buffer.copy()
+        return self._read_only_buffer
+
+    def copy(self):
+        observation_writer = self.__class__.__new__(self.__class__)
+        observation_writer.slices = self.slices
+        observation_writer.scales = self.scales
+        observation_writer.buffer = self.buffer.copy()
+        observation_writer._read_only_buffer = observation_writer.buffer.view()
+        observation_writer._read_only_buffer.setflags(write=False)
+        return observation_writer
@@ -0,0 +1,31 @@
+import numpy as np
+
+class RowGeometry(object):
+    """
+    cells layout of a continuos section, computed once from its row lengths:
+    - row_starts / row_ends: first and past-the-end cell of each row
+    - cell_rows: row index of each cell
+    - full_cell: the last row cell that makes the section full once ticked
+    """
+
+    def __init__(self, row_lengths, min_ticks_to_fullfill_row=None):
+        self.row_lengths = tuple(row_lengths)
+        self.row_ends = tuple(np.cumsum(self.row_lengths).tolist())
+        self.row_starts = (0,) + self.row_ends[:-1]
+        self.row_bounds = tuple(zip(self.row_starts, self.row_ends))
+        self.cells_number = self.row_ends[-1] if self.row_ends else 0
+        self.cell_rows = np.repeat(np.arange(len(self.row_lengths)), self.row_lengths)
+        self.cell_rows.setflags(write=False)
+
+        self.min_ticks_to_fullfill_row = min_ticks_to_fullfill_row
+        self.full_cell = None
+        if min_ticks_to_fullfill_row is not None:
+            self.full_cell = self.row_starts[-1] + min_ticks_to_fullfill_row - 1
+
+_row_geometries = {}
+
+def get_row_geometry(row_lengths, min_ticks_to_fullfill_row=None):
+    key = (tuple(row_lengths), min_ticks_to_fullfill_row)
+    if key not in _row_geometries:
+        _row_geometries[key] = RowGeometry(row_lengths, min_ticks_to_fullfill_row)
+    return _row_geometries[key]
@@ -0,0 +1,72 @@
+import numpy as np
+
+# ticked cells of the continuos sections storing no die value
+NO_VALUE_TICK = 9
+
+class BasicScoring(object):
+    """
+    points of every ticked cell: the points of each cell (0 without a Points bonus)
+    dotted with the ticked cells mask
+    """
+
+    def __init__(self, *, cells_number, bonuses, row_geometry=None):
+        self.points = np.zeros(cells_number, dtype=np.int64)
+        for bonus in bonuses:
+            # the bonus types of the top-level model modules are other enums, the names are compared
+            if bonus.type.name == "Points":
+                self.points[bonus.location] += bonus.value[0]
+        self.points.setflags(write=False)
+        # ticks are never negative, min(tick, 1) is the ticked cells mask in a single call
+        self.float_points = self.points.astype(np.float64)
+
+    def get_score(self, tick_list):
+        return int(self.float_points.dot(np.minimum(tick_list, 1)))
+
+    def get_scores(self, tick_lists):
+        return (np.asarray(tick_lists) != 0) @ self.points
+
+class SetCollectionScoring(object):
+    """
+    points of the number of set collection cells ticked, looked up by their count
+    """
+
+    def __init__(self, *, cells_number, bonuses, row_geometry=None):
+        self.locations = np.array([bonus.location for bonus in bonuses if bonus.type.name == "SetCollection"], dtype=np.int64)
+        self.points = np.array(bonuses[0].value if bonuses else [0] * (len(self.locations) + 1), dtype=np.int64)
+        self.locations.setflags(write=False)
+        self.points.setflags(write=False)
+
+    def get_score(self, tick_list):
+        return int(self.points[np.count_nonzero(tick_list[self.locations])])
+
+    def get_scores(self, tick_lists):
+        return self.points[np.count_nonzero(np.asarray(tick_lists)[:, self.locations], axis=1)]
+
+class HighestRowSumScoring(object):
+    """
+    highest sum of the die values stored in a row: the values are summed row by row
+    (np.add.reduceat over the row starts) and the best row is kept
+    """
+
+    def __init__(self, *, cells_number, bonuses, row_geometry=None):
+        self.row_starts = np.array(row_geometry.row_starts, dtype=np.int64)
+        self.row_starts.setflags(write=False)
+
+    def get_score(self, tick_list):
+        values = np.where(tick_list != NO_VALUE_TICK, tick_list, 0)
+        return float(np.add.reduceat(values, self.row_starts).max())
+
+    def get_scores(self, tick_lists):
+        tick_lists = np.asarray(tick_lists)
+        values = np.where(tick_lists != NO_VALUE_TICK, tick_lists, 0)
+        return np.add.reduceat(values, self.row_starts, axis=1).max(axis=1)
+
+# scoring kernel of every ScoringType name
+SCORING_KERNELS = {
+    "Basic": BasicScoring,
+    "SetCollection": SetCollectionScoring,
+    "HighestRowSum": HighestRowSumScoring
+}
+
+def get_scoring_kernel(scoring_type_name, *, cells_number, bonuses, row_geometry=None):
+    return SCORING_KERNELS[scoring_type_name](cells_number=cells_number, bonuses=bonuses, row_geometry=row_geometry)
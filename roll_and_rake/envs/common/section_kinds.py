@@ -0,0 +1,4 @@
+# kind of a section and of its metadata: plain ints compare equal across the
+# model modules imported twice (as package and as top-level modules), classes and enums do not
+CONTINUOS_SECTION = 0
+IRREGULAR_SECTION = 1
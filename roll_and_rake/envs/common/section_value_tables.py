@@ -0,0 +1,188 @@
+import hashlib
+import os
+import re
+from collections import defaultdict
+from itertools import combinations_with_replacement, product
+from math import factorial
+import numpy as np
+
+from .dice_conditions import DIE_CODES, FACES_NUMBER
+from .dice_subsets import DICE_COLOR_NAMES, DICE_NUMBER
+from .section_kinds import IRREGULAR_SECTION
+
+# bumped whenever the tables content changes, old cache files are then rebuilt
+TABLES_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "roll_and_rake")
+
+def _get_color_rolls(color_name, dice_number):
+    # sorted values rolled by the dice of a color, with the number of dice orders giving them
+    color_rolls = []
+    for values in combinations_with_replacement(range(1, FACES_NUMBER + 1), dice_number):
+        orders = factorial(dice_number)
+        for value in set(values):
+            orders //= factorial(values.count(value))
+        color_rolls.append((tuple((color_name, value) for value in values), orders))
+    return color_rolls
+
+def _get_sub_rolls(roll):
+    # distinct non empty sub-multisets of a roll, in the roll order
+    sub_rolls = set()
+    for mask in range(1, 2**len(roll)):
+        sub_rolls.add(tuple(die for index, die in enumerate(roll) if mask & (1 << index)))
+    return sub_rolls
+
+def get_roll_outcomes():
+    """
+    every roll of the six dice as (color, value) pairs sorted by color and value,
+    with its probability
+    """
+    colors_dice_numbers = {}
+    for color_name in DICE_COLOR_NAMES:
+        colors_dice_numbers[color_name] = colors_dice_numbers.get(color_name, 0) + 1
+
+    roll_outcomes = []
+    for colors_rolls in product(*[_get_color_rolls(color_name, dice_number) for color_name, dice_number in colors_dice_numbers.items()]):
+        roll = tuple(die for color_roll, _ in colors_rolls for die in color_roll)
+        orders = 1
+        for _, color_orders in colors_rolls:
+            orders *= color_orders
+        roll_outcomes.append((roll, orders / FACES_NUMBER**DICE_NUMBER))
+    return roll_outcomes
+
+class SectionValueTable(object):
+    """
+    every configuration a section can reach and its expected value, section by section:
+    values[configuration, turns] is the expected final score of the section when each of the
+    next turns brings a new roll that it may use (or not) with any accepted dice,
+    the marginal value of a tick is the value gained by the configuration it leads to
+    """
+
+    def __init__(self, *, configurations, values):
+        self.configurations = configurations
+        self.values = values
+        self.configurations_indices = {tuple(configuration): index for index, configuration in enumerate(configurations.tolist())}
+
+    @property
+    def max_turns(self):
+        return self.values.shape[1] - 1
+
+    @classmethod
+    def build(cls, section, *, roll_outcomes, die_factory, max_turns):
+        is_irregular = section.kind == IRREGULAR_SECTION
+
+        # moves of the section for every roll, rolls with the same moves are merged
+        moves_sets_probabilities = defaultdict(float)
+        for roll, probability in roll_outcomes:
+            moves = set()
+            for sub_roll in _get_sub_rolls(roll):
+                dice_code = sum(DIE_CODES[die] for die in sub_roll)
+                if dice_code not in section.accepted_dice_codes:
+                    continue
+                if is_irregular:
+                    moves.update(cell for cell, cell_dice_codes in enumerate(section.accepted_cell_dice_codes) if dice_code in cell_dice_codes)
+                else:
+                    dice = [die_factory(color_name, value) for color_name, value in sub_roll]
+                    moves.add(tuple(section.dice_to_tick_converter.value(dice)))
+            moves_sets_probabilities[frozenset(moves)] += probability
+        all_moves = sorted({move for moves in moves_sets_probabilities for move in moves})
+        moves_indices = {move: index for index, move in enumerate(all_moves)}
+
+        # reachable configurations, with the configuration reached by every move (-1 when illegal)
+        tick_list = section.tick_list
+        configurations = [tuple(np.zeros(len(tick_list)).tolist())]
+        configurations_indices = {configurations[0]: 0}
+        next_configurations = []
+        configuration_index = 0
+        while configuration_index < len(configurations):
+            section.tick_list = np.array(configurations[configuration_index])
+            full = section.is_full()
+
+            next_configuration = []
+            for move in all_moves:
+                section.tick_list = np.array(configurations[configuration_index])
+                if full or (is_irregular and section.tick_list[move] != 0):
+                    next_configuration.append(-1)
+                    continue
+                if is_irregular:
+                    section.tick_strategy.value(section.tick_list, [move])
+                else:
+                    section.tick_strategy.value(section.tick_list, section.row_lengths, section.min_ticks_to_fullfill_row, list(move), row_geometry=section.row_geometry)
+                configuration = tuple(section.tick_list.tolist())
+                if configuration not in configurations_indices:
+                    configurations_indices[configuration] = len(configurations)
+                    configurations.append(configuration)
+                next_configuration.append(configurations_indices[configuration])
+            next_configurations.append(next_configuration)
+            configuration_index += 1
+        section.tick_list = tick_list
+        scores = section.get_scores(np.array(configurations))
+
+        next_configurations = np.array(next_configurations, dtype=np.int64).reshape(len(configurations), len(all_moves)).T
+        moves_sets = [(np.array([moves_indices[move] for move in moves], dtype=np.int64), probability) for moves, probability in moves_sets_probabilities.items()]
+
+        values = np.zeros((len(configurations), max_turns + 1))
+        values[:, 0] = scores
+        for turns in range(1, max_turns + 1):
+            previous_values = values[:, turns - 1]
+            moves_values = np.where(next_configurations >= 0, previous_values[next_configurations], -np.inf)
+            for moves, probability in moves_sets:
+                best_values = previous_values
+                if len(moves):
+                    best_values = np.maximum(previous_values, moves_values[moves].max(axis=0))
+                values[:, turns] += probability * best_values
+
+        return cls(configurations=np.array(configurations), values=values)
+
+    def get_value(self, tick_list, turns):
+        return self.values[self.configurations_indices[tuple(tick_list.tolist())], min(turns, self.max_turns)]
+
+    def get_marginal_value(self, tick_list, next_tick_list, turns):
+        return self.get_value(next_tick_list, turns) - self.get_value(tick_list, turns)
+
+def _get_variant(value):
+    # variant of the model module the value type comes from
+    return int(re.search(r"model_v(\d+)", type(value).__module__).group(1))
+
+def get_metadata_path(variant):
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), f"utils_v{variant}", "sections_metadata.json")
+
+def get_metadata_hash(sections, *, die_factory, max_turns):
+    """
+    hash of everything the tables of sections depend on: the metadata file of their variant,
+    the names of the sections in order, the variant of the dice built by die_factory and max_turns
+    """
+    variants = {_get_variant(section) for section in sections}
+    if len(variants) != 1:
+        raise Exception("the sections must belong to a single variant")
+    variant = variants.pop()
+
+    with open(get_metadata_path(variant), "rb") as metadata_file:
+        metadata_bytes = metadata_file.read()
+    section_names = ",".join(section.name for section in sections)
+    die_variant = _get_variant(die_factory(DICE_COLOR_NAMES[0], 1))
+    return hashlib.sha256(metadata_bytes + f"/{variant}/{section_names}/{die_variant}/{max_turns}/{TABLES_VERSION}".encode()).hexdigest()
+
+def get_section_value_tables(sections, *, die_factory, max_turns=24, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    value table of every section, loaded from cache_dir when it was already built
+    for the same sections (see get_metadata_hash), built and saved there otherwise
+    """
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, f"section_value_tables_{get_metadata_hash(sections, die_factory=die_factory, max_turns=max_turns)}.npz")
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as tables:
+                return [SectionValueTable(configurations=tables[f"configurations_{index}"], values=tables[f"values_{index}"]) for index in range(len(sections))]
+
+    roll_outcomes = get_roll_outcomes()
+    section_value_tables = [SectionValueTable.build(section, roll_outcomes=roll_outcomes, die_factory=die_factory, max_turns=max_turns) for section in sections]
+
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        arrays = {}
+        for index, section_value_table in enumerate(section_value_tables):
+            arrays[f"configurations_{index}"] = section_value_table.configurations
+            arrays[f"values_{index}"] = section_value_table.values
+        np.savez_compressed(cache_path, **arrays)
+
+    return section_value_tables
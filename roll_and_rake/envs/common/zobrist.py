@@ -0,0 +1,86 @@
+import numpy as np
+from .dice_conditions import COLOR_NAMES
+from .dice_subsets import DICE_NUMBER
+
+ZOBRIST_SEED = 20220715
+# empty cell, die values and the 9 mark of one tick per die
+CELL_VALUES_NUMBER = 10
+# taken die and die faces
+DIE_VALUES_NUMBER = 7
+# game counters (phase, rerolls, green track, ...) take values below this bound
+FEATURE_VALUES_NUMBER = 64
+
+class ZobristKeys(object):
+    """
+    fixed 64 bit random keys of the game features, the hash of a game is the xor
+    of the keys of its features, changing a feature updates it with two xors.
+    the keys are drawn from a fixed seed so hashes are stable across processes
+    """
+
+    def __init__(self, sections_sizes, *, features_number, seed=ZOBRIST_SEED):
+        random_generator = np.random.default_rng(seed)
+
+        def draw_keys(*shape):
+            return random_generator.integers(0, 2**64, size=shape, dtype=np.uint64).tolist()
+
+        self.cells_keys = []
+        for size in sections_sizes:
+            cells_keys = draw_keys(size, CELL_VALUES_NUMBER)
+            # empty cells do not change the hash, an empty sheet hashes to 0
+            for cell_keys in cells_keys:
+                cell_keys[0] = 0
+            self.cells_keys.append(cells_keys)
+
+        self.dice_keys = draw_keys(DICE_NUMBER, DIE_VALUES_NUMBER)
+        # a dice combination is a multiset, the n-th die equal to another one gets the n-th key
+        combination_keys = draw_keys(len(COLOR_NAMES), DIE_VALUES_NUMBER, DICE_NUMBER)
+        self.combination_keys = {
+            (color_name, value): combination_keys[color_index][value]
+            for color_index, color_name in enumerate(COLOR_NAMES)
+            for value in range(DIE_VALUES_NUMBER)
+        }
+        self.features_keys = draw_keys(features_number, FEATURE_VALUES_NUMBER)
+
+    def get_cells_hash(self, section_index, tick_list):
+        cells_hash = 0
+        for cell_keys, value in zip(self.cells_keys[section_index], tick_list.tolist()):
+            cells_hash ^= cell_keys[int(value)]
+        return cells_hash
+
+    def get_ticks_hash(self, section_index, ticked_cells, tick_list):
+        # xor of the keys changed by a tick, from the (cell, previous value) pairs of the cells written
+        cells_keys = self.cells_keys[section_index]
+        ticks_hash = 0
+        for cell, previous_value in ticked_cells:
+            ticks_hash ^= cells_keys[cell][int(previous_value)] ^ cells_keys[cell][int(tick_list[cell])]
+        return ticks_hash
+
+    def get_dice_hash(self, dice):
+        dice_hash = 0
+        for die_keys, die in zip(self.dice_keys, dice):
+            dice_hash ^= die_keys[die.value]
+        return dice_hash
+
+    def get_combination_hash(self, dice):
+        combination_hash = 0
+        occurrences = {}
+        for die in dice:
+            die_key = (die.color.name, die.value)
+            occurrence = occurrences.get(die_key, 0)
+            combination_hash ^= self.combination_keys[die_key][occurrence]
+            occurrences[die_key] = occurrence + 1
+        return combination_hash
+
+    def get_features_hash(self, features):
+        features_hash = 0
+        for feature_keys, value in zip(self.features_keys, features):
+            features_hash ^= feature_keys[value]
+        return features_hash
+
+_zobrist_keys = {}
+
+def get_zobrist_keys(sections_sizes, features_number):
+    key = (tuple(sections_sizes), features_number)
+    if key not in _zobrist_keys:
+        _zobrist_keys[key] = ZobristKeys(sections_sizes, features_number=features_number)
+    return _zobrist_keys[key]
@@ -0,0 +1,286 @@
+from .classes import Die
+from .enums import GamePhase, MoveType
+from .bitboard_state import get_bitboard_layout
+from .legal_action_tables import DICE_COLORS
+from ..common.dice_subsets import DICE_NUMBER, SUBSET_INDICES
+import numpy as np
+
+# bit i of subset j is set when die i is chosen by the action index j
+SUBSET_DICE_MASKS = np.array([[i in dice_indices for i in range(DICE_NUMBER)] for dice_indices in SUBSET_INDICES], dtype=bool)
+# same_color_dice[i, j] is True when dice i and j have the same color
+SAME_COLOR_DICE = np.array([[color_i.name == color_j.name for color_j in DICE_COLORS] for color_i in DICE_COLORS], dtype=bool)
+DICE_POWERS = 6**np.arange(DICE_NUMBER)
+DICE_BITS = 1 << np.arange(DICE_NUMBER)
+
+class BatchedRollAndRakeState(object):
+    """
+    N Roll & Rake games stored as stacked arrays and stepped together:
+    dice, legality, taking dice, rerolls and end of turn are array operations,
+    ticking a continuos section goes through a transition table (filled on
+    first use) keyed by the section cells and the dice used
+    """
+
+    def __init__(self, games_number, seed=None):
+        self.games_number = games_number
+        self.layout = get_bitboard_layout()
+        self.legal_action_tables = self.layout.legal_action_tables
+        self.random_generator = np.random.default_rng(seed)
+
+        self.max_time_value = 40
+        self.max_rerolls_available = 1
+        self.max_dice_combination_choices_available = 2
+        self.max_elliott_scoring = 18
+
+        layout = self.layout
+        tables = self.legal_action_tables
+        self.sections_number = len(layout.sections)
+        self.cells_number = layout.cells_number
+
+        # cells whose emptiness opens a legality bit (full cell of continuos sections, every irregular cell)
+        open_cells = []
+        open_cells_bits = []
+        for index, section in enumerate(layout.sections):
+            if layout.is_irregular[index]:
+                for cell, cell_bit in enumerate(tables.cell_bits[index]):
+                    open_cells.append(layout.offsets[index] + cell)
+                    open_cells_bits.append(cell_bit)
+            else:
+                open_cells.append(layout.offsets[index] + section.row_geometry.full_cell)
+                open_cells_bits.append(tables.section_bits[index])
+        self.open_cells = np.array(open_cells)
+        self.open_cells_bits = np.array(open_cells_bits, dtype=np.int64)
+        self.section_bits = np.array(tables.section_bits, dtype=np.int64)
+        self.inner_cells_number = MoveType.ChooseInnerCategory.value - MoveType.ChooseCategory.value
+        self.cell_bits = np.zeros((self.sections_number, self.inner_cells_number), dtype=np.int64)
+        for index, cell_bits in enumerate(tables.cell_bits):
+            self.cell_bits[index, :len(cell_bits)] = cell_bits
+        self.subset_bits = tables.subset_bits.astype(np.int64)
+
+        self._tick_cache = {}
+        self._score_cache = {}
+        self.empty_section_scores = np.array([self._get_section_score(index, np.zeros(size, dtype=np.int8)) for index, size in enumerate(layout.sizes)])
+
+        games = self.games_number
+        self.current_turn = np.zeros(games, dtype=np.int32)
+        self.green_track = np.zeros(games, dtype=np.int32)
+        self.game_phase = np.zeros(games, dtype=np.int8)
+        self.rerolls_available = np.zeros(games, dtype=np.int8)
+        self.dice_combination_choices_available = np.zeros(games, dtype=np.int8)
+        self.current_section_index = np.zeros(games, dtype=np.int8)
+        self.current_dice_combination = np.zeros((games, DICE_NUMBER), dtype=np.int8)
+        self.current_dice_bits = np.zeros(games, dtype=np.int64)
+        self.available_dice = np.zeros((games, DICE_NUMBER), dtype=np.int8)
+        self.green_die_value = np.zeros(games, dtype=np.int8)
+        self.ticks = np.zeros((games, self.cells_number), dtype=np.int8)
+        self.section_scores = np.zeros((games, self.sections_number))
+        self.scores = np.zeros(games)
+        self.is_done = np.zeros(games, dtype=bool)
+
+        self.reset()
+
+    def reset(self, games_mask=None):
+        if games_mask is None:
+            games_mask = np.ones(self.games_number, dtype=bool)
+
+        self.current_turn[games_mask] = 0
+        self.green_track[games_mask] = 40
+        self.game_phase[games_mask] = GamePhase.Reroll.value
+        self.rerolls_available[games_mask] = 1
+        self.dice_combination_choices_available[games_mask] = 2
+        self.current_section_index[games_mask] = 0
+        self.current_dice_combination[games_mask] = 0
+        self.current_dice_bits[games_mask] = 0
+        self.ticks[games_mask] = 0
+        self.section_scores[games_mask] = self.empty_section_scores
+        self.scores[games_mask] = self.empty_section_scores.sum()
+        self.is_done[games_mask] = False
+
+        self._generate_new_dice(games_mask)
+
+    def _generate_new_dice(self, games_mask):
+        games_number = np.count_nonzero(games_mask)
+        self.available_dice[games_mask] = self.random_generator.integers(1, 7, size=(games_number, DICE_NUMBER))
+        self.green_die_value[games_mask] = self.available_dice[games_mask, DICE_NUMBER - 1]
+
+    def _get_section_cells(self, game_index, section_index):
+        offset = self.layout.offsets[section_index]
+        return self.ticks[game_index, offset:offset + self.layout.sizes[section_index]]
+
+    def _get_section_score(self, section_index, cells):
+        key = (section_index, cells.tobytes())
+        if key not in self._score_cache:
+            section = self.layout.sections[section_index]
+            section.tick_list = cells.astype(float)
+            self._score_cache[key] = section.get_score()
+        return self._score_cache[key]
+
+    def _tick_continuos_section(self, game_index, section_index, dice_values):
+        cells = self._get_section_cells(game_index, section_index)
+        key = (section_index, cells.tobytes(), dice_values)
+        if key not in self._tick_cache:
+            section = self.layout.sections[section_index]
+            dice = [Die(DICE_COLORS[index], value) for index, value in enumerate(dice_values) if value != 0]
+            ticks = section.dice_to_tick_converter.value(dice)
+            tick_list = cells.astype(float)
+            section.tick_strategy.value(tick_list, section.row_lengths, section.min_ticks_to_fullfill_row, ticks, row_geometry=section.row_geometry)
+            self._tick_cache[key] = tick_list.astype(np.int8)
+        cells[:] = self._tick_cache[key]
+
+    def _update_section_scores(self, games_indices, sections_indices):
+        scores_delta = np.zeros(len(games_indices))
+        for index, (game_index, section_index) in enumerate(zip(games_indices, sections_indices)):
+            section_score = self._get_section_score(section_index, self._get_section_cells(game_index, section_index))
+            scores_delta[index] = section_score - self.section_scores[game_index, section_index]
+            self.section_scores[game_index, section_index] = section_score
+        self.scores[games_indices] += scores_delta
+        return scores_delta
+
+    def _encode_dice(self):
+        taken_dice = self.available_dice == 0
+        roll_codes = (np.maximum(self.available_dice.astype(np.int64) - 1, 0) * DICE_POWERS).sum(axis=1)
+        taken_masks = (taken_dice * DICE_BITS).sum(axis=1)
+        return (roll_codes, taken_masks)
+
+    def get_open_bits(self):
+        return ((self.ticks[:, self.open_cells] == 0) * self.open_cells_bits).sum(axis=1)
+
+    def get_legal_actions_mask(self):
+        tables = self.legal_action_tables
+        mask = np.zeros((self.games_number, MoveType.Pass.value), dtype=bool)
+
+        roll_codes, taken_masks = self._encode_dice()
+        untaken_subsets = tables.untaken_subsets[taken_masks]
+        open_bits = self.get_open_bits()
+
+        can_reroll = (self.game_phase == GamePhase.Reroll.value) & (self.rerolls_available >= 1)
+        mask[:, :MoveType.Reroll.value] = untaken_subsets & can_reroll[:, None]
+
+        can_take = np.isin(self.game_phase, [GamePhase.Reroll.value, GamePhase.DiceChoice.value]) & (self.dice_combination_choices_available >= 1)
+        take_bits = self.subset_bits[roll_codes] & open_bits[:, None]
+        mask[:, MoveType.Reroll.value:MoveType.TakeDiceCombination.value] = untaken_subsets & (take_bits != 0) & can_take[:, None]
+
+        dice_bits = self.current_dice_bits & open_bits
+
+        section_choice = self.game_phase == GamePhase.SectionChoice.value
+        mask[:, MoveType.TakeDiceCombination.value:MoveType.ChooseCategory.value] = ((dice_bits[:, None] & self.section_bits) != 0) & section_choice[:, None]
+
+        inner_section_choice = self.game_phase == GamePhase.InnerSectionChoice.value
+        inner_cells_bits = self.cell_bits[self.current_section_index]
+        mask[:, MoveType.ChooseCategory.value:MoveType.ChooseInnerCategory.value] = ((dice_bits[:, None] & inner_cells_bits) != 0) & inner_section_choice[:, None]
+
+        mask[:, MoveType.Pass.value - 1] = True
+        return mask
+
+    def to_observation(self):
+        games = self.games_number
+        one_hot_available_dice = np.eye(7, dtype=np.float32)[self.available_dice].reshape(games, -1)
+        binary_sections = (self.ticks != 0).astype(np.float32)
+        # game phases are numbered from 1, InnerSectionChoice (4) has no bit as in RollAndRakeState
+        game_phase_value = np.eye(5, dtype=np.float32)[self.game_phase][:, :4]
+
+        metadata = np.stack([
+            self.rerolls_available / self.max_rerolls_available,
+            self.dice_combination_choices_available / self.max_dice_combination_choices_available,
+            self.green_track / self.max_time_value,
+            self.section_scores[:, 1] / self.max_elliott_scoring
+        ], axis=1).astype(np.float32)
+
+        return np.concatenate([one_hot_available_dice, binary_sections, game_phase_value, metadata, self.get_legal_actions_mask()], axis=1, dtype=np.float32)
+
+    def step(self, env_actions_indices):
+        """
+        steps every game with its action, illegal actions leave the game untouched,
+        returns the score delta of every game
+        """
+        env_actions_indices = np.asarray(env_actions_indices)
+        games_indices = np.arange(self.games_number)
+        scores_delta = np.zeros(self.games_number)
+
+        is_legal = self.get_legal_actions_mask()[games_indices, env_actions_indices] & ~self.is_done
+        end_turn = np.zeros(self.games_number, dtype=bool)
+
+        # reroll
+        reroll = is_legal & (env_actions_indices < MoveType.Reroll.value)
+        if reroll.any():
+            rerolled_dice = SUBSET_DICE_MASKS[env_actions_indices[reroll] + 1]
+            new_dice = self.random_generator.integers(1, 7, size=rerolled_dice.shape)
+            self.available_dice[reroll] = np.where(rerolled_dice, new_dice, self.available_dice[reroll])
+            self.rerolls_available[reroll] -= 1
+            # if green die is rerolled, update green_die_value
+            self.green_die_value[reroll] = np.where(rerolled_dice[:, DICE_NUMBER - 1], self.available_dice[reroll, DICE_NUMBER - 1], self.green_die_value[reroll])
+
+        # take dice combination
+        take = is_legal & (env_actions_indices >= MoveType.Reroll.value) & (env_actions_indices < MoveType.TakeDiceCombination.value)
+        if take.any():
+            action_indices = env_actions_indices[take] - MoveType.Reroll.value + 1
+            roll_codes, _ = self._encode_dice()
+            self.current_dice_bits[take] = self.subset_bits[roll_codes[take], action_indices - 1]
+
+            dice = self.available_dice[take]
+            chosen_dice = SUBSET_DICE_MASKS[action_indices]
+            self.current_dice_combination[take] = np.where(chosen_dice, dice, 0)
+            # every die equal (same color and value) to a chosen die is taken, as in RollAndRakeState
+            same_dice = (dice[:, :, None] == dice[:, None, :]) & SAME_COLOR_DICE
+            taken_dice = (same_dice & chosen_dice[:, None, :]).any(axis=2)
+            self.available_dice[take] = np.where(taken_dice, 0, dice)
+
+            self.dice_combination_choices_available[take] -= 1
+            self.game_phase[take] = GamePhase.SectionChoice.value
+
+        # choose category
+        category = is_legal & (env_actions_indices >= MoveType.TakeDiceCombination.value) & (env_actions_indices < MoveType.ChooseCategory.value)
+        if category.any():
+            sections_indices = env_actions_indices - MoveType.TakeDiceCombination.value
+            self.current_section_index[category] = sections_indices[category]
+
+            is_irregular = np.array(self.layout.is_irregular)
+            inner = category & is_irregular[np.clip(sections_indices, 0, self.sections_number - 1)]
+            self.game_phase[inner] = GamePhase.InnerSectionChoice.value
+
+            continuos = category & ~inner
+            continuos_games = np.flatnonzero(continuos)
+            for game_index in continuos_games:
+                self._tick_continuos_section(game_index, sections_indices[game_index], tuple(self.current_dice_combination[game_index].tolist()))
+            scores_delta[continuos_games] = self._update_section_scores(continuos_games, sections_indices[continuos_games])
+            self.current_dice_combination[continuos] = 0
+            self.current_dice_bits[continuos] = 0
+
+            dice_choice = continuos & (self.dice_combination_choices_available > 0)
+            self.game_phase[dice_choice] = GamePhase.DiceChoice.value
+            end_turn |= continuos & ~dice_choice
+
+        # choose inner category
+        inner_category = is_legal & (env_actions_indices >= MoveType.ChooseCategory.value) & (env_actions_indices < MoveType.ChooseInnerCategory.value)
+        if inner_category.any():
+            inner_games = np.flatnonzero(inner_category)
+            sections_indices = self.current_section_index[inner_games].astype(np.int64)
+            offsets = np.array(self.layout.offsets)[sections_indices]
+            self.ticks[inner_games, offsets + env_actions_indices[inner_games] - MoveType.ChooseCategory.value] = 9
+            scores_delta[inner_games] = self._update_section_scores(inner_games, sections_indices)
+            self.current_section_index[inner_games] = 0
+
+            dice_choice = inner_category & (self.dice_combination_choices_available > 0)
+            self.game_phase[dice_choice] = GamePhase.DiceChoice.value
+            end_turn |= inner_category & ~dice_choice
+
+        # pass
+        end_turn |= is_legal & (env_actions_indices == MoveType.Pass.value - 1)
+        if end_turn.any():
+            self._end_turn(end_turn)
+
+        return scores_delta
+
+    def _end_turn(self, games_mask):
+        self.green_track[games_mask] = np.maximum(self.green_track[games_mask] - self.green_die_value[games_mask], 0)
+
+        self.current_turn[games_mask] += 1
+        self.game_phase[games_mask] = GamePhase.Reroll.value
+        self.rerolls_available[games_mask] = 1
+        self.dice_combination_choices_available[games_mask] = 2
+
+        self._generate_new_dice(games_mask)
+
+        self.is_done[games_mask] = self.green_track[games_mask] <= 0
+
+    def get_current_scores(self):
+        return self.scores.copy()
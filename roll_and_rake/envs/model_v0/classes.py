@@ -3,10 +3,25 @@ import collections
 from typing import NamedTuple, Callable
 from .enums import BonusType, Color, DiceToTickConverter, RenderType, ScoringType, TickStrategy
 
+try:
+    from ..common.dice_conditions import compile_dice_requirements, get_dice_code
+    from ..common.row_geometry import get_row_geometry
+    from ..common.section_kinds import CONTINUOS_SECTION, IRREGULAR_SECTION
+    from ..common.scoring_kernels import get_scoring_kernel
+except ImportError:
+    # imported as a top-level module through the sections metadata utils
+    from common.dice_conditions import compile_dice_requirements, get_dice_code
+    from common.row_geometry import get_row_geometry
+    from common.section_kinds import CONTINUOS_SECTION, IRREGULAR_SECTION
+    from common.scoring_kernels import get_scoring_kernel
+
 class Die(NamedTuple):
     color: Color
     value: int
 
+def _make_die(color_name, value):
+    return Die(Color[color_name], value)
+
 class DiceRequirement(NamedTuple):
     colors: list
     condition: Callable[[list], bool]
@@ -28,6 +43,8 @@ class SectionMetadataContinuos(NamedTuple):
     scoring_type: ScoringType
     render_type: RenderType
 
+    kind = CONTINUOS_SECTION
+
 class SectionMetadataIrregular(NamedTuple):
     name: str
     tick_strategy: TickStrategy
@@ -39,9 +56,11 @@ class SectionMetadataIrregular(NamedTuple):
     scoring_type: ScoringType
     render_type: RenderType
 
+    kind = IRREGULAR_SECTION
+
 class Section(object):
 
-    def __init__(self, name, tick_strategy, dice_to_tick_converter, ticks_number, dice_requirements, bonuses, scoring_type, render_type):
+    def __init__(self, name, tick_strategy, dice_to_tick_converter, ticks_number, dice_requirements, bonuses, scoring_type, render_type, row_geometry=None):
         self.name = name
         self.tick_strategy = tick_strategy
         self.dice_to_tick_converter = dice_to_tick_converter
@@ -49,9 +68,31 @@ class Section(object):
         self.dice_requirements = dice_requirements
         self.bonuses = bonuses
         self.scoring_type = scoring_type
+        # the dice values are stored in the cells (value lanes of the bitboard), resolved once here,
+        # the converters of the top-level model modules are other enums so the names are compared
+        self.stores_die_values = dice_to_tick_converter.name == DiceToTickConverter.EachValuePerDie.name
+        # arrays of the scoring built once, get_score runs after every tick
+        self.scoring_kernel = get_scoring_kernel(scoring_type.name, cells_number=ticks_number, bonuses=bonuses, row_geometry=row_geometry)
         self.render_type = render_type
+        # codes of the dice multisets satisfying the dice requirements
+        self.accepted_dice_codes = compile_dice_requirements(dice_requirements, die_factory=_make_die)
+
+    def copy(self):
+        # the section metadata is shared, only the tick list is copied
+        section = self.__class__.__new__(self.__class__)
+        section.__dict__.update(self.__dict__)
+        section.tick_list = self.tick_list.copy()
+        return section
+
+    def get_score(self):
+        return self.scoring_kernel.get_score(self.tick_list)
+
+    def get_scores(self, tick_lists):
+        # scores of a (sheets, cells) matrix of tick lists
+        return self.scoring_kernel.get_scores(tick_lists)
 
 class ContinuosSection(Section):
+    kind = CONTINUOS_SECTION
 
     def __init__(self, section_metadata_continuos):
         name = section_metadata_continuos.name
@@ -62,12 +103,19 @@ class ContinuosSection(Section):
         bonuses = section_metadata_continuos.bonuses
         scoring_type = section_metadata_continuos.scoring_type
         render_type = section_metadata_continuos.render_type
-        super().__init__(name, tick_strategy, dice_to_tick_converter, ticks_number, dice_requirements, bonuses, scoring_type, render_type)
-        
         self.row_lengths = section_metadata_continuos.row_lengths
         self.min_ticks_to_fullfill_row = section_metadata_continuos.min_ticks_to_fullfill_row  
+        self.row_geometry = get_row_geometry(self.row_lengths, self.min_ticks_to_fullfill_row)
+        super().__init__(name, tick_strategy, dice_to_tick_converter, ticks_number, dice_requirements, bonuses, scoring_type, render_type, row_geometry=self.row_geometry)
 
     def check_dice_requirements(self, *, dice):
+        dice_code = get_dice_code(dice)
+        if dice_code is None:
+            return self._check_dice_conditions(dice=dice)
+
+        return dice_code in self.accepted_dice_codes
+
+    def _check_dice_conditions(self, *, dice):
         dice_colors = list(map(lambda x: x.color, dice))
         
         for dice_requirement in self.dice_requirements:
@@ -83,11 +131,7 @@ class ContinuosSection(Section):
         return False
 
     def is_full(self):
-        row_lengths_indices = [[i] * v for i, v in enumerate(self.row_lengths)]
-        row_lengths_indices_flatten = [y for x in row_lengths_indices for y in x]
-        last_row_indices = [i for i, v in enumerate(row_lengths_indices_flatten) if v == len(self.row_lengths) - 1]
-        last_row = [self.tick_list[i] for i in last_row_indices]
-        return last_row[self.min_ticks_to_fullfill_row - 1] != 0
+        return self.tick_list[self.row_geometry.full_cell] != 0
 
     def make_use_of(self, *, dice):
         # check legal dice combination
@@ -97,25 +141,22 @@ class ContinuosSection(Section):
         if self.is_full():
             return
 
-        ticks = self.dice_to_tick_converter.value(dice)
-
         starting_tick_grid = self.tick_list.copy()
-        self.tick_strategy.value(self.tick_list, self.row_lengths, self.min_ticks_to_fullfill_row, ticks)
+        self.make_use_of_unchecked(dice=dice)
 
         ticked_list = self.tick_list - starting_tick_grid
         updated_locations_indices = np.where(ticked_list != 0)[0]
         bonuses_unlocked = list(filter(lambda x: x.location in updated_locations_indices, self.bonuses))
         # use bonuses_unlocked
 
-    def get_score(self):
-        if self.scoring_type.name == ScoringType.HighestRowSum.name:
-            return self.scoring_type.value(self.tick_list, self.row_lengths)
-        elif self.scoring_type.name == ScoringType.Basic.name:
-            return self.scoring_type.value(self.tick_list, self.bonuses)
-        elif self.scoring_type.name == ScoringType.SetCollection.name:
-            return self.scoring_type.value(self.tick_list, self.bonuses)
+    def make_use_of_unchecked(self, *, dice):
+        # ticks the dice already known to meet the requirements of the section (not full),
+        # returns the (cell, previous value) pairs of the cells ticked
+        ticks = self.dice_to_tick_converter.value(dice)
+        return self.tick_strategy.value(self.tick_list, self.row_lengths, self.min_ticks_to_fullfill_row, ticks, row_geometry=self.row_geometry)
 
 class IrregularSection(Section):
+    kind = IRREGULAR_SECTION
 
     def __init__(self, section_metadata_irregular):
         name = section_metadata_irregular.name
@@ -129,8 +170,23 @@ class IrregularSection(Section):
         super().__init__(name, tick_strategy, dice_to_tick_converter, ticks_number, dice_requirements, bonuses, scoring_type, render_type)
 
         self.tick_conditions = section_metadata_irregular.tick_conditions
+        self.accepted_cell_dice_codes = [compile_dice_requirements(dice_requirements, die_factory=_make_die, tick_condition=tick_condition.value) for tick_condition in self.tick_conditions]
 
     def check_dice_requirements(self, *, dice, env_choices):
+        dice_code = get_dice_code(dice)
+        if dice_code is None:
+            return self._check_dice_conditions(dice=dice, env_choices=env_choices)
+
+        if dice_code not in self.accepted_dice_codes:
+            return False
+
+        for choice in env_choices:
+            if dice_code not in self.accepted_cell_dice_codes[choice] or self.tick_list[choice] != 0:
+                return False
+
+        return True
+
+    def _check_dice_conditions(self, *, dice, env_choices):
         dice_colors = list(map(lambda x: x.color, dice))
 
         dice_combination_check = False
@@ -166,25 +222,23 @@ class IrregularSection(Section):
             return
 
         starting_tick_grid = self.tick_list.copy()
-        self.tick_strategy.value(self.tick_list, choices)
+        self.make_use_of_unchecked(dice=dice, with_env_choices=choices)
 
         ticked_list = self.tick_list - starting_tick_grid
         updated_locations_indices = np.where(ticked_list != 0)[0]
         bonuses_unlocked = list(filter(lambda x: x.location in updated_locations_indices, self.bonuses))
         # use bonuses_unlocked
 
-    def get_score(self):
-        if self.scoring_type.name == ScoringType.Basic.name:
-            return self.scoring_type.value(self.tick_list, self.bonuses)
-        elif self.scoring_type.name == ScoringType.SetCollection.name:
-            return self.scoring_type.value(self.tick_list, self.bonuses)
-
-
-
-
-
-
-
-
+    def make_use_of_unchecked(self, *, dice, with_env_choices):
+        # ticks the cells chosen, the dice are already known to meet their conditions,
+        # returns the (cell, previous value) pairs of the cells ticked
+        return self.tick_strategy.value(self.tick_list, with_env_choices)
 
+# section class of every kind, to build the sections from their metadata
+SECTION_CLASSES = {
+    CONTINUOS_SECTION: ContinuosSection,
+    IRREGULAR_SECTION: IrregularSection
+}
 
+def make_section(section_metadata):
+    return SECTION_CLASSES[section_metadata.kind](section_metadata)
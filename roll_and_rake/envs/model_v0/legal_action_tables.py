@@ -0,0 +1,165 @@
+from .classes import Die, Color, make_section
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from utils_v0.utils import get_sections_metadata
+from ..common.dice_conditions import get_dice_code
+from ..common.section_kinds import IRREGULAR_SECTION
+from ..common.dice_subsets import DICE_NUMBER, DICE_COLOR_NAMES, SUBSETS_NUMBER, SUBSET_INDICES, SUBSET_COLOR_SIGNATURES
+
+DICE_COLORS = [Color[color_name] for color_name in DICE_COLOR_NAMES]
+ROLLS_NUMBER = 6**DICE_NUMBER
+
+class LegalActionTables(object):
+    """
+    build-once tables mapping every dice roll and dice subset to the
+    requirement bits the subset satisfies:
+    - one bit for each continuos section whose dice requirements are met
+    - one bit for each irregular section cell whose tick condition is met
+
+    a move is legal when its requirement bits intersect the open bits of the
+    current sheet (continuos sections not full, irregular cells not ticked)
+    """
+
+    def __init__(self, sections_metadata):
+        self.sections = [make_section(section_metadata) for section_metadata in sections_metadata]
+
+        self.section_bits = []
+        self.cell_bits = []
+        bits_number = 0
+        for section in self.sections:
+            if section.kind == IRREGULAR_SECTION:
+                self.cell_bits.append([1 << (bits_number + cell) for cell in range(len(section.tick_list))])
+                bits_number += len(section.tick_list)
+            else:
+                self.cell_bits.append([])
+                bits_number += 1
+            self.section_bits.append((1 << bits_number) - (1 << (bits_number - max(len(self.cell_bits[-1]), 1))))
+
+        self.dtype = np.min_scalar_type((1 << bits_number) - 1)
+
+        # owner of every requirement bit: its section and, for irregular sections, its cell (-1 otherwise)
+        self.bit_shifts = np.arange(bits_number, dtype=self.dtype)
+        self.bit_sections = np.array([index for index, cells in enumerate(self.cell_bits) for _ in (cells or [None])])
+        self.bit_cells = np.array([cell for cells in self.cell_bits for cell in (range(len(cells)) if cells else [-1])])
+
+        # colors required by each section, a section is only evaluated for dice with matching colors
+        self.required_colors = [set(tuple(sorted(dice_requirement.colors)) for dice_requirement in section.dice_requirements) for section in self.sections]
+
+        self.signature_bits = {}
+        self.canonical_subsets = {}
+        self.subset_bits = np.zeros((ROLLS_NUMBER, SUBSETS_NUMBER - 1), dtype=self.dtype)
+
+        # untaken_subsets[taken_mask] tells which subsets only use dice still available
+        subsets = np.arange(1, SUBSETS_NUMBER)
+        self.untaken_subsets = (subsets[None, :] & np.arange(SUBSETS_NUMBER)[:, None]) == 0
+
+        rolls_digits = (np.arange(ROLLS_NUMBER)[:, None] // 6**np.arange(DICE_NUMBER)) % 6
+        for action_index in subsets:
+            dice_indices = list(SUBSET_INDICES[action_index])
+
+            values_number = 6**len(dice_indices)
+            values_digits = (np.arange(values_number)[:, None] // 6**np.arange(len(dice_indices))) % 6
+            subset_bits = np.array([
+                self._evaluate(dice=[Die(DICE_COLORS[i], int(value) + 1) for i, value in zip(dice_indices, digits)], colors=SUBSET_COLOR_SIGNATURES[action_index])
+                for digits in values_digits
+            ], dtype=self.dtype)
+
+            subset_codes = rolls_digits[:, dice_indices] @ (6**np.arange(len(dice_indices)))
+            self.subset_bits[:, action_index - 1] = subset_bits[subset_codes]
+
+    def _evaluate(self, *, dice, colors=None):
+        signature = get_dice_code(dice)
+        if signature not in self.signature_bits:
+            if colors is None:
+                colors = tuple(sorted(die.color.name for die in dice))
+            bits = 0
+            for index, section in enumerate(self.sections):
+                if colors not in self.required_colors[index]:
+                    continue
+
+                if section.kind == IRREGULAR_SECTION:
+                    for cell, cell_bit in enumerate(self.cell_bits[index]):
+                        if section.check_dice_requirements(dice=dice, env_choices=[cell]):
+                            bits |= cell_bit
+                elif section.check_dice_requirements(dice=dice):
+                    bits |= self.section_bits[index]
+            self.signature_bits[signature] = bits
+        return self.signature_bits[signature]
+
+    def get_dice_bits(self, dice):
+        if not dice:
+            return 0
+        return self._evaluate(dice=dice)
+
+    def get_moves(self, dice_bits):
+        """
+        (row, section index, cell) of every requirement bit set in the rows of dice_bits,
+        in row then bit order (section then cell order), cell is -1 for continuos sections
+        """
+        dice_bits = np.asarray(dice_bits, dtype=self.dtype)
+        rows, bits = np.nonzero((dice_bits[:, None] >> self.bit_shifts) & 1)
+        return (rows, self.bit_sections[bits], self.bit_cells[bits])
+
+    def encode_dice(self, dice):
+        # taken dice (value 0) are encoded as ones and excluded through the taken mask
+        roll_code = 0
+        taken_mask = 0
+        for index, die in enumerate(dice):
+            if die.value == 0:
+                taken_mask |= 1 << index
+            else:
+                roll_code += (die.value - 1) * 6**index
+        return (roll_code, taken_mask)
+
+    def encode_dice_array(self, dice_array):
+        # same codes as encode_dice, read from the values and taken mask of a DiceArray
+        roll_code = 0
+        for index, value in enumerate(dice_array.values):
+            if value != 0:
+                roll_code += (value - 1) * 6**index
+        return (roll_code, dice_array.taken_mask)
+
+    def get_canonical_subsets(self, roll_code, taken_mask):
+        """
+        canonical action index of every subset: the smallest action index choosing
+        the same multiset of (color, value), taken dice counting as value 0
+        """
+        key = (roll_code, taken_mask)
+        if key not in self.canonical_subsets:
+            values = [0 if taken_mask & (1 << index) else (roll_code // 6**index) % 6 + 1 for index in range(DICE_NUMBER)]
+            representatives = {}
+            canonical_subsets = np.zeros(SUBSETS_NUMBER - 1, dtype=np.uint8)
+            for action_index in range(1, SUBSETS_NUMBER):
+                dice = tuple(sorted((DICE_COLOR_NAMES[index], values[index]) for index in SUBSET_INDICES[action_index]))
+                canonical_subsets[action_index - 1] = representatives.setdefault(dice, action_index)
+            canonical_subsets.setflags(write=False)
+            self.canonical_subsets[key] = canonical_subsets
+        return self.canonical_subsets[key]
+
+    def get_open_bits(self, sections):
+        open_bits = 0
+        for index, section in enumerate(sections):
+            if self.cell_bits[index]:
+                for cell, cell_bit in enumerate(self.cell_bits[index]):
+                    if section.tick_list[cell] == 0:
+                        open_bits |= cell_bit
+            elif not section.is_full():
+                open_bits |= self.section_bits[index]
+        return open_bits
+
+_legal_action_tables = None
+
+def get_legal_action_tables():
+    global _legal_action_tables
+    if _legal_action_tables is None:
+        _legal_action_tables = LegalActionTables(get_sections_metadata())
+    return _legal_action_tables
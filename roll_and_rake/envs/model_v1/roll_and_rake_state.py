@@ -1,16 +1,23 @@
 from time import time
 from xml.parsers.expat import model
-from .classes import ContinuosSection, Die, Color, IrregularSection, Section, SectionMetadataContinuos, SectionMetadataIrregular
+from .classes import Die, Color, make_section, _make_die
 from .enums import BonusType, GamePhase, MoveType, RenderType, GameMove
+from .legal_action_tables import get_legal_action_tables
+from ..common.observation_writer import ObservationWriter
+from ..common.zobrist import get_zobrist_keys
+from ..common.dice_source import DiceSource
+from ..common.dice_array import DiceArray
+from ..common.section_kinds import CONTINUOS_SECTION, IRREGULAR_SECTION
+from ..common.dice_subsets import DICE_NUMBER, SUBSETS_NUMBER, SUBSET_GETTERS, SUBSET_INDICES, SUBSET_INDICES_ARRAYS
 import numpy as np
-from operator import add
+from typing import NamedTuple, Optional
+from operator import xor
 from functools import reduce
 from collections import Counter
 import re
 
 import os
 import sys
-import random
 
 parent_dir_path = os.path.abspath(os.path.join(
                   os.path.dirname(__file__), 
@@ -21,8 +28,37 @@ sys.path.append(parent_dir_path)
 from utils_v1.utils import get_sections_metadata
 
 
+# action index of every dice subset, as stored by the canonical subsets tables
+SUBSET_ACTION_INDICES = np.arange(1, SUBSETS_NUMBER)
+
+_sections_templates = None
+
+# deterministic variant: every game rolls the same dice, from this seed unless another one is given
+DICE_SEED = 10
+
+class RollAndRakeSnapshot(NamedTuple):
+    """
+    mutable part of a RollAndRakeState, the sections metadata is left out
+    """
+    current_turn: int
+    green_track: int
+    game_phase: GamePhase
+    rerolls_available: int
+    dice_combination_choices_available: int
+    current_section_index: int
+    is_done: bool
+    green_die_value: int
+    available_dice: bytes
+    current_dice_combination: tuple
+    bonuses_available: tuple
+    tick_lists: tuple
+    section_scores: tuple
+    current_score: float
+    sections_hashes: tuple
+    random_state: Optional[tuple] = None
+
 class RollAndRakeState(object):
-    def __init__(self, rerolls = 1):
+    def __init__(self, rerolls = 1, canonical_actions = False, seed = DICE_SEED):
         self.current_turn = 0
         self.green_track = 40
         self.max_time_value = 40
@@ -36,19 +72,29 @@ class RollAndRakeState(object):
         self.current_section_index = 0
         self.bonuses_available = []
         self.is_done = False
+        self.legal_action_tables = get_legal_action_tables()
+        # duplicate dice subsets (same multiset of color and value) are masked out and mapped to the canonical one
+        self.canonical_actions = canonical_actions
         
-        self.myRandom = random.Random(10)
-        self.available_dice = self.generate_new_dice()
-
-        self.sections = []
-        sections_metadata = get_sections_metadata()
-        for section_metadata in sections_metadata:
-            if self._is_instance(section_metadata, SectionMetadataContinuos):
-                self.sections.append(ContinuosSection(section_metadata))
-            elif self._is_instance(section_metadata, SectionMetadataIrregular):
-                self.sections.append(IrregularSection(section_metadata))
+        self.dice_seed = seed
+        self.dice_source = DiceSource(seed)
+        self.dice = DiceArray(_make_die)
+        self.generate_new_dice()
+
+        self.sections = [section.copy() for section in self._get_sections_templates()]
+
+        self.zobrist_keys = get_zobrist_keys([len(section.tick_list) for section in self.sections], len(self._get_hashed_features()))
+        self._hashed_dice = None
+        self._hashed_dice_combination = None
+        self.observation_writer = self._create_observation_writer()
+        self._reset_legal_actions_mask()
+        self._observed_dice = None
+        self.refresh_scores()
     
-    def reset(self):
+    def reset(self, seed=None):
+        if seed is not None:
+            self.dice_seed = seed
+
         self.current_turn = 0
         self.green_track = 40
         self.game_phase = GamePhase.Reroll
@@ -59,25 +105,34 @@ class RollAndRakeState(object):
         self.bonuses_available = []
         self.is_done = False
 
-        self.myRandom = random.Random(10)
+        self.dice_source.seed(self.dice_seed)
 
-        self.available_dice = self.generate_new_dice()
+        self.generate_new_dice()
 
         for section in self.sections:
             section.tick_list[:] = 0
 
-    def generate_new_dice(self, orange_dice_num=3, brown_dice_num=2, green_dice_num=1):
-        orange_dice = [Die(Color.Orange, self.myRandom.randrange(6) + 1) for _ in range(orange_dice_num)]
-        brown_dice = [Die(Color.Brown, self.myRandom.randrange(6) + 1) for _ in range(brown_dice_num)]
-        green_dice = [Die(Color.Green, self.myRandom.randrange(6) + 1) for _ in range(green_dice_num)]
-        
-        self.green_die_value = green_dice[0].value
-        return orange_dice + brown_dice + green_dice
+        self.refresh_scores()
+
+    @property
+    def available_dice(self):
+        # Die views of the dice array, assigning a list of dice copies their values into it
+        return self.dice
+
+    @available_dice.setter
+    def available_dice(self, dice):
+        self.dice.set_dice(dice)
+
+    def generate_new_dice(self):
+        self.dice.set_values(self.dice_source.roll(DICE_NUMBER))
+        self.green_die_value = self.dice.values[DICE_NUMBER - 1]
     
-    def _is_instance(self, obj, cls):
-        obj_class = str(type(obj)).split(".")[-1]
-        cls_class = str(cls).split(".")[-1]
-        return obj_class == cls_class
+    def _get_sections_templates(self):
+        # the sections are compiled once per process, every state starts from copies of them
+        global _sections_templates
+        if _sections_templates is None:
+            _sections_templates = [make_section(section_metadata) for section_metadata in get_sections_metadata()]
+        return _sections_templates
 
     def _get_one_hot_encoding(self, *, of_value, with_max_bit_size):
         value = of_value
@@ -93,95 +148,134 @@ class RollAndRakeState(object):
 
         return [1 if x != 0 else 0 for x in tick_list]
 
-    def to_observation(self):
-        
-        one_hot_available_dice = [self._get_one_hot_encoding(of_value=die.value, with_max_bit_size=7) for die in self.available_dice]
-        one_hot_available_dice_flatten = [y for x in one_hot_available_dice for y in x]
-
-        binary_sections = [self._get_binary_encoding(of_tick_list=section.tick_list) for section in self.sections]
-        binary_sections_flatten = [y for x in binary_sections for y in x]
-
-        game_phase_value = self._get_one_hot_encoding(of_value=self.game_phase.value, with_max_bit_size=4)
+    def _create_observation_writer(self):
+        return ObservationWriter([
+            ("available_dice", len(self.available_dice) * 7),
+            *[(f"section_{index}", len(section.tick_list)) for index, section in enumerate(self.sections)],
+            ("game_phase", 4),
+            ("metadata", 4, (self.max_rerolls_available, self.max_dice_combination_choices_available, self.max_time_value, self.max_elliott_scoring)),
+            ("legal_actions", MoveType.Pass.value)
+        ])
+
+    def to_observation(self, *, copy=True):
+        observation_writer = self.observation_writer
+
+        dice_key = self.dice.get_key()
+        if dice_key != self._observed_dice:
+            one_hot_available_dice = observation_writer.get_slice("available_dice").reshape(DICE_NUMBER, 7)
+            one_hot_available_dice[:] = 0
+            one_hot_available_dice[np.arange(DICE_NUMBER), np.frombuffer(dice_key, dtype=np.uint8)] = 1
+            self._observed_dice = dice_key
+
+        for section_index in self._dirty_sections:
+            observation_writer.write(f"section_{section_index}", self.sections[section_index].tick_list != 0)
+        self._dirty_sections.clear()
+
+        observation_writer.write("game_phase", self._get_one_hot_encoding(of_value=self.game_phase.value, with_max_bit_size=4))
         
         rerolls_value = self.rerolls_available / self.max_rerolls_available
         dice_combination_choices_value = self.dice_combination_choices_available / self.max_dice_combination_choices_available
         time_value = self.green_track / self.max_time_value
-        elliott_scoring = self.sections[1].get_score() / self.max_elliott_scoring
-        metadata_arr = [rerolls_value, dice_combination_choices_value, time_value, elliott_scoring]
+        elliott_scoring = self.section_scores[1] / self.max_elliott_scoring
+        observation_writer.write("metadata", (rerolls_value, dice_combination_choices_value, time_value, elliott_scoring))
 
-        legal_actions = [1 if self.is_action_legal(env_action_index=i) else 0 for i in range(MoveType.Pass.value)]
-        return np.array(one_hot_available_dice_flatten + binary_sections_flatten + game_phase_value + metadata_arr + legal_actions)
-
-    def get_legal_env_actions_indices(self):
-        return [i for i in range(MoveType.Pass.value) if self.is_action_legal(env_action_index=i)]
+        observation_writer.write("legal_actions", self.get_legal_actions_mask())
+        return observation_writer.get_observation(copy=copy)
 
-    def is_action_legal(self, *, env_action_index):
+    def get_legal_actions_mask(self):
+        # the mask is kept across calls, each action range is recomputed only when the inputs it depends on changed
+        tables = self.legal_action_tables
+        mask = self._legal_actions_mask
 
-        if env_action_index < 0 or env_action_index >= MoveType.Pass.value:
-            raise Exception("action index out of bounds")
+        roll_code, taken_mask = tables.encode_dice_array(self.dice)
+        open_bits = tables.get_open_bits(self.sections)
 
-        if env_action_index < MoveType.Reroll.value:
-            action_index = env_action_index + 1
-            if self.game_phase != GamePhase.Reroll or self.rerolls_available < 1:
-                return False
+        reroll_key = None
+        if self.game_phase == GamePhase.Reroll and self.rerolls_available >= 1:
+            reroll_key = (roll_code, taken_mask) if self.canonical_actions else taken_mask
 
-            return bool(self._get_dice_combination(with_action_index=action_index))
+        take_key = None
+        if self.game_phase in [GamePhase.Reroll, GamePhase.DiceChoice] and self.dice_combination_choices_available >= 1:
+            take_key = (roll_code, taken_mask, open_bits)
 
-        elif env_action_index < MoveType.TakeDiceCombination.value:
-            env_action_index -= MoveType.Reroll.value
-            action_index = env_action_index + 1
+        category_key = None
+        if self.game_phase == GamePhase.SectionChoice:
+            category_key = tables.get_dice_bits(self.current_dice_combination) & open_bits
 
-            if self.game_phase not in [GamePhase.Reroll, GamePhase.DiceChoice] or self.dice_combination_choices_available < 1:
-                return False
+        inner_category_key = None
+        if self.game_phase == GamePhase.InnerSectionChoice:
+            inner_category_key = (self.current_section_index, tables.get_dice_bits(self.current_dice_combination) & open_bits)
 
-            dice_combination = self._get_dice_combination(with_action_index=action_index)
-            for section in self.sections:
-                if self._is_instance(section, ContinuosSection):
-                    if section.check_dice_requirements(dice=dice_combination) and not section.is_full():
-                        return True
-                elif self._is_instance(section, IrregularSection):
-                    for choice in range(MoveType.ChooseInnerCategory.value - MoveType.ChooseCategory.value):
-                        if section.check_dice_requirements(dice=dice_combination, env_choices=[choice]) and not section.is_full():
-                            return True
+        ranges_keys = (reroll_key, take_key, category_key, inner_category_key)
+        if ranges_keys == self._legal_ranges_keys:
+            return self._read_only_legal_actions_mask
 
-            return False
+        last_reroll_key, last_take_key, last_category_key, last_inner_category_key = self._legal_ranges_keys
 
-        elif env_action_index < MoveType.ChooseCategory.value:
-            env_action_index -= MoveType.TakeDiceCombination.value
-            action_index = env_action_index + 1
+        if reroll_key != last_reroll_key:
+            if reroll_key is None:
+                mask[:MoveType.Reroll.value] = False
+            else:
+                mask[:MoveType.Reroll.value] = tables.untaken_subsets[taken_mask]
+                if self.canonical_actions:
+                    mask[:MoveType.Reroll.value] &= self._get_canonical_subsets_mask(roll_code, taken_mask)
 
-            if self.game_phase != GamePhase.SectionChoice:
-                return False
+        if take_key != last_take_key:
+            if take_key is None:
+                mask[MoveType.Reroll.value:MoveType.TakeDiceCombination.value] = False
+            else:
+                mask[MoveType.Reroll.value:MoveType.TakeDiceCombination.value] = tables.untaken_subsets[taken_mask] & ((tables.subset_bits[roll_code] & open_bits) != 0)
+                if self.canonical_actions:
+                    mask[MoveType.Reroll.value:MoveType.TakeDiceCombination.value] &= self._get_canonical_subsets_mask(roll_code, taken_mask)
+
+        if category_key != last_category_key:
+            for index, section_bits in enumerate(tables.section_bits):
+                mask[MoveType.TakeDiceCombination.value + index] = category_key is not None and bool(category_key & section_bits)
+
+        if inner_category_key != last_inner_category_key:
+            mask[MoveType.ChooseCategory.value:MoveType.ChooseInnerCategory.value] = False
+            if inner_category_key is not None:
+                current_section_index, dice_bits = inner_category_key
+                for choice, cell_bit in enumerate(tables.cell_bits[current_section_index]):
+                    mask[MoveType.ChooseCategory.value + choice] = bool(dice_bits & cell_bit)
+
+        self._legal_ranges_keys = ranges_keys
+        self._legal_env_actions_indices = None
+        return self._read_only_legal_actions_mask
+
+    def _get_canonical_subsets_mask(self, roll_code, taken_mask):
+        return self.legal_action_tables.get_canonical_subsets(roll_code, taken_mask) == SUBSET_ACTION_INDICES
+
+    def get_canonical_env_action_index(self, *, env_action_index):
+        # reroll and take actions choosing the same dice multiset as a smaller action index are mapped to it
+        if env_action_index < 0 or env_action_index >= MoveType.TakeDiceCombination.value:
+            return env_action_index
+
+        range_start = 0 if env_action_index < MoveType.Reroll.value else MoveType.Reroll.value
+        roll_code, taken_mask = self.legal_action_tables.encode_dice_array(self.dice)
+        canonical_subsets = self.legal_action_tables.get_canonical_subsets(roll_code, taken_mask)
+        return range_start + int(canonical_subsets[env_action_index - range_start]) - 1
+
+    def _reset_legal_actions_mask(self):
+        self._legal_actions_mask = np.zeros(MoveType.Pass.value, dtype=bool)
+        self._legal_actions_mask[MoveType.Pass.value - 1] = True
+        self._read_only_legal_actions_mask = self._legal_actions_mask.view()
+        self._read_only_legal_actions_mask.setflags(write=False)
+        self._legal_ranges_keys = (None, None, None, None)
+        self._legal_env_actions_indices = None
 
-            chosen_section = self.sections[env_action_index]
-            if chosen_section.is_full():
-                return False
-
-            if self._is_instance(chosen_section, ContinuosSection):
-                if not chosen_section.check_dice_requirements(dice=self.current_dice_combination):
-                    return False
-            elif self._is_instance(chosen_section, IrregularSection):
-                for i in range(len(chosen_section.tick_list)):
-                    if chosen_section.check_dice_requirements(dice=self.current_dice_combination, env_choices=[i]):
-                        return True
-                return False
-        
-        elif env_action_index < MoveType.ChooseInnerCategory.value:
-            env_action_index -= MoveType.ChooseCategory.value
-            action_index = env_action_index + 1
+    def get_legal_env_actions_indices(self):
+        mask = self.get_legal_actions_mask()
+        if self._legal_env_actions_indices is None:
+            self._legal_env_actions_indices = np.flatnonzero(mask).tolist()
+        return list(self._legal_env_actions_indices)
 
-            if self.game_phase != GamePhase.InnerSectionChoice:
-                return False
-        
-            current_section = self.sections[self.current_section_index]
+    def is_action_legal(self, *, env_action_index):
 
-            if self._is_instance(current_section, ContinuosSection):
-                return False
-            elif self._is_instance(current_section, IrregularSection):
-                if not current_section.check_dice_requirements(dice=self.current_dice_combination, env_choices=[env_action_index]):
-                    return False
+        if env_action_index < 0 or env_action_index >= MoveType.Pass.value:
+            raise Exception("action index out of bounds")
 
-        return True
+        return bool(self.get_legal_actions_mask()[env_action_index])
 
     def _enumerate_all_dice_combinations(self):
         dice_combinations = []
@@ -192,7 +286,9 @@ class RollAndRakeState(object):
 
     def step(self, *, with_env_action_index):
         env_action_index = with_env_action_index
-        action_index = env_action_index + 1
+        if self.canonical_actions:
+            env_action_index = self.get_canonical_env_action_index(env_action_index=env_action_index)
+        score_delta = 0
 
         # print(f"step: action chosen ({GameMove(env_action_index)})")
 
@@ -200,7 +296,18 @@ class RollAndRakeState(object):
             # print(self)
             print(f"Error: The provided action is illegal {env_action_index}")
             # print(f"legal actions: {self.get_legal_env_actions_indices()}")
-            return
+            return score_delta
+
+        return self.step_unchecked(with_env_action_index=env_action_index)
+
+    def step_unchecked(self, *, with_env_action_index):
+        """
+        step for callers picking the action from the legal actions mask:
+        neither the action nor the dice are validated again (and canonical actions are not mapped)
+        """
+        env_action_index = with_env_action_index
+        action_index = env_action_index + 1
+        score_delta = 0
 
         if env_action_index < MoveType.Reroll.value:
             self._reroll_dice(with_action_index=action_index)
@@ -220,8 +327,9 @@ class RollAndRakeState(object):
             self.current_section_index = env_action_index
             chosen_section = self.sections[env_action_index]
 
-            if self._is_instance(chosen_section, ContinuosSection):
-                chosen_section.make_use_of(dice=self.current_dice_combination)
+            if chosen_section.kind == CONTINUOS_SECTION:
+                ticked_cells = chosen_section.make_use_of_unchecked(dice=self.current_dice_combination)
+                score_delta = self._update_section_score(env_action_index, ticked_cells)
                 self.current_dice_combination = []
                 
                 if self.dice_combination_choices_available > 0:
@@ -229,14 +337,15 @@ class RollAndRakeState(object):
                 else:
                     self._end_turn()
 
-            elif self._is_instance(chosen_section, IrregularSection):
+            elif chosen_section.kind == IRREGULAR_SECTION:
                 self.game_phase = GamePhase.InnerSectionChoice
         
         elif env_action_index < MoveType.ChooseInnerCategory.value:
             env_action_index -= MoveType.ChooseCategory.value
 
             current_section = self.sections[self.current_section_index]
-            current_section.make_use_of(dice=self.current_dice_combination, with_env_choices=[env_action_index])
+            ticked_cells = current_section.make_use_of_unchecked(dice=self.current_dice_combination, with_env_choices=[env_action_index])
+            score_delta = self._update_section_score(self.current_section_index, ticked_cells)
             self.current_section_index = 0
 
             if self.dice_combination_choices_available > 0:
@@ -247,6 +356,8 @@ class RollAndRakeState(object):
         else:
             self._end_turn()
 
+        return score_delta
+
     def _end_turn(self):
         self.green_track = max(self.green_track - self.green_die_value, 0)
 
@@ -255,57 +366,171 @@ class RollAndRakeState(object):
         self.rerolls_available = 1
         self.dice_combination_choices_available = 2
         
-        self.available_dice = self.generate_new_dice()
+        self.generate_new_dice()
 
         if self.green_track <= 0:
             self.is_done = True
     
     def _get_dice_chosen_indices_from(self, *, action_index):
-        if action_index >= 2**len(self.available_dice):
+        if action_index >= SUBSETS_NUMBER:
             raise Exception("Index out of bounds")
 
-        bits_array = np.array([int(x) for x in (bin(action_index)[2:])[::-1]])
-        dice_chosen_indices = np.where(bits_array == 1)[0]
-        return dice_chosen_indices
+        return SUBSET_INDICES_ARRAYS[action_index]
 
     def _reroll_dice(self, *, with_action_index=2**6 - 1):
         action_index = with_action_index
 
-        dice_chosen_indices = self._get_dice_chosen_indices_from(action_index=action_index)
-        for dice_index in dice_chosen_indices:
-            if self.available_dice[dice_index].value == 0:
-                raise Exception("Illegal action")
+        # the action index is the bitmask of the chosen dice
+        if self.dice.taken_mask & action_index:
+            raise Exception("Illegal action")
 
-        self.available_dice = [die if index not in dice_chosen_indices else Die(die.color, self.myRandom.randrange(6) + 1) for index, die in enumerate(self.available_dice)]
+        dice_chosen_indices = SUBSET_INDICES[action_index]
+        self.dice.roll(dice_chosen_indices, self.dice_source.roll(len(dice_chosen_indices)))
         
         # if green die is rerolled, update green_die_value
         if action_index >= 32:
-            green_die = [die for die in self.available_dice if die.color == Color.Green][0]
-            self.green_die_value = green_die.value
+            self.green_die_value = self.dice.values[DICE_NUMBER - 1]
 
     def _get_dice_combination(self, *, with_action_index):
         action_index = with_action_index
         
-        dice_chosen_indices = self._get_dice_chosen_indices_from(action_index=action_index)        
-        for dice_index in dice_chosen_indices:
-            if self.available_dice[dice_index].value == 0:
-                return []
+        if self.dice.taken_mask & action_index:
+            return ()
         
-        return [die for index, die in enumerate(self.available_dice) if index in dice_chosen_indices]
+        return SUBSET_GETTERS[action_index](self.dice)
 
     def _take_dice_combination(self, *, with_action_index):
         action_index = with_action_index
 
         dice_combination = self._get_dice_combination(with_action_index=action_index)
-        self.available_dice = [die if die not in dice_combination else Die(die.color, 0) for die in self.available_dice]
+        self.dice.take(dice_combination)
         self.current_dice_combination = dice_combination
       
-    def get_current_score(self):
-        score = 0
-        for section in self.sections:
-            score += section.get_score()
+    def enumerate_afterstates(self):
+        """
+        every distinct post-decision game reachable with the current dice in one call,
+        with the actions leading there, their score delta and the encoded sheet reached
+        (see BitboardLayout.enumerate_afterstates)
+        """
+        # imported here, the bitboard state module builds on this one
+        from .bitboard_state import get_bitboard_layout
+
+        layout = get_bitboard_layout()
+        sheet, values = layout.encode(self._get_sections_tick_lists())
+        return layout.enumerate_afterstates(
+            sheet, values,
+            available_dice=self.available_dice,
+            game_phase=self.game_phase,
+            dice_combination_choices_available=self.dice_combination_choices_available,
+            current_dice_combination=self.current_dice_combination,
+            current_section_index=self.current_section_index,
+        )
+
+    def refresh_scores(self):
+        # recompute the cached section scores and observation bits, needed after editing the sections tick lists directly
+        self.section_scores = [section.get_score() for section in self.sections]
+        self.current_score = sum(self.section_scores)
+        self._dirty_sections = set(range(len(self.sections)))
+        self._sections_hashes = [self.zobrist_keys.get_cells_hash(index, section.tick_list) for index, section in enumerate(self.sections)]
+        self._sheet_hash = reduce(xor, self._sections_hashes, 0)
+
+    def _update_section_score(self, section_index, ticked_cells):
+        # ticked_cells: the (cell, previous value) pairs written by the tick, only their keys change the hash
+        self._dirty_sections.add(section_index)
+        ticks_hash = self.zobrist_keys.get_ticks_hash(section_index, ticked_cells, self.sections[section_index].tick_list)
+        self._sheet_hash ^= ticks_hash
+        self._sections_hashes[section_index] ^= ticks_hash
+        section_score = self.sections[section_index].get_score()
+        score_delta = section_score - self.section_scores[section_index]
+        self.section_scores[section_index] = section_score
+        self.current_score += score_delta
+        return score_delta
 
-        return score
+    def get_current_score(self):
+        return self.current_score
+
+    def _get_hashed_features(self):
+        return (self.game_phase.value, self.rerolls_available, self.dice_combination_choices_available,
+                self.green_track, self.green_die_value, self.current_section_index)
+
+    def get_zobrist_hash(self):
+        # 64 bit hash of the game for transposition tables, the turn number is left out.
+        # the sheet part is updated on every tick, the dice parts only when the dice changed
+        keys = self.zobrist_keys
+
+        dice_key = self.dice.get_key()
+        if dice_key != self._hashed_dice:
+            self._dice_hash = keys.get_dice_hash(self.dice)
+            self._hashed_dice = dice_key
+
+        dice_combination = tuple(self.current_dice_combination)
+        if dice_combination != self._hashed_dice_combination:
+            self._dice_combination_hash = keys.get_combination_hash(dice_combination)
+            self._hashed_dice_combination = dice_combination
+
+        return self._sheet_hash ^ self._dice_hash ^ self._dice_combination_hash ^ keys.get_features_hash(self._get_hashed_features())
+
+    def snapshot(self, *, include_dice_state=True):
+        # the sections metadata is shared, only the mutable parts of the game are saved,
+        # the dice are part of the deterministic game so their state is kept by default
+        return RollAndRakeSnapshot(
+            current_turn=self.current_turn,
+            green_track=self.green_track,
+            game_phase=self.game_phase,
+            rerolls_available=self.rerolls_available,
+            dice_combination_choices_available=self.dice_combination_choices_available,
+            current_section_index=self.current_section_index,
+            is_done=self.is_done,
+            green_die_value=self.green_die_value,
+            available_dice=self.dice.get_key(),
+            current_dice_combination=tuple(self.current_dice_combination),
+            bonuses_available=tuple(self.bonuses_available),
+            tick_lists=tuple(section.tick_list.copy() for section in self.sections),
+            section_scores=tuple(self.section_scores),
+            current_score=self.current_score,
+            sections_hashes=tuple(self._sections_hashes),
+            random_state=self.dice_source.get_state() if include_dice_state else None
+        )
+
+    def restore(self, snapshot):
+        self.current_turn = snapshot.current_turn
+        self.green_track = snapshot.green_track
+        self.game_phase = snapshot.game_phase
+        self.rerolls_available = snapshot.rerolls_available
+        self.dice_combination_choices_available = snapshot.dice_combination_choices_available
+        self.current_section_index = snapshot.current_section_index
+        self.is_done = snapshot.is_done
+        self.green_die_value = snapshot.green_die_value
+        self.dice.set_values(snapshot.available_dice)
+        self.current_dice_combination = list(snapshot.current_dice_combination)
+        self.bonuses_available = list(snapshot.bonuses_available)
+        for section, tick_list in zip(self.sections, snapshot.tick_lists):
+            section.tick_list[:] = tick_list
+        self.section_scores = list(snapshot.section_scores)
+        self.current_score = snapshot.current_score
+        self._sections_hashes = list(snapshot.sections_hashes)
+        self._sheet_hash = reduce(xor, self._sections_hashes, 0)
+        self._dirty_sections = set(range(len(self.sections)))
+        if snapshot.random_state is not None:
+            self.dice_source.set_state(snapshot.random_state)
+
+    def clone(self):
+        # cheaper than copy.deepcopy, the sections metadata and the legal action tables are shared
+        state = self.__class__.__new__(self.__class__)
+        state.__dict__.update(self.__dict__)
+        state.dice = self.dice.copy()
+        state.current_dice_combination = list(self.current_dice_combination)
+        state.bonuses_available = list(self.bonuses_available)
+        state.sections = [section.copy() for section in self.sections]
+        state.section_scores = list(self.section_scores)
+        state.observation_writer = self.observation_writer.copy()
+        state._dirty_sections = set(self._dirty_sections)
+        state._sections_hashes = list(self._sections_hashes)
+        state._legal_actions_mask = self._legal_actions_mask.copy()
+        state._read_only_legal_actions_mask = state._legal_actions_mask.view()
+        state._read_only_legal_actions_mask.setflags(write=False)
+        state.dice_source = self.dice_source.copy()
+        return state
 
     def _get_sections_tick_lists(self):
         sections = []
@@ -354,7 +579,7 @@ class RollAndRakeState(object):
         details_arr.append(f"dice_combination_choices_available: {self.dice_combination_choices_available}")
         details_arr.append(f"remaining time: {self.green_track} (out of 40)")
         details_arr.append(f"current_score: {self.get_current_score()}")
-        details_arr.append(f"elliott scoring: {self.sections[1].get_score()}")
+        details_arr.append(f"elliott scoring: {self.section_scores[1]}")
         details = "\n".join(details_arr)
 
         available_dice = "available dice:" + "\n"
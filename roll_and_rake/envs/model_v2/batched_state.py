@@ -0,0 +1,200 @@
+from .classes import Die
+from .enums import MoveType
+from .bitboard_state import get_bitboard_layout
+from .legal_action_tables import DICE_COLORS
+from .roll_and_rake_state import CATEGORY_DICE_INDICES
+from ..common.dice_subsets import DICE_NUMBER, SUBSET_INDICES
+import numpy as np
+
+# bit i of subset j is set when die i is chosen by the action index j
+SUBSET_DICE_MASKS = np.array([[i in dice_indices for i in range(DICE_NUMBER)] for dice_indices in SUBSET_INDICES], dtype=bool)
+DICE_POWERS = 6**np.arange(DICE_NUMBER)
+DICE_BITS = 1 << np.arange(DICE_NUMBER)
+
+class BatchedRollAndRakeState(object):
+    """
+    N Roll & Rake games stored as stacked arrays and stepped together:
+    dice, legality, category dice selection and end of turn are array operations,
+    ticking a continuos section goes through a transition table (filled on
+    first use) keyed by the section cells and the dice used
+    """
+
+    def __init__(self, games_number, seed=None):
+        self.games_number = games_number
+        self.layout = get_bitboard_layout()
+        self.legal_action_tables = self.layout.legal_action_tables
+        self.random_generator = np.random.default_rng(seed)
+
+        self.max_time_value = 60
+
+        layout = self.layout
+        tables = self.legal_action_tables
+        self.sections_number = len(layout.sections)
+        self.cells_number = layout.cells_number
+
+        # cells whose emptiness opens a legality bit (full cell of continuos sections, every irregular cell)
+        open_cells = []
+        open_cells_bits = []
+        for index, section in enumerate(layout.sections):
+            if layout.is_irregular[index]:
+                for cell, cell_bit in enumerate(tables.cell_bits[index]):
+                    open_cells.append(layout.offsets[index] + cell)
+                    open_cells_bits.append(cell_bit)
+            else:
+                open_cells.append(layout.offsets[index] + section.row_geometry.full_cell)
+                open_cells_bits.append(tables.section_bits[index])
+        self.open_cells = np.array(open_cells)
+        self.open_cells_bits = np.array(open_cells_bits, dtype=np.int64)
+        self.section_bits = np.array(tables.section_bits, dtype=np.int64)
+        self.subset_bits = tables.subset_bits.astype(np.int64)
+
+        self._tick_cache = {}
+        self._score_cache = {}
+        self.empty_section_scores = np.array([self._get_section_score(index, np.zeros(size, dtype=np.int8)) for index, size in enumerate(layout.sizes)])
+
+        games = self.games_number
+        self.current_turn = np.zeros(games, dtype=np.int32)
+        self.green_track = np.zeros(games, dtype=np.int32)
+        self.available_dice = np.zeros((games, DICE_NUMBER), dtype=np.int8)
+        self.green_die_value = np.zeros(games, dtype=np.int8)
+        self.ticks = np.zeros((games, self.cells_number), dtype=np.int8)
+        self.section_scores = np.zeros((games, self.sections_number))
+        self.scores = np.zeros(games)
+        self.is_done = np.zeros(games, dtype=bool)
+
+        self.reset()
+
+    def reset(self, games_mask=None):
+        if games_mask is None:
+            games_mask = np.ones(self.games_number, dtype=bool)
+
+        self.current_turn[games_mask] = 0
+        self.green_track[games_mask] = 60
+        self.ticks[games_mask] = 0
+        self.section_scores[games_mask] = self.empty_section_scores
+        self.scores[games_mask] = self.empty_section_scores.sum()
+        self.is_done[games_mask] = False
+
+        self._generate_new_dice(games_mask)
+
+    def _generate_new_dice(self, games_mask):
+        games_number = np.count_nonzero(games_mask)
+        self.available_dice[games_mask] = self.random_generator.integers(1, 7, size=(games_number, DICE_NUMBER))
+        self.green_die_value[games_mask] = self.available_dice[games_mask, DICE_NUMBER - 1]
+
+    def _get_section_cells(self, game_index, section_index):
+        offset = self.layout.offsets[section_index]
+        return self.ticks[game_index, offset:offset + self.layout.sizes[section_index]]
+
+    def _get_section_score(self, section_index, cells):
+        key = (section_index, cells.tobytes())
+        if key not in self._score_cache:
+            section = self.layout.sections[section_index]
+            section.tick_list = cells.astype(float)
+            self._score_cache[key] = section.get_score()
+        return self._score_cache[key]
+
+    def _tick_continuos_section(self, game_index, section_index, dice_values):
+        cells = self._get_section_cells(game_index, section_index)
+        key = (section_index, cells.tobytes(), dice_values)
+        if key not in self._tick_cache:
+            section = self.layout.sections[section_index]
+            dice = [Die(DICE_COLORS[index], value) for index, value in enumerate(dice_values) if value != 0]
+            ticks = section.dice_to_tick_converter.value(dice)
+            tick_list = cells.astype(float)
+            section.tick_strategy.value(tick_list, section.row_lengths, section.min_ticks_to_fullfill_row, ticks, row_geometry=section.row_geometry)
+            self._tick_cache[key] = tick_list.astype(np.int8)
+        cells[:] = self._tick_cache[key]
+
+    def _update_section_scores(self, games_indices, sections_indices):
+        scores_delta = np.zeros(len(games_indices))
+        for index, (game_index, section_index) in enumerate(zip(games_indices, sections_indices)):
+            section_score = self._get_section_score(section_index, self._get_section_cells(game_index, section_index))
+            scores_delta[index] = section_score - self.section_scores[game_index, section_index]
+            self.section_scores[game_index, section_index] = section_score
+        self.scores[games_indices] += scores_delta
+        return scores_delta
+
+    def _encode_dice(self):
+        taken_dice = self.available_dice == 0
+        roll_codes = (np.maximum(self.available_dice.astype(np.int64) - 1, 0) * DICE_POWERS).sum(axis=1)
+        taken_masks = (taken_dice * DICE_BITS).sum(axis=1)
+        return (roll_codes, taken_masks)
+
+    def get_open_bits(self):
+        return ((self.ticks[:, self.open_cells] == 0) * self.open_cells_bits).sum(axis=1)
+
+    def _get_categories_dice_indices(self):
+        """
+        first dice combination (as action index) that can tick each category,
+        0 when there is none, shape (games, categories)
+        """
+        tables = self.legal_action_tables
+        roll_codes, taken_masks = self._encode_dice()
+        subset_bits = np.where(tables.untaken_subsets[taken_masks], self.subset_bits[roll_codes], 0)
+        open_bits = self.get_open_bits()
+
+        categories_dice_indices = np.zeros((self.games_number, MoveType.ChooseCategory.value), dtype=np.int64)
+        for category_index in range(MoveType.ChooseCategory.value):
+            dice_indices = CATEGORY_DICE_INDICES[category_index]
+            usable_dice = (subset_bits[:, dice_indices - 1] & (open_bits & self.section_bits[category_index])[:, None]) != 0
+            categories_dice_indices[:, category_index] = np.where(usable_dice.any(axis=1), dice_indices[usable_dice.argmax(axis=1)], 0)
+        return categories_dice_indices
+
+    def get_legal_actions_mask(self):
+        mask = np.zeros((self.games_number, MoveType.Pass.value), dtype=bool)
+        mask[:, :MoveType.ChooseCategory.value] = self._get_categories_dice_indices() != 0
+        mask[:, MoveType.ChooseCategory.value] = True
+        return mask
+
+    def to_observation(self):
+        games = self.games_number
+        # die values between 1 and 6
+        one_hot_available_dice = np.eye(7, dtype=np.float32)[self.available_dice][:, :, 1:].reshape(games, -1)
+        binary_sections = (self.ticks != 0).astype(np.float32)
+        metadata = (self.green_track / self.max_time_value).astype(np.float32)[:, None]
+
+        return np.concatenate([one_hot_available_dice, binary_sections, metadata, self.get_legal_actions_mask()], axis=1, dtype=np.float32)
+
+    def step(self, env_actions_indices):
+        """
+        steps every game with its action, illegal actions leave the game untouched,
+        returns the score delta of every game
+        """
+        env_actions_indices = np.asarray(env_actions_indices)
+        games_indices = np.arange(self.games_number)
+        scores_delta = np.zeros(self.games_number)
+
+        categories_dice_indices = self._get_categories_dice_indices()
+        category = (env_actions_indices < MoveType.ChooseCategory.value) & ~self.is_done
+        dice_indices = np.where(category, categories_dice_indices[games_indices, np.minimum(env_actions_indices, MoveType.ChooseCategory.value - 1)], 0)
+        category &= dice_indices != 0
+        end_turn = category | ((env_actions_indices == MoveType.ChooseCategory.value) & ~self.is_done)
+
+        is_irregular = np.array(self.layout.is_irregular)
+        category_games = np.flatnonzero(category)
+        for game_index in category_games:
+            section_index = env_actions_indices[game_index]
+            if is_irregular[section_index]:
+                self._get_section_cells(game_index, section_index)[self.green_die_value[game_index] - 1] = 9
+            else:
+                dice_values = np.where(SUBSET_DICE_MASKS[dice_indices[game_index]], self.available_dice[game_index], 0)
+                self._tick_continuos_section(game_index, section_index, tuple(dice_values.tolist()))
+        scores_delta[category_games] = self._update_section_scores(category_games, env_actions_indices[category_games])
+
+        if end_turn.any():
+            self._end_turn(end_turn)
+
+        return scores_delta
+
+    def _end_turn(self, games_mask):
+        self.green_track[games_mask] = np.maximum(self.green_track[games_mask] - self.green_die_value[games_mask], 0)
+
+        self.current_turn[games_mask] += 1
+
+        self._generate_new_dice(games_mask)
+
+        self.is_done[games_mask] = self.green_track[games_mask] <= 0
+
+    def get_current_scores(self):
+        return self.scores.copy()
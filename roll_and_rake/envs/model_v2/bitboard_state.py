@@ -0,0 +1,501 @@
+from .classes import Die, Color, make_section
+from .enums import MoveType
+from .legal_action_tables import get_legal_action_tables
+from ..common.observation_writer import ObservationWriter
+from ..common.dice_source import DiceSource
+from ..common.section_kinds import CONTINUOS_SECTION
+from ..common.dice_subsets import SUBSET_GETTERS
+from .roll_and_rake_state import RollAndRakeState, CATEGORY_DICE_INDICES
+from typing import NamedTuple
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from utils_v2.utils import get_sections_metadata
+
+# bits used to store a single die value (1-6) in the value lane
+VALUE_BITS = 3
+VALUE_MASK = (1 << VALUE_BITS) - 1
+
+class Afterstates(NamedTuple):
+    """
+    post-decision games reachable with the current dice, one entry per distinct
+    sheet: the env actions leading there, the score they make and the
+    encoded sheet and values reached
+    """
+    actions: list
+    score_deltas: np.ndarray
+    sheets: list
+    values: list
+
+class BitboardLayout(object):
+    """
+    packs the scoresheet of every section into two integers:
+    - sheet: one bit per cell (bit set when the cell is ticked)
+    - values: VALUE_BITS per cell of the sections storing die values (Elliott)
+
+    the section objects are only used as rule descriptors, every transition
+    and score is computed once on a scratch tick_list and then memoized
+    """
+
+    def __init__(self, sections_metadata):
+        self.sections = [make_section(section_metadata) for section_metadata in sections_metadata]
+
+        self.offsets = []
+        self.sizes = []
+        self.section_masks = []
+        self.full_masks = []
+        self.value_offsets = []
+        self.is_irregular = []
+
+        cells_number = 0
+        values_number = 0
+        for section in self.sections:
+            size = len(section.tick_list)
+            self.offsets.append(cells_number)
+            self.sizes.append(size)
+            self.section_masks.append(((1 << size) - 1) << cells_number)
+
+            if section.kind == CONTINUOS_SECTION:
+                # a continuos section is full as soon as the last row reaches its minimum ticks
+                self.full_masks.append(1 << (cells_number + section.row_geometry.full_cell))
+                self.is_irregular.append(False)
+            else:
+                self.full_masks.append(self.section_masks[-1])
+                self.is_irregular.append(True)
+
+            if section.stores_die_values:
+                self.value_offsets.append(values_number)
+                values_number += size * VALUE_BITS
+            else:
+                self.value_offsets.append(None)
+
+            cells_number += size
+
+        self.cells_number = cells_number
+        self.sheet_bytes = (cells_number + 7) // 8
+
+        self._tick_cache = {}
+        self._score_cache = {}
+
+        self.legal_action_tables = get_legal_action_tables()
+
+        # candidate dice subsets of every category, rows padded by repeating their last candidate
+        candidates_number = max(len(dice_indices) for dice_indices in CATEGORY_DICE_INDICES)
+        self.category_dice_indices = np.array([np.pad(dice_indices, (0, candidates_number - len(dice_indices)), mode="edge") for dice_indices in CATEGORY_DICE_INDICES])
+        self.category_bits = np.array(self.legal_action_tables.section_bits, dtype=self.legal_action_tables.dtype)
+
+    def get_section_bits(self, index, sheet):
+        return (sheet >> self.offsets[index]) & ((1 << self.sizes[index]) - 1)
+
+    def get_section_values(self, index, values):
+        value_offset = self.value_offsets[index]
+        if value_offset is None:
+            return 0
+        return (values >> value_offset) & ((1 << (self.sizes[index] * VALUE_BITS)) - 1)
+
+    def decode_section(self, index, sheet, values):
+        section_bits = self.get_section_bits(index, sheet)
+        section_values = self.get_section_values(index, values)
+
+        tick_list = np.zeros(self.sizes[index])
+        for cell in range(self.sizes[index]):
+            if section_bits & (1 << cell):
+                if self.value_offsets[index] is None:
+                    tick_list[cell] = 9
+                else:
+                    tick_list[cell] = (section_values >> (cell * VALUE_BITS)) & VALUE_MASK
+        return tick_list
+
+    def encode_section(self, index, tick_list):
+        section_bits = 0
+        section_values = 0
+        for cell, tick in enumerate(tick_list):
+            if tick != 0:
+                section_bits |= 1 << cell
+                if self.value_offsets[index] is not None:
+                    section_values |= int(tick) << (cell * VALUE_BITS)
+
+        if self.value_offsets[index] is None:
+            return (section_bits << self.offsets[index], 0)
+        return (section_bits << self.offsets[index], section_values << self.value_offsets[index])
+
+    def encode(self, tick_lists):
+        sheet = 0
+        values = 0
+        for index, tick_list in enumerate(tick_lists):
+            section_sheet, section_values = self.encode_section(index, tick_list)
+            sheet |= section_sheet
+            values |= section_values
+        return (sheet, values)
+
+    def tick(self, index, sheet, values, dice, env_choices=None):
+        if self.is_irregular[index]:
+            for choice in env_choices:
+                sheet |= 1 << (self.offsets[index] + choice)
+            return (sheet, values)
+
+        section = self.sections[index]
+        ticks = tuple(section.dice_to_tick_converter.value(dice))
+        section_bits = self.get_section_bits(index, sheet)
+        section_values = self.get_section_values(index, values)
+
+        key = (index, section_bits, section_values, ticks)
+        if key not in self._tick_cache:
+            tick_list = self.decode_section(index, sheet, values)
+            section.tick_strategy.value(tick_list, section.row_lengths, section.min_ticks_to_fullfill_row, list(ticks), row_geometry=section.row_geometry)
+            self._tick_cache[key] = self.encode_section(index, tick_list)
+
+        new_section_sheet, new_section_values = self._tick_cache[key]
+        sheet = (sheet & ~self.section_masks[index]) | new_section_sheet
+        if self.value_offsets[index] is not None:
+            lane_mask = ((1 << (self.sizes[index] * VALUE_BITS)) - 1) << self.value_offsets[index]
+            values = (values & ~lane_mask) | new_section_values
+        return (sheet, values)
+
+    def get_section_score(self, index, sheet, values):
+        key = (index, self.get_section_bits(index, sheet), self.get_section_values(index, values))
+        if key not in self._score_cache:
+            section = self.sections[index]
+            section.tick_list = self.decode_section(index, sheet, values)
+            self._score_cache[key] = section.get_score()
+        return self._score_cache[key]
+
+    def get_score(self, sheet, values):
+        return sum(self.get_section_score(index, sheet, values) for index in range(len(self.sections)))
+
+    def get_open_bits(self, sheet):
+        """
+        translates the sheet into the open bits of the legal action tables:
+        continuos sections not full and irregular cells not ticked yet
+        """
+        tables = self.legal_action_tables
+        open_bits = 0
+        for index in range(len(self.sections)):
+            if self.is_irregular[index]:
+                for cell, cell_bit in enumerate(tables.cell_bits[index]):
+                    if not sheet & (1 << (self.offsets[index] + cell)):
+                        open_bits |= cell_bit
+            elif not sheet & self.full_masks[index]:
+                open_bits |= tables.section_bits[index]
+        return open_bits
+
+    def enumerate_afterstates(self, sheet, values, *, available_dice, green_die_value):
+        """
+        every distinct sheet reached by ticking a category with the current dice,
+        each category uses its first dice combination able to tick it (as in step),
+        passing is not listed
+        """
+        tables = self.legal_action_tables
+        roll_code, taken_mask = tables.encode_dice(available_dice)
+        open_bits = self.get_open_bits(sheet)
+
+        # open bits of every (category, candidate subset) pair, each category uses its first legal candidate
+        subset_bits = np.where(tables.untaken_subsets[taken_mask], tables.subset_bits[roll_code], 0)
+        candidates = (subset_bits[self.category_dice_indices - 1] & (self.category_bits & open_bits)[:, None]) != 0
+        first_candidates = candidates.argmax(axis=1)
+
+        afterstates = {}
+        for category_index in np.flatnonzero(candidates.any(axis=1)).tolist():
+            dice_index = int(self.category_dice_indices[category_index, first_candidates[category_index]])
+            dice_combination = SUBSET_GETTERS[dice_index](available_dice)
+            env_choices = [green_die_value - 1] if self.is_irregular[category_index] else None
+            next_sheet, next_values = self.tick(category_index, sheet, values, dice_combination, env_choices=env_choices)
+            if (next_sheet, next_values) not in afterstates:
+                score_delta = self.get_section_score(category_index, next_sheet, next_values) - self.get_section_score(category_index, sheet, values)
+                afterstates[(next_sheet, next_values)] = ((category_index, ), score_delta)
+
+        return Afterstates(
+            actions=[actions for actions, _ in afterstates.values()],
+            score_deltas=np.array([score_delta for _, score_delta in afterstates.values()], dtype=float),
+            sheets=[next_sheet for next_sheet, _ in afterstates],
+            values=[next_values for _, next_values in afterstates],
+        )
+
+    def to_binary(self, sheet):
+        sheet_bytes = np.frombuffer(sheet.to_bytes(self.sheet_bytes, "little"), dtype=np.uint8)
+        return np.unpackbits(sheet_bytes, bitorder="little")[:self.cells_number]
+
+_layout = None
+
+def get_bitboard_layout():
+    global _layout
+    if _layout is None:
+        _layout = BitboardLayout(get_sections_metadata())
+    return _layout
+
+
+class BitboardRollAndRakeState(object):
+    """
+    alternative RollAndRakeState engine storing the whole scoresheet into
+    machine integers, it exposes the same step, is_action_legal,
+    get_current_score and to_observation contract of RollAndRakeState
+    """
+
+    def __init__(self, seed = None):
+        self.layout = get_bitboard_layout()
+
+        self.current_turn = 0
+        self.green_track = 60
+        self.max_time_value = 60
+        self.current_dice_combination = []
+        self.is_done = False
+
+        self.sheet = 0
+        self.values = 0
+        self.score = self.layout.get_score(self.sheet, self.values)
+
+        self.dice_source = DiceSource(seed)
+        self.available_dice, self.green_die_value = self.generate_new_dice()
+
+        self.observation_writer = self._create_observation_writer()
+        self._observed_dice = None
+        self._observed_sheet = None
+        self._reset_legal_actions_mask()
+        self._open_bits_sheet = None
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.dice_source.seed(seed)
+
+        self.current_turn = 0
+        self.green_track = 60
+        self.current_dice_combination = []
+        self.is_done = False
+
+        self.sheet = 0
+        self.values = 0
+        self.score = self.layout.get_score(self.sheet, self.values)
+
+        self.available_dice, self.green_die_value = self.generate_new_dice()
+
+    def generate_new_dice(self, orange_dice_num=3, brown_dice_num=2, green_dice_num=1):
+        values = self.dice_source.roll(orange_dice_num + brown_dice_num + green_dice_num)
+        orange_dice = [Die(Color.Orange, value) for value in values[:orange_dice_num]]
+        brown_dice = [Die(Color.Brown, value) for value in values[orange_dice_num:orange_dice_num + brown_dice_num]]
+        green_dice = [Die(Color.Green, value) for value in values[orange_dice_num + brown_dice_num:]]
+
+        green_die_value = green_dice[0].value
+        return (orange_dice + brown_dice + green_dice, green_die_value)
+
+    @classmethod
+    def from_state(cls, state):
+        bitboard_state = cls.__new__(cls)
+        bitboard_state.layout = get_bitboard_layout()
+
+        for attribute in ["current_turn", "green_track", "max_time_value", "is_done", "green_die_value"]:
+            setattr(bitboard_state, attribute, getattr(state, attribute))
+
+        bitboard_state.dice_source = state.dice_source.copy()
+        bitboard_state.available_dice = list(state.available_dice)
+        bitboard_state.observation_writer = bitboard_state._create_observation_writer()
+        bitboard_state._observed_dice = None
+        bitboard_state._observed_sheet = None
+        bitboard_state._reset_legal_actions_mask()
+        bitboard_state._open_bits_sheet = None
+        bitboard_state.current_dice_combination = list(state.current_dice_combination)
+        bitboard_state.sheet, bitboard_state.values = bitboard_state.layout.encode([section.tick_list for section in state.sections])
+        bitboard_state.score = bitboard_state.layout.get_score(bitboard_state.sheet, bitboard_state.values)
+        return bitboard_state
+
+    def to_state(self):
+        state = RollAndRakeState()
+        state.dice_source = self.dice_source.copy()
+
+        for attribute in ["current_turn", "green_track", "max_time_value", "is_done", "green_die_value"]:
+            setattr(state, attribute, getattr(self, attribute))
+
+        state.available_dice = list(self.available_dice)
+        state.current_dice_combination = list(self.current_dice_combination)
+        for index, section in enumerate(state.sections):
+            section.tick_list[:] = self.layout.decode_section(index, self.sheet, self.values)
+        state.refresh_scores()
+        return state
+
+    def copy(self):
+        state = self.__class__.__new__(self.__class__)
+        state.__dict__.update(self.__dict__)
+        state.available_dice = list(self.available_dice)
+        state.observation_writer = self.observation_writer.copy()
+        state._reset_legal_actions_mask()
+        state.current_dice_combination = list(self.current_dice_combination)
+        # independent substream, as for the clones of RollAndRakeState
+        state.dice_source = self.dice_source.spawn(1)[0]
+        return state
+
+    def key(self):
+        return (self.sheet, self.values, tuple(self.available_dice), self.green_track, self.green_die_value)
+
+    def __eq__(self, other):
+        return isinstance(other, BitboardRollAndRakeState) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def _get_one_hot_encoding(self, *, of_value, with_max_bit_size):
+        value = of_value
+        max_bit_size = with_max_bit_size
+
+        if value > max_bit_size:
+            raise Exception("Value out of bounds")
+
+        return [1 if (i + 1) == value else 0 for i in range(max_bit_size)]
+
+    def _get_sections_tick_lists(self):
+        return [self.layout.decode_section(index, self.sheet, self.values) for index in range(len(self.layout.sections))]
+
+    def _create_observation_writer(self):
+        return ObservationWriter([
+            ("available_dice", len(self.available_dice) * 6),
+            ("sections", self.layout.cells_number),
+            ("metadata", 1, (self.max_time_value,)),
+            ("legal_actions", MoveType.Pass.value)
+        ])
+
+    def to_observation(self, *, copy=True):
+        observation_writer = self.observation_writer
+
+        available_dice = tuple(self.available_dice)
+        if available_dice != self._observed_dice:
+            # die values between 1 and 6
+            one_hot_available_dice = observation_writer.get_slice("available_dice").reshape(len(available_dice), 6)
+            one_hot_available_dice[:] = 0
+            for index, die in enumerate(available_dice):
+                if die.value > 0:
+                    one_hot_available_dice[index, die.value - 1] = 1
+            self._observed_dice = available_dice
+
+        if self.sheet != self._observed_sheet:
+            observation_writer.write("sections", self.layout.to_binary(self.sheet))
+            self._observed_sheet = self.sheet
+
+        time_value = self.green_track / self.max_time_value
+        observation_writer.write("metadata", (time_value,))
+
+        observation_writer.write("legal_actions", self.get_legal_actions_mask())
+        return observation_writer.get_observation(copy=copy)
+
+    def _get_dice_combination(self, *, with_action_index):
+        action_index = with_action_index
+
+        dice_combination = SUBSET_GETTERS[action_index](self.available_dice)
+        for die in dice_combination:
+            if die.value == 0:
+                return ()
+        return dice_combination
+
+    def _get_category_dice_index(self, category_index):
+        # first dice combination that can tick the category, None if there is none
+        tables = self.layout.legal_action_tables
+        roll_code, taken_mask = tables.encode_dice(self.available_dice)
+        open_bits = self.layout.get_open_bits(self.sheet) & tables.section_bits[category_index]
+        for dice_index in CATEGORY_DICE_INDICES[category_index]:
+            if tables.untaken_subsets[taken_mask, dice_index - 1] and int(tables.subset_bits[roll_code, dice_index - 1]) & open_bits:
+                return dice_index
+        return None
+
+    def get_legal_actions_mask(self):
+        # the mask is kept across calls, the categories range is recomputed only when the dice or the open cells changed
+        tables = self.layout.legal_action_tables
+        mask = self._legal_actions_mask
+
+        roll_code, taken_mask = tables.encode_dice(self.available_dice)
+        open_bits = self._get_open_bits()
+
+        category_key = (roll_code, taken_mask, open_bits)
+        if category_key == self._legal_ranges_keys:
+            return self._read_only_legal_actions_mask
+
+        subset_bits = np.where(tables.untaken_subsets[taken_mask], tables.subset_bits[roll_code], 0)
+        for category_index in range(MoveType.ChooseCategory.value):
+            dice_bits = np.bitwise_or.reduce(subset_bits[CATEGORY_DICE_INDICES[category_index] - 1])
+            mask[category_index] = bool(int(dice_bits) & open_bits & tables.section_bits[category_index])
+
+        self._legal_ranges_keys = category_key
+        self._legal_env_actions_indices = None
+        return self._read_only_legal_actions_mask
+
+    def _reset_legal_actions_mask(self):
+        self._legal_actions_mask = np.zeros(MoveType.Pass.value, dtype=bool)
+        self._legal_actions_mask[MoveType.Pass.value - 1] = True
+        self._read_only_legal_actions_mask = self._legal_actions_mask.view()
+        self._read_only_legal_actions_mask.setflags(write=False)
+        self._legal_ranges_keys = None
+        self._legal_env_actions_indices = None
+
+    def get_legal_env_actions_indices(self):
+        mask = self.get_legal_actions_mask()
+        if self._legal_env_actions_indices is None:
+            self._legal_env_actions_indices = np.flatnonzero(mask).tolist()
+        return list(self._legal_env_actions_indices)
+
+    def _get_open_bits(self):
+        if self.sheet != self._open_bits_sheet:
+            self._open_bits = self.layout.get_open_bits(self.sheet)
+            self._open_bits_sheet = self.sheet
+        return self._open_bits
+
+    def is_action_legal(self, *, env_action_index):
+        if env_action_index < 0 or env_action_index >= MoveType.Pass.value:
+            raise Exception("action index out of bounds")
+
+        if env_action_index < MoveType.ChooseCategory.value:
+            return self._get_category_dice_index(env_action_index) is not None
+
+        return True
+
+    def step(self, *, with_env_action_index):
+        env_action_index = with_env_action_index
+        score_delta = 0
+
+        if not self.is_action_legal(env_action_index=env_action_index):
+            print(f"Error: The provided action is illegal {env_action_index}")
+            return score_delta
+
+        if env_action_index < MoveType.ChooseCategory.value:
+            dice_index = self._get_category_dice_index(env_action_index)
+            dice_combination = self._get_dice_combination(with_action_index=dice_index)
+
+            if self.layout.is_irregular[env_action_index]:
+                score_delta = self._tick_section(env_action_index, dice_combination, env_choices=[self.green_die_value - 1])
+            else:
+                score_delta = self._tick_section(env_action_index, dice_combination)
+
+        self._end_turn()
+
+        return score_delta
+
+    def _end_turn(self):
+        self.green_track = max(self.green_track - self.green_die_value, 0)
+
+        self.current_turn += 1
+
+        self.current_dice_combination = []
+
+        self.available_dice, self.green_die_value = self.generate_new_dice()
+
+        if self.green_track <= 0:
+            self.is_done = True
+
+    def _tick_section(self, index, dice, env_choices=None):
+        starting_section_score = self.layout.get_section_score(index, self.sheet, self.values)
+        self.sheet, self.values = self.layout.tick(index, self.sheet, self.values, dice, env_choices=env_choices)
+        score_delta = self.layout.get_section_score(index, self.sheet, self.values) - starting_section_score
+        self.score += score_delta
+        return score_delta
+
+    def enumerate_afterstates(self):
+        return self.layout.enumerate_afterstates(self.sheet, self.values, available_dice=self.available_dice, green_die_value=self.green_die_value)
+
+    def get_current_score(self):
+        return self.score
+
+    def __str__(self):
+        return str(self.to_state())
@@ -4,6 +4,12 @@ import numpy as np
 from math import ceil
 import re
 
+try:
+    from ..common.row_geometry import get_row_geometry
+except ImportError:
+    # imported as a top-level module through the sections metadata utils
+    from common.row_geometry import get_row_geometry
+
 class Color(Enum):
     Orange = "\U0001F7E7"
     Brown = "\U0001F7EB"
@@ -48,24 +54,25 @@ class DiceToTickConverter(Enum):
     EachValuePerDie = partial(each_value_per_die_converter)
 
 
-def continuos_tick_function(tick_list, row_lengths, min_ticks_to_fullfill_row, ticks):
-    row_lengths_indices = [[i] * v for i, v in enumerate(row_lengths)]
-    row_lengths_indices_flatten = [y for x in row_lengths_indices for y in x]
-    elements_different_than_zero_indices = np.where(tick_list != 0)[0]
+def continuos_tick_function(tick_list, row_lengths, min_ticks_to_fullfill_row, ticks, row_geometry=None):
+    # returns the (cell, previous value) pairs of the cells written
+    if row_geometry is None:
+        row_geometry = get_row_geometry(row_lengths)
+
+    elements_different_than_zero_indices = np.flatnonzero(tick_list)
     first_empty_cell_index = 0
-    if list(elements_different_than_zero_indices):
+    if len(elements_different_than_zero_indices):
         first_empty_cell_index = elements_different_than_zero_indices[-1] + 1
 
-    current_row_index = row_lengths_indices_flatten[first_empty_cell_index]
-    row_lengths_indices_arr = np.array(row_lengths_indices_flatten)
-    current_row_arr_slice_indices = np.where(row_lengths_indices_arr == current_row_index)[0]
+    current_row_index = row_geometry.cell_rows[first_empty_cell_index]
+    current_row_start, current_row_end = row_geometry.row_bounds[current_row_index]
     current_row_first_empty_cell_index = 0
 
-    if tick_list[current_row_arr_slice_indices][min_ticks_to_fullfill_row - 1] != 0:
+    if tick_list[current_row_start + min_ticks_to_fullfill_row - 1] != 0:
         current_row_index += 1
-        current_row_arr_slice_indices = np.where(row_lengths_indices_arr == current_row_index)[0]
+        current_row_start, current_row_end = row_geometry.row_bounds[current_row_index]
     else:
-        current_row_first_empty_cell_index = list(tick_list[current_row_arr_slice_indices]).index(0)
+        current_row_first_empty_cell_index = list(tick_list[current_row_start:current_row_end]).index(0)
 
     max_elements_to_add = max(row_lengths[current_row_index] - current_row_first_empty_cell_index, 0)
     
@@ -73,16 +80,26 @@ def continuos_tick_function(tick_list, row_lengths, min_ticks_to_fullfill_row, t
     # the ticks already present are neutral (9) or empty (0)
     # then we overwrite thei values 
     if max_elements_to_add < len(ticks) and \
-        len(tick_list[current_row_arr_slice_indices]) >= len(ticks) and \
-        all([tick in [0, 9] for tick in tick_list[current_row_arr_slice_indices[-len(ticks):]]]):
-        tick_list[current_row_arr_slice_indices[-len(ticks):]] = ticks
-        return
-
-    tick_list[current_row_arr_slice_indices[current_row_first_empty_cell_index:current_row_first_empty_cell_index + min(len(ticks), max_elements_to_add)]] = ticks[:min(len(ticks), max_elements_to_add)]
+        current_row_end - current_row_start >= len(ticks) and \
+        all([tick in [0, 9] for tick in tick_list[current_row_end - len(ticks):current_row_end]]):
+        first_cell_index = current_row_end - len(ticks)
+        ticked_cells = list(enumerate(tick_list[first_cell_index:current_row_end].tolist(), first_cell_index))
+        tick_list[first_cell_index:current_row_end] = ticks
+        return ticked_cells
+
+    elements_to_add = min(len(ticks), max_elements_to_add)
+    first_cell_index = current_row_start + current_row_first_empty_cell_index
+    ticked_cells = list(enumerate(tick_list[first_cell_index:first_cell_index + elements_to_add].tolist(), first_cell_index))
+    tick_list[first_cell_index:first_cell_index + elements_to_add] = ticks[:elements_to_add]
+    return ticked_cells
 
 def irregular_tick_function(tick_list, env_choices):
+    # returns the (cell, previous value) pairs of the cells written
+    ticked_cells = []
     for choice in env_choices:
+        ticked_cells.append((choice, tick_list[choice]))
         tick_list[choice] = 9
+    return ticked_cells
 
 class TickStrategy(Enum):
     ContinuosTick = partial(continuos_tick_function)
@@ -185,13 +202,13 @@ def set_collection_scoring(tick_list, bonuses):
 
     return set_collection_points[items_counter]
 
-def highest_row_sum_scoring(tick_list, row_lengths):
-    row_lengths_indices = [[i] * v for i, v in enumerate(row_lengths)]
-    row_lengths_indices_flatten = [y for x in row_lengths_indices for y in x]
+def highest_row_sum_scoring(tick_list, row_lengths, row_geometry=None):
+    if row_geometry is None:
+        row_geometry = get_row_geometry(row_lengths)
 
     rows_sums = []
-    for index in range(len(row_lengths)):
-        rows_sums.append(sum([tick_list[i] if tick_list[i] != 9 else 0 for i, v in enumerate(row_lengths_indices_flatten) if v == index]))
+    for row_start, row_end in row_geometry.row_bounds:
+        rows_sums.append(sum([tick for tick in tick_list[row_start:row_end] if tick != 9]))
         
     return max(rows_sums)
 
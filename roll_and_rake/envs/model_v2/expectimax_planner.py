@@ -0,0 +1,233 @@
+from .classes import Die
+from .enums import MoveType
+from .bitboard_state import get_bitboard_layout
+from .legal_action_tables import DICE_COLORS
+from .roll_and_rake_state import CATEGORY_DICE_INDICES
+from ..common.dice_subsets import DICE_NUMBER, SUBSET_GETTERS
+from ..common.section_kinds import IRREGULAR_SECTION
+from ..common.section_value_tables import get_metadata_path
+from collections import Counter
+import hashlib
+from itertools import product
+import numpy as np
+
+# bits of the packed key storing the green track (at most 60)
+GREEN_TRACK_BITS = 6
+# bumped whenever the keys or values of the saved tables change, older tables are then rejected
+TABLE_VERSION = 1
+
+class SectionTransitions(object):
+    """
+    every configuration a section can reach during a game, numbered in order of discovery,
+    with its score and the configuration reached by each move:
+    the number of ticks for a continuos section, the cell ticked for an irregular one
+    """
+
+    def __init__(self, section):
+        self.is_irregular = section.kind == IRREGULAR_SECTION
+        if self.is_irregular:
+            moves = range(len(section.tick_list))
+        else:
+            moves = sorted({len(dice_requirement.colors) for dice_requirement in section.dice_requirements})
+
+        empty_tick_list = tuple(np.zeros(len(section.tick_list)).tolist())
+        self.configurations = [empty_tick_list]
+        self.next_configurations = []
+        configurations_indices = {empty_tick_list: 0}
+
+        configuration_index = 0
+        while configuration_index < len(self.configurations):
+            next_configurations = {}
+            for move in moves:
+                section.tick_list = np.array(self.configurations[configuration_index])
+                if self.is_irregular:
+                    if section.tick_list[move] != 0:
+                        continue
+                    section.tick_strategy.value(section.tick_list, [move])
+                else:
+                    if section.is_full():
+                        continue
+                    section.tick_strategy.value(section.tick_list, section.row_lengths, section.min_ticks_to_fullfill_row, [9] * move, row_geometry=section.row_geometry)
+
+                tick_list = tuple(section.tick_list.tolist())
+                if tick_list not in configurations_indices:
+                    configurations_indices[tick_list] = len(self.configurations)
+                    self.configurations.append(tick_list)
+                next_configurations[move] = configurations_indices[tick_list]
+
+            self.next_configurations.append(next_configurations)
+            configuration_index += 1
+
+        self.scores = section.get_scores(np.array(self.configurations)).tolist()
+        self.configurations_indices = configurations_indices
+        self.bits_number = max(1, (len(self.configurations) - 1).bit_length())
+
+class ExpectimaxPlanner(object):
+    """
+    bounded-horizon expectimax over the v2 game, searched when a move is asked for: a game is
+    the configuration of every section plus the green track, its value is the expected score
+    still to be made playing optimally. the green track left after a move is capped to horizon,
+    so the moves are optimal only once the green track is below it (horizon None searches the
+    whole game, feasible for endgames only: a full green track spans ~6e10 sheets and no table
+    of the whole game is ever built). values are memoized by packed game key and can be
+    saved to / loaded from disk, a loaded table only spares the searches it covers
+    """
+
+    def __init__(self, *, horizon=None):
+        self.horizon = horizon
+        self.layout = get_bitboard_layout()
+        self.sections_transitions = [SectionTransitions(section) for section in self.layout.sections]
+
+        self.shifts = []
+        bits_number = GREEN_TRACK_BITS
+        for section_transitions in self.sections_transitions:
+            self.shifts.append(bits_number)
+            bits_number += section_transitions.bits_number
+
+        self.roll_outcomes = self._get_roll_outcomes()
+        self.values = {}
+
+    def _get_roll_moves(self, dice):
+        # move of every category for the rolled dice, None when the dice can not be used
+        green_die_value = dice[DICE_NUMBER - 1].value
+        moves = []
+        for category_index, section in enumerate(self.layout.sections):
+            if self.sections_transitions[category_index].is_irregular:
+                moves.append(green_die_value - 1)
+                continue
+
+            move = None
+            for dice_index in CATEGORY_DICE_INDICES[category_index]:
+                dice_combination = SUBSET_GETTERS[dice_index](dice)
+                if section.check_dice_requirements(dice=dice_combination):
+                    move = len(dice_combination)
+                    break
+            moves.append(move)
+        return tuple(moves)
+
+    def _get_roll_outcomes(self):
+        """
+        rolls grouped by green die value and moves of every category,
+        the 6^6 rolls collapse into a few hundred outcomes with their probabilities.
+        the moves are stored as slots of the successors values array, the last slot for unusable dice
+        """
+        self.slots = {}
+        for category_index, section_transitions in enumerate(self.sections_transitions):
+            for move in sorted({move for next_configurations in section_transitions.next_configurations for move in next_configurations}):
+                self.slots[(category_index, move)] = len(self.slots)
+        missing_slot = len(self.slots)
+
+        outcomes_counter = Counter()
+        self.roll_moves = {}
+        for dice_values in product(range(1, 7), repeat=DICE_NUMBER):
+            dice = [Die(DICE_COLORS[index], value) for index, value in enumerate(dice_values)]
+            moves = self._get_roll_moves(dice)
+            self.roll_moves[dice_values] = moves
+            outcomes_counter[(dice_values[DICE_NUMBER - 1], moves)] += 1
+
+        rolls_number = 6**DICE_NUMBER
+        roll_outcomes = []
+        for green_die_value in range(1, 7):
+            outcomes = [(moves, count) for (value, moves), count in outcomes_counter.items() if value == green_die_value]
+            outcomes_slots = np.array([[self.slots.get((category_index, move), missing_slot) for category_index, move in enumerate(moves)] for moves, _ in outcomes])
+            probabilities = np.array([count / rolls_number for _, count in outcomes])
+            roll_outcomes.append((green_die_value, outcomes_slots, probabilities))
+        return roll_outcomes
+
+    def encode(self, state):
+        # packed key of the sections configurations, the green track is added by get_key
+        sheet = 0
+        for section_transitions, shift, section in zip(self.sections_transitions, self.shifts, state.sections):
+            sheet |= section_transitions.configurations_indices[tuple(section.tick_list.tolist())] << shift
+        return sheet
+
+    def get_key(self, sheet, green_track):
+        return sheet | green_track
+
+    def _get_configuration(self, sheet, section_index):
+        return (sheet >> self.shifts[section_index]) & ((1 << self.sections_transitions[section_index].bits_number) - 1)
+
+    def _get_successors(self, sheet):
+        # score delta and sheet reached by every legal (category, move)
+        successors = {}
+        for section_index, section_transitions in enumerate(self.sections_transitions):
+            configuration = self._get_configuration(sheet, section_index)
+            score = section_transitions.scores[configuration]
+            for move, next_configuration in section_transitions.next_configurations[configuration].items():
+                next_sheet = sheet + ((next_configuration - configuration) << self.shifts[section_index])
+                successors[(section_index, move)] = (section_transitions.scores[next_configuration] - score, next_sheet)
+        return successors
+
+    def get_value(self, sheet, green_track):
+        """
+        expected score still to be made from sheet with green_track left,
+        before the dice of the turn are rolled
+        """
+        if green_track <= 0:
+            return 0.0
+
+        key = self.get_key(sheet, green_track)
+        value = self.values.get(key)
+        if value is not None:
+            return value
+
+        successors = self._get_successors(sheet)
+        value = 0.0
+        for green_die_value, outcomes_slots, probabilities in self.roll_outcomes:
+            next_green_track = green_track - green_die_value
+            successors_values = np.full(len(self.slots) + 1, -np.inf)
+            for move, (delta, next_sheet) in successors.items():
+                successors_values[self.slots[move]] = delta + self.get_value(next_sheet, next_green_track)
+
+            best_values = np.maximum(successors_values[outcomes_slots].max(axis=1), self.get_value(sheet, next_green_track))
+            value += float(probabilities @ best_values)
+
+        self.values[key] = value
+        return value
+
+    def get_best_action(self, state):
+        """
+        env action index of the best category for the rolled dice of state within the horizon,
+        ChooseCategory (no tick) when no category is worth ticking
+        """
+        sheet = self.encode(state)
+        moves = self.roll_moves[tuple(die.value for die in state.available_dice)]
+        next_green_track = state.green_track - state.green_die_value
+        if self.horizon is not None:
+            next_green_track = min(next_green_track, self.horizon)
+
+        best_action = MoveType.ChooseCategory.value
+        best_value = self.get_value(sheet, next_green_track)
+        successors = self._get_successors(sheet)
+        for category_index, move in enumerate(moves):
+            successor = successors.get((category_index, move))
+            if successor is None:
+                continue
+            delta, next_sheet = successor
+            move_value = delta + self.get_value(next_sheet, next_green_track)
+            if move_value > best_value:
+                best_action, best_value = category_index, move_value
+        return best_action
+
+    def get_table_hash(self):
+        """
+        hash of everything the saved keys and values depend on: the sections metadata (the
+        configurations are numbered in discovery order), the order of the sections and the horizon
+        """
+        with open(get_metadata_path(2), "rb") as metadata_file:
+            metadata_bytes = metadata_file.read()
+        section_names = ",".join(section.name for section in self.layout.sections)
+        return hashlib.sha256(metadata_bytes + f"/{section_names}/{self.horizon}/{TABLE_VERSION}".encode()).hexdigest()
+
+    def save(self, path):
+        # compact table: sorted uint64 keys and float32 values, with the table hash
+        keys = np.fromiter(self.values.keys(), dtype=np.uint64, count=len(self.values))
+        values = np.fromiter(self.values.values(), dtype=np.float32, count=len(self.values))
+        order = np.argsort(keys)
+        np.savez_compressed(path, keys=keys[order], values=values[order], table_hash=np.array(self.get_table_hash()))
+
+    def load(self, path):
+        with np.load(path) as table:
+            if "table_hash" not in table.files or str(table["table_hash"]) != self.get_table_hash():
+                raise Exception("the values table was saved for other sections or another horizon")
+            self.values.update(zip(table["keys"].tolist(), table["values"].astype(float).tolist()))
@@ -1,16 +1,23 @@
 from time import time
 from xml.parsers.expat import model
-from .classes import ContinuosSection, Die, Color, IrregularSection, Section, SectionMetadataContinuos, SectionMetadataIrregular
+from .classes import Die, Color, make_section, _make_die
 from .enums import BonusType, MoveType, RenderType, GameMove
+from .legal_action_tables import get_legal_action_tables
+from ..common.observation_writer import ObservationWriter
+from ..common.zobrist import get_zobrist_keys
+from ..common.dice_source import DiceSource
+from ..common.dice_array import DiceArray
+from ..common.section_kinds import CONTINUOS_SECTION, IRREGULAR_SECTION
+from ..common.dice_subsets import DICE_NUMBER, SUBSETS_NUMBER, SUBSET_GETTERS, SUBSET_INDICES_ARRAYS
 import numpy as np
-from operator import add
+from typing import NamedTuple, Optional
+from operator import xor
 from functools import reduce
 from collections import Counter
 import re
 
 import os
 import sys
-import random
 
 
 parent_dir_path = os.path.abspath(os.path.join(
@@ -21,50 +28,98 @@ sys.path.append(parent_dir_path)
 
 from utils_v2.utils import get_sections_metadata
 
+_sections_templates = None
+
+class RollAndRakeSnapshot(NamedTuple):
+    """
+    mutable part of a RollAndRakeState, the sections metadata is left out
+    """
+    current_turn: int
+    green_track: int
+    is_done: bool
+    green_die_value: int
+    available_dice: bytes
+    current_dice_combination: tuple
+    bonuses_available: tuple
+    tick_lists: tuple
+    section_scores: tuple
+    current_score: float
+    sections_hashes: tuple
+    # state of the dice source, only kept by snapshot(include_dice_state=True)
+    random_state: Optional[tuple] = None
+
+# dice combinations (as action indices) that can be used for each category, in order of preference
+CATEGORY_DICE_INDICES = [
+    np.array([7]),
+    np.array([9, 10, 12, 17, 18, 20]),
+    np.array([32]),
+    np.array([40, 48, 56]),
+    np.array([3, 5, 6, 7]),
+    np.array([24]),
+    np.array([33, 34, 35, 36, 37, 38]),
+    np.array([41, 42, 44, 49, 50, 52])
+]
 
 class RollAndRakeState(object):
-    def __init__(self):
+    def __init__(self, seed = None):
         self.current_turn = 0
         self.green_track = 60
         self.max_time_value = 60
         self.current_dice_combination = []
         self.bonuses_available = []
         self.is_done = False
+        self.legal_action_tables = get_legal_action_tables()
         
-        self.available_dice, self.green_die_value = self.generate_new_dice()
-
-        self.sections = []
-        sections_metadata = get_sections_metadata()
-        for section_metadata in sections_metadata:
-            if self._is_instance(section_metadata, SectionMetadataContinuos):
-                self.sections.append(ContinuosSection(section_metadata))
-            elif self._is_instance(section_metadata, SectionMetadataIrregular):
-                self.sections.append(IrregularSection(section_metadata))
+        self.dice_source = DiceSource(seed)
+        self.dice = DiceArray(_make_die)
+        self.generate_new_dice()
+
+        self.sections = [section.copy() for section in self._get_sections_templates()]
+
+        self.zobrist_keys = get_zobrist_keys([len(section.tick_list) for section in self.sections], len(self._get_hashed_features()))
+        self._hashed_dice = None
+        self._hashed_dice_combination = None
+        self.observation_writer = self._create_observation_writer()
+        self._reset_legal_actions_mask()
+        self._observed_dice = None
+        self.refresh_scores()
     
-    def reset(self):
+    def reset(self, seed=None):
+        if seed is not None:
+            self.dice_source.seed(seed)
+
         self.current_turn = 0
         self.green_track = 60
         self.current_dice_combination = []
         self.bonuses_available = []
         self.is_done = False
 
-        self.available_dice, self.green_die_value = self.generate_new_dice()
+        self.generate_new_dice()
 
         for section in self.sections:
             section.tick_list[:] = 0
 
-    def generate_new_dice(self, orange_dice_num=3, brown_dice_num=2, green_dice_num=1):
-        orange_dice = [Die(Color.Orange, random.randrange(6) + 1) for _ in range(orange_dice_num)]
-        brown_dice = [Die(Color.Brown, random.randrange(6) + 1) for _ in range(brown_dice_num)]
-        green_dice = [Die(Color.Green, random.randrange(6) + 1) for _ in range(green_dice_num)]
-        
-        green_die_value = green_dice[0].value
-        return (orange_dice + brown_dice + green_dice, green_die_value)
+        self.refresh_scores()
+
+    @property
+    def available_dice(self):
+        # Die views of the dice array, assigning a list of dice copies their values into it
+        return self.dice
+
+    @available_dice.setter
+    def available_dice(self, dice):
+        self.dice.set_dice(dice)
+
+    def generate_new_dice(self):
+        self.dice.set_values(self.dice_source.roll(DICE_NUMBER))
+        self.green_die_value = self.dice.values[DICE_NUMBER - 1]
     
-    def _is_instance(self, obj, cls):
-        obj_class = str(type(obj)).split(".")[-1]
-        cls_class = str(cls).split(".")[-1]
-        return obj_class == cls_class
+    def _get_sections_templates(self):
+        # the sections are compiled once per process, every state starts from copies of them
+        global _sections_templates
+        if _sections_templates is None:
+            _sections_templates = [make_section(section_metadata) for section_metadata in get_sections_metadata()]
+        return _sections_templates
 
     def _get_one_hot_encoding(self, *, of_value, with_max_bit_size):
         value = of_value
@@ -83,64 +138,93 @@ class RollAndRakeState(object):
 
         return [1 if x != 0 else 0 for x in tick_list]
 
-    def to_observation(self):
-        
-        one_hot_available_dice = [self._get_one_hot_encoding(of_value=die.value, with_max_bit_size=6) for die in self.available_dice]
-        one_hot_available_dice_flatten = [y for x in one_hot_available_dice for y in x]
-
-        binary_sections = [self._get_binary_encoding(of_tick_list=section.tick_list) for section in self.sections]
-        binary_sections_flatten = [y for x in binary_sections for y in x]
+    def _create_observation_writer(self):
+        return ObservationWriter([
+            ("available_dice", len(self.available_dice) * 6),
+            *[(f"section_{index}", len(section.tick_list)) for index, section in enumerate(self.sections)],
+            ("metadata", 1, (self.max_time_value,)),
+            ("legal_actions", MoveType.Pass.value)
+        ])
+
+    def to_observation(self, *, copy=True):
+        observation_writer = self.observation_writer
+
+        dice_key = self.dice.get_key()
+        if dice_key != self._observed_dice:
+            # die values between 1 and 6
+            one_hot_available_dice = observation_writer.get_slice("available_dice").reshape(DICE_NUMBER, 6)
+            one_hot_available_dice[:] = 0
+            for index, value in enumerate(dice_key):
+                if value > 0:
+                    one_hot_available_dice[index, value - 1] = 1
+            self._observed_dice = dice_key
+
+        for section_index in self._dirty_sections:
+            observation_writer.write(f"section_{section_index}", self.sections[section_index].tick_list != 0)
+        self._dirty_sections.clear()
         
         time_value = self.green_track / self.max_time_value
-        metadata_arr = [time_value]
-
-        legal_actions = [1 if self.is_action_legal(env_action_index=i) else 0 for i in range(MoveType.Pass.value)]
-        return np.array(one_hot_available_dice_flatten + binary_sections_flatten + metadata_arr + legal_actions)
+        observation_writer.write("metadata", (time_value,))
+
+        observation_writer.write("legal_actions", self.get_legal_actions_mask())
+        return observation_writer.get_observation(copy=copy)
+
+    def get_legal_actions_mask(self):
+        # the mask is kept across calls, the categories range is recomputed only when the dice or the open cells changed
+        tables = self.legal_action_tables
+        mask = self._legal_actions_mask
+
+        roll_code, taken_mask = tables.encode_dice_array(self.dice)
+        open_bits = tables.get_open_bits(self.sections)
+
+        category_key = (roll_code, taken_mask, open_bits)
+        self._category_moves_valid = True
+        self._category_moves_dice_version = self.dice.version
+        if category_key == self._legal_ranges_keys:
+            return self._read_only_legal_actions_mask
+
+        # the first dice combination ticking each category is kept for step_unchecked
+        subset_bits = np.where(tables.untaken_subsets[taken_mask], tables.subset_bits[roll_code], 0)
+        category_moves = []
+        for category_index in range(MoveType.ChooseCategory.value):
+            dice_indices = CATEGORY_DICE_INDICES[category_index]
+            category_bits = subset_bits[dice_indices - 1]
+            matches = np.flatnonzero(category_bits & (open_bits & tables.section_bits[category_index]))
+            mask[category_index] = len(matches) > 0
+            category_moves.append((int(dice_indices[matches[0]]), int(category_bits[matches[0]])) if len(matches) else None)
+
+        self._category_moves = tuple(category_moves)
+        self._legal_ranges_keys = category_key
+        self._legal_env_actions_indices = None
+        return self._read_only_legal_actions_mask
+
+    def _reset_legal_actions_mask(self):
+        self._legal_actions_mask = np.zeros(MoveType.Pass.value, dtype=bool)
+        self._legal_actions_mask[MoveType.Pass.value - 1] = True
+        self._read_only_legal_actions_mask = self._legal_actions_mask.view()
+        self._read_only_legal_actions_mask.setflags(write=False)
+        self._legal_ranges_keys = None
+        self._legal_env_actions_indices = None
+        self._category_moves = None
+        # the category moves match the sheet, cleared on every tick and restore, and the dice
+        # of version _category_moves_dice_version (every change of the dice array bumps it)
+        self._category_moves_valid = False
+        self._category_moves_dice_version = None
+
+    def _are_category_moves_current(self):
+        return self._category_moves_valid and self._category_moves_dice_version == self.dice.version
 
     def get_legal_env_actions_indices(self):
-        return [i for i in range(MoveType.Pass.value) if self.is_action_legal(env_action_index=i)]
+        mask = self.get_legal_actions_mask()
+        if self._legal_env_actions_indices is None:
+            self._legal_env_actions_indices = np.flatnonzero(mask).tolist()
+        return list(self._legal_env_actions_indices)
 
     def is_action_legal(self, *, env_action_index):
         if env_action_index < 0 or env_action_index >= MoveType.Pass.value:
             raise Exception("action index out of bounds")
 
-        if env_action_index < MoveType.ChooseCategory.value:
-            
-            dice_indices = []
-            match env_action_index:
-                case 0:
-                    dice_indices = [7]
-                case 1:
-                    dice_indices = [9, 10, 12, 17, 18, 20]
-                case 2:
-                    dice_indices = [32]
-                case 3:
-                    dice_indices = [40, 48, 56]
-                case 4:
-                    dice_indices = [3, 5, 6, 7]
-                case 5:
-                    dice_indices = [24]
-                case 6:
-                    dice_indices = [33, 34, 35, 36, 37, 38]
-                case 7:
-                    dice_indices = [41, 42, 44, 49, 50, 52]
-
-            section = self.sections[env_action_index]
-
-            for dice_indice in dice_indices:
-                dice_combination = self._get_dice_combination(with_action_index=dice_indice)
-                
-                if self._is_instance(section, ContinuosSection):
-                    if section.check_dice_requirements(dice=dice_combination) and not section.is_full():
-                        return True
-                elif self._is_instance(section, IrregularSection):
-                    for choice in range(6): # number of ticks in Newman section (green dice)
-                        if section.check_dice_requirements(dice=dice_combination, env_choices=[choice]) and not section.is_full():
-                            return True    
-
-            return False
-
-        return True
+        return bool(self.get_legal_actions_mask()[env_action_index])
 
     def _enumerate_all_dice_combinations(self):
         dice_combinations = []
@@ -152,6 +236,7 @@ class RollAndRakeState(object):
     def step(self, *, with_env_action_index):
         env_action_index = with_env_action_index
         # action_index = env_action_index + 1
+        score_delta = 0
 
         # print(f"step: action chosen ({GameMove(env_action_index)})")
 
@@ -159,47 +244,40 @@ class RollAndRakeState(object):
             # print(self)
             print(f"Error: The provided action is illegal {env_action_index}")
             # print(f"legal actions: {self.get_legal_env_actions_indices()}")
-            return
+            return score_delta
+
+        return self.step_unchecked(with_env_action_index=env_action_index)
+
+    def step_unchecked(self, *, with_env_action_index):
+        """
+        step for callers picking the action from the legal actions mask: the category is
+        ticked with the dice combination found while computing the mask, nothing is checked again
+        """
+        env_action_index = with_env_action_index
+        score_delta = 0
 
         if env_action_index < MoveType.ChooseCategory.value:
-            
-            dice_indices = []
-            match env_action_index:
-                case 0:
-                    dice_indices = [7]
-                case 1:
-                    dice_indices = [9, 10, 12, 17, 18, 20]
-                case 2:
-                    dice_indices = [32]
-                case 3:
-                    dice_indices = [40, 48, 56]
-                case 4:
-                    dice_indices = [3, 5, 6, 7]
-                case 5:
-                    dice_indices = [24]
-                case 6:
-                    dice_indices = [33, 34, 35, 36, 37, 38]
-                case 7:
-                    dice_indices = [41, 42, 44, 49, 50, 52]
+            # only recomputed when the dice or the sheet changed since the mask was last asked for
+            if not self._are_category_moves_current():
+                self.get_legal_actions_mask()
+            dice_index, dice_bits = self._category_moves[env_action_index]
+            dice_combination = SUBSET_GETTERS[dice_index](self.dice)
 
             section = self.sections[env_action_index]
+            ticked_cells = []
+            if section.kind == CONTINUOS_SECTION:
+                ticked_cells = section.make_use_of_unchecked(dice=dice_combination)
+            elif section.kind == IRREGULAR_SECTION:
+                # the cell of the green die value, left unticked when the dice do not meet its condition
+                choice = self.green_die_value - 1
+                if dice_bits & self.legal_action_tables.cell_bits[env_action_index][choice]:
+                    ticked_cells = section.make_use_of_unchecked(dice=dice_combination, with_env_choices=[choice])
 
-            for dice_indice in dice_indices:
-                dice_combination = self._get_dice_combination(with_action_index=dice_indice)
-                
-                if self._is_instance(section, ContinuosSection):
-                    if section.check_dice_requirements(dice=dice_combination) and not section.is_full():
-                        section.make_use_of(dice=dice_combination)
-                        break
-                elif self._is_instance(section, IrregularSection):
-                    for choice in range(6): # number of ticks in Newman section (green dice)
-                        if section.check_dice_requirements(dice=dice_combination, env_choices=[choice]) and not section.is_full():
-                            section.make_use_of(dice=dice_combination, with_env_choices=[self.green_die_value - 1])
-                            break
-        
+            score_delta = self._update_section_score(env_action_index, ticked_cells)
 
         self._end_turn()
 
+        return score_delta
 
     def _end_turn(self):
         self.green_track = max(self.green_track - self.green_die_value, 0)
@@ -208,42 +286,146 @@ class RollAndRakeState(object):
 
         self.current_dice_combination = []
         
-        self.available_dice, self.green_die_value = self.generate_new_dice()
+        self.generate_new_dice()
 
         if self.green_track <= 0:
             self.is_done = True
     
     def _get_dice_chosen_indices_from(self, *, action_index):
-        if action_index >= 2**len(self.available_dice):
+        if action_index >= SUBSETS_NUMBER:
             raise Exception("Index out of bounds")
 
-        bits_array = np.array([int(x) for x in (bin(action_index)[2:])[::-1]])
-        dice_chosen_indices = np.where(bits_array == 1)[0]
-        return dice_chosen_indices
+        return SUBSET_INDICES_ARRAYS[action_index]
 
     def _get_dice_combination(self, *, with_action_index):
         action_index = with_action_index
         
-        dice_chosen_indices = self._get_dice_chosen_indices_from(action_index=action_index)        
-        for dice_index in dice_chosen_indices:
-            if self.available_dice[dice_index].value == 0:
-                return []
+        if self.dice.taken_mask & action_index:
+            return ()
         
-        return [die for index, die in enumerate(self.available_dice) if index in dice_chosen_indices]
+        return SUBSET_GETTERS[action_index](self.dice)
 
     def _take_dice_combination(self, *, with_action_index):
         action_index = with_action_index
 
         dice_combination = self._get_dice_combination(with_action_index=action_index)
-        self.available_dice = [die if die not in dice_combination else Die(die.color, 0) for die in self.available_dice]
+        self.dice.take(dice_combination)
         self.current_dice_combination = dice_combination
       
-    def get_current_score(self):
-        score = 0
-        for section in self.sections:
-            score += section.get_score()
+    def enumerate_afterstates(self):
+        """
+        every distinct post-decision sheet reachable with the current dice in one call,
+        with the category leading there, its score delta and the encoded sheet reached
+        (see BitboardLayout.enumerate_afterstates)
+        """
+        # imported here, the bitboard state module builds on this one
+        from .bitboard_state import get_bitboard_layout
+
+        layout = get_bitboard_layout()
+        sheet, values = layout.encode(self._get_sections_tick_lists())
+        return layout.enumerate_afterstates(sheet, values, available_dice=self.available_dice, green_die_value=self.green_die_value)
+
+    def refresh_scores(self):
+        # recompute the cached section scores and observation bits, needed after editing the sections tick lists directly
+        self.section_scores = [section.get_score() for section in self.sections]
+        self.current_score = sum(self.section_scores)
+        self._dirty_sections = set(range(len(self.sections)))
+        self._sections_hashes = [self.zobrist_keys.get_cells_hash(index, section.tick_list) for index, section in enumerate(self.sections)]
+        self._sheet_hash = reduce(xor, self._sections_hashes, 0)
+        self._category_moves_valid = False
+
+    def _update_section_score(self, section_index, ticked_cells):
+        # ticked_cells: the (cell, previous value) pairs written by the tick, only their keys change the hash
+        self._dirty_sections.add(section_index)
+        self._category_moves_valid = False
+        ticks_hash = self.zobrist_keys.get_ticks_hash(section_index, ticked_cells, self.sections[section_index].tick_list)
+        self._sheet_hash ^= ticks_hash
+        self._sections_hashes[section_index] ^= ticks_hash
+        section_score = self.sections[section_index].get_score()
+        score_delta = section_score - self.section_scores[section_index]
+        self.section_scores[section_index] = section_score
+        self.current_score += score_delta
+        return score_delta
 
-        return score
+    def get_current_score(self):
+        return self.current_score
+
+    def _get_hashed_features(self):
+        return (self.green_track, self.green_die_value)
+
+    def get_zobrist_hash(self):
+        # 64 bit hash of the game for transposition tables, the turn number is left out.
+        # the sheet part is updated on every tick, the dice parts only when the dice changed
+        keys = self.zobrist_keys
+
+        dice_key = self.dice.get_key()
+        if dice_key != self._hashed_dice:
+            self._dice_hash = keys.get_dice_hash(self.dice)
+            self._hashed_dice = dice_key
+
+        dice_combination = tuple(self.current_dice_combination)
+        if dice_combination != self._hashed_dice_combination:
+            self._dice_combination_hash = keys.get_combination_hash(dice_combination)
+            self._hashed_dice_combination = dice_combination
+
+        return self._sheet_hash ^ self._dice_hash ^ self._dice_combination_hash ^ keys.get_features_hash(self._get_hashed_features())
+
+    def snapshot(self, *, include_dice_state=False):
+        # the sections metadata is shared, only the mutable parts of the game are saved.
+        # by default the dice rolled after a restore follow the stream of the dice source (searches
+        # sample new dice on every restore), include_dice_state replays the dice rolled after the snapshot
+        return RollAndRakeSnapshot(
+            current_turn=self.current_turn,
+            green_track=self.green_track,
+            is_done=self.is_done,
+            green_die_value=self.green_die_value,
+            available_dice=self.dice.get_key(),
+            current_dice_combination=tuple(self.current_dice_combination),
+            bonuses_available=tuple(self.bonuses_available),
+            tick_lists=tuple(section.tick_list.copy() for section in self.sections),
+            section_scores=tuple(self.section_scores),
+            current_score=self.current_score,
+            sections_hashes=tuple(self._sections_hashes),
+            random_state=self.dice_source.get_state() if include_dice_state else None
+        )
+
+    def restore(self, snapshot):
+        self.current_turn = snapshot.current_turn
+        self.green_track = snapshot.green_track
+        self.is_done = snapshot.is_done
+        self.green_die_value = snapshot.green_die_value
+        self.dice.set_values(snapshot.available_dice)
+        self.current_dice_combination = list(snapshot.current_dice_combination)
+        self.bonuses_available = list(snapshot.bonuses_available)
+        for section, tick_list in zip(self.sections, snapshot.tick_lists):
+            section.tick_list[:] = tick_list
+        self.section_scores = list(snapshot.section_scores)
+        self.current_score = snapshot.current_score
+        self._sections_hashes = list(snapshot.sections_hashes)
+        self._sheet_hash = reduce(xor, self._sections_hashes, 0)
+        self._dirty_sections = set(range(len(self.sections)))
+        if snapshot.random_state is not None:
+            self.dice_source.set_state(snapshot.random_state)
+        self._category_moves_valid = False
+
+    def clone(self):
+        # cheaper than copy.deepcopy, the sections metadata and the legal action tables are shared
+        state = self.__class__.__new__(self.__class__)
+        state.__dict__.update(self.__dict__)
+        state.dice = self.dice.copy()
+        state.current_dice_combination = list(self.current_dice_combination)
+        state.bonuses_available = list(self.bonuses_available)
+        state.sections = [section.copy() for section in self.sections]
+        state.section_scores = list(self.section_scores)
+        state.observation_writer = self.observation_writer.copy()
+        state._dirty_sections = set(self._dirty_sections)
+        state._sections_hashes = list(self._sections_hashes)
+        state._legal_actions_mask = self._legal_actions_mask.copy()
+        state._read_only_legal_actions_mask = state._legal_actions_mask.view()
+        state._read_only_legal_actions_mask.setflags(write=False)
+        # independent substream, searching a clone neither sees nor consumes the dice of the game
+        state.dice_source = self.dice_source.spawn(1)[0]
+        return state
 
     def _get_sections_tick_lists(self):
         sections = []
@@ -3,21 +3,26 @@ import numpy as np
 import random
 
 from .model_v1.roll_and_rake_state import RollAndRakeState
+from .model_v1.bitboard_state import BitboardRollAndRakeState
+from .common.observation_codec import ObservationCodec
 from .model_v1.enums import GameMove, GamePhase, MoveType, RenderType
 
 class RollAndRakeEnvV1(gym.Env):
     metadata = {'render.modes': ['human']}
 
-    def __init__(self):
+    def __init__(self, bitboard=False, canonical_actions=False, observation_format="float32", dict_observation=False):
         super(RollAndRakeEnvV1, self).__init__()
         self.name = 'roll_and_rake'
 
-        self.game_state = RollAndRakeState()
+        if bitboard and canonical_actions:
+            raise Exception("canonical actions are not supported by the bitboard state")
+
+        self.game_state = BitboardRollAndRakeState() if bitboard else RollAndRakeState(canonical_actions=canonical_actions)
 
         self.action_space = gym.spaces.Discrete(MoveType.Pass.value)
 
         available_dice_space = len(self.game_state.available_dice) * 7
-        binary_sections_space = sum(map(lambda x: len(x.tick_list), self.game_state.sections))
+        binary_sections_space = sum(map(lambda x: len(x), self.game_state._get_sections_tick_lists()))
         elliott_space = 1
         green_value_space = 1
         game_phase_value_space = 4
@@ -25,11 +30,40 @@ class RollAndRakeEnvV1(gym.Env):
         dice_combination_choices_available_value_space = 1
         legal_actions_space = self.action_space.n
 
-        self.observation_space = gym.spaces.Box(0, 1, (available_dice_space + binary_sections_space + elliott_space + green_value_space + game_phase_value_space + rerolls_value_space + dice_combination_choices_available_value_space + legal_actions_space, ))
+        observation_size = available_dice_space + binary_sections_space + elliott_space + green_value_space + game_phase_value_space + rerolls_value_space + dice_combination_choices_available_value_space + legal_actions_space
+
+        # uint8 and packed observations are decoded by observation_codec (see ObservationCodec)
+        self.observation_codec = ObservationCodec(self.game_state.observation_writer.scales, observation_format=observation_format)
+        if observation_format == "float32":
+            self.observation_space = gym.spaces.Box(0, 1, (observation_size, ))
+        else:
+            self.observation_space = gym.spaces.Box(0, 255, (self.observation_codec.size, ), dtype=np.uint8)
+
+        # the legal actions mask is the last slice of the observation, a dict observation
+        # splits it from the features (the packed bits can not be split)
+        self.dict_observation = dict_observation
+        self.features_size = observation_size - legal_actions_space
+        if dict_observation:
+            if observation_format == "packed":
+                raise Exception("packed observations can not be split into a dict")
+
+            dtype = self.observation_space.dtype
+            self.observation_space = gym.spaces.Dict({
+                "features": gym.spaces.Box(0, self.observation_space.high[0], (self.features_size, ), dtype=dtype),
+                "action_mask": gym.spaces.Box(0, 1, (legal_actions_space, ), dtype=dtype)
+            })
         
     @property
     def observation(self):
-        return self.game_state.to_observation()
+        observation = self.game_state.to_observation(copy=False)
+        if not self.dict_observation:
+            return self.observation_codec.encode(observation)
+
+        if self.observation_codec.observation_format != "float32":
+            observation = self.observation_codec.encode(observation)
+        # views, the float32 ones are read-only views over the state buffer
+        # rewritten by the next step or reset (copy them to keep them)
+        return {"features": observation[:self.features_size], "action_mask": observation[self.features_size:]}
 
     @property
     def legal_actions(self):
@@ -39,20 +73,18 @@ class RollAndRakeEnvV1(gym.Env):
         return self.game_state.get_current_score()
 
     def step(self, env_action_index):
-        starting_score = self.game_state.get_current_score()
-
         # print(f"Action taken: {GameMove(env_action_index)}")
 
-        self.game_state.step(with_env_action_index=env_action_index)
-        new_state = self.game_state.to_observation()
-        reward = self.game_state.get_current_score() - starting_score
+        reward = self.game_state.step(with_env_action_index=env_action_index)
+        new_state = self.observation
         done = self.game_state.is_done
 
         self.done = done
         return new_state, reward, done, {}
 
-    def reset(self):
-        self.game_state.reset()
+    def reset(self, seed=None, options=None):
+        # a seed replaces the seed every game replays
+        self.game_state.reset(seed=seed)
         self.done = False
         # print('\n\n---- NEW GAME ----')
 
@@ -0,0 +1,54 @@
+import gym
+import numpy as np
+
+from .model_v1.batched_state import BatchedRollAndRakeState
+from .model_v1.enums import MoveType
+
+class RollAndRakeVectorEnvV1(gym.vector.VectorEnv):
+    """
+    num_envs RollAndRakeEnvV1 games stepped together by a BatchedRollAndRakeState,
+    finished games are reset automatically and their last observation and score are
+    reported in the infos
+
+    every game replays the fixed dice sequence of RollAndRakeEnvV1, a seed given to reset replaces it
+    """
+
+    def __init__(self, num_envs):
+        self.name = 'roll_and_rake'
+        self.game_states = BatchedRollAndRakeState(num_envs)
+
+        action_space = gym.spaces.Discrete(MoveType.Pass.value)
+        observation_space = gym.spaces.Box(0, 1, (self.game_states.to_observation().shape[1], ))
+        super(RollAndRakeVectorEnvV1, self).__init__(num_envs, observation_space, action_space)
+
+    @property
+    def observation(self):
+        return self.game_states.to_observation()
+
+    @property
+    def legal_actions(self):
+        return self.game_states.get_legal_actions_mask()
+
+    def score_games(self):
+        return self.game_states.get_current_scores()
+
+    def reset_async(self, seed=None, options=None):
+        self.game_states.reset(seed=seed)
+
+    def reset_wait(self, seed=None, options=None):
+        return self.observation
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions)
+
+    def step_wait(self):
+        rewards = self.game_states.step(self._actions)
+        dones = self.game_states.is_done.copy()
+        infos = {}
+
+        if dones.any():
+            infos["final_observation"] = self.game_states.to_observation()[dones]
+            infos["final_score"] = self.game_states.get_current_scores()[dones]
+            self.game_states.reset(dones)
+
+        return self.observation, rewards, dones, infos
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+import statistics
+
+from roll_and_rake.envs.common.section_value_tables import get_section_value_tables
+from roll_and_rake.envs.model_v2.bitboard_state import get_bitboard_layout
+from roll_and_rake.envs.model_v2.classes import Color, Die
+from roll_and_rake.envs.model_v2.enums import MoveType
+from roll_and_rake.envs.model_v2.roll_and_rake_state import RollAndRakeState
+
+class SectionValuesAgent(object):
+    """
+    chooses the category whose tick gains the most section value,
+    every section is looked up on its own in the precomputed section value tables:
+    the tick list reached by each category comes from the afterstates of the game,
+    the game itself is neither cloned nor stepped
+    """
+
+    def __init__(self, *, game_state, turns_share=0.5, mean_green_die_value=3.5):
+        self.layout = get_bitboard_layout()
+        self.section_value_tables = get_section_value_tables(game_state.sections, die_factory=lambda color_name, value: Die(Color[color_name], value))
+        # part of the turns left that a single section is expected to get
+        self.turns_share = turns_share
+        self.mean_green_die_value = mean_green_die_value
+
+    def get_action_for(self, *, game_state):
+        turns = round(max(0, game_state.green_track - game_state.green_die_value) / self.mean_green_die_value * self.turns_share)
+
+        best_action = MoveType.ChooseCategory.value
+        best_marginal_value = 0
+        afterstates = game_state.enumerate_afterstates()
+        for (action, ), next_sheet, next_values in zip(afterstates.actions, afterstates.sheets, afterstates.values):
+            next_tick_list = self.layout.decode_section(action, next_sheet, next_values)
+            marginal_value = self.section_value_tables[action].get_marginal_value(game_state.sections[action].tick_list, next_tick_list, turns)
+            if marginal_value > best_marginal_value:
+                best_action, best_marginal_value = action, marginal_value
+        return best_action
+
+if __name__ == "__main__":
+    game_state = RollAndRakeState()
+    section_values_agent = SectionValuesAgent(game_state=game_state)
+    scores = []
+
+    for episode in range(1, 100 + 1):
+        game_state.reset()
+
+        while not game_state.is_done:
+            action = section_values_agent.get_action_for(game_state=game_state)
+            game_state.step(with_env_action_index=action)
+
+        scores.append(game_state.get_current_score())
+        print(f"episode: {episode}, score: {game_state.get_current_score()}")
+
+    print(f"mean score: {statistics.mean(scores)}")
@@ -0,0 +1,66 @@
+import unittest
+import random
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.model_v0.enums import GameMove
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+from roll_and_rake.envs.model_v0.batched_state import BatchedRollAndRakeState
+
+class BatchedRollAndRakeStateTest(unittest.TestCase):
+
+    def test_same_games_as_roll_and_rake_state(self):
+        games_number = 4
+        batched_state = BatchedRollAndRakeState(games_number, seed=0)
+        current_states = [RollAndRakeState() for _ in range(games_number)]
+        actions_random = random.Random(0)
+
+        def copy_dice(game_index):
+            # the batched state rolls its own dice, the games are kept in sync on the dice
+            batched_state.available_dice[game_index] = [die.value for die in current_states[game_index].available_dice]
+            batched_state.green_die_value[game_index] = current_states[game_index].green_die_value
+
+        for game_index in range(games_number):
+            copy_dice(game_index)
+
+        while not batched_state.is_done.all():
+            legal_actions_mask = batched_state.get_legal_actions_mask()
+            observation = batched_state.to_observation()
+
+            actions = []
+            for game_index, current_state in enumerate(current_states):
+                if current_state.is_done:
+                    actions.append(GameMove["Pass"].value)
+                    continue
+
+                np.testing.assert_array_equal(legal_actions_mask[game_index], current_state.get_legal_actions_mask())
+                np.testing.assert_array_equal(observation[game_index], current_state.to_observation())
+                actions.append(actions_random.choice(current_state.get_legal_env_actions_indices()))
+
+            scores_delta = batched_state.step(actions)
+
+            for game_index, current_state in enumerate(current_states):
+                if current_state.is_done:
+                    continue
+
+                self.assertEqual(current_state.step(with_env_action_index=actions[game_index]), scores_delta[game_index])
+                self.assertEqual(current_state.is_done, batched_state.is_done[game_index])
+                copy_dice(game_index)
+
+        np.testing.assert_array_equal(batched_state.get_current_scores(), [current_state.get_current_score() for current_state in current_states])
+
+    def test_reset_selected_games(self):
+        batched_state = BatchedRollAndRakeState(2, seed=0)
+        batched_state.step([GameMove["Pass"].value, GameMove["Pass"].value])
+        batched_state.reset(np.array([True, False]))
+
+        self.assertEqual(batched_state.green_track[0], 40)
+        self.assertLess(batched_state.green_track[1], 40)
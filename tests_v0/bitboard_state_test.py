@@ -0,0 +1,89 @@
+import unittest
+import random
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.model_v0.enums import Color, GameMove
+from roll_and_rake.envs.model_v0.classes import Die
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+from roll_and_rake.envs.model_v0.bitboard_state import BitboardRollAndRakeState
+
+class BitboardRollAndRakeStateTest(unittest.TestCase):
+
+    def test_same_games_as_roll_and_rake_state(self):
+        for seed in range(3):
+            current_state = RollAndRakeState(seed=seed)
+            bitboard_state = BitboardRollAndRakeState(seed=seed)
+            actions_random = random.Random(seed)
+
+            while not current_state.is_done:
+                np.testing.assert_array_equal(bitboard_state.to_observation(), current_state.to_observation())
+                self.assertEqual(bitboard_state.get_current_score(), current_state.get_current_score())
+
+                legal_actions = current_state.get_legal_env_actions_indices()
+                self.assertEqual(bitboard_state.get_legal_env_actions_indices(), legal_actions)
+
+                action = actions_random.choice(legal_actions)
+                current_state.step(with_env_action_index=action)
+                bitboard_state.step(with_env_action_index=action)
+
+            self.assertTrue(bitboard_state.is_done)
+
+    def test_from_state_to_state(self):
+        current_state = RollAndRakeState()
+        current_state.sections[1].tick_list[:3] = [4, 6, 0]
+        current_state.sections[3].tick_list[2] = 9
+
+        bitboard_state = BitboardRollAndRakeState.from_state(current_state)
+        self.assertEqual(bitboard_state.get_current_score(), 11)
+
+        for section, tick_list in zip(current_state.sections, bitboard_state.to_state()._get_sections_tick_lists()):
+            np.testing.assert_array_equal(tick_list, section.tick_list)
+
+    def test_elliott_one_step_2_dice(self):
+        bitboard_state = BitboardRollAndRakeState()
+        bitboard_state.available_dice = [
+            Die(Color.Orange, 4),
+            Die(Color.Orange, 6),
+            Die(Color.Orange, 1),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4),
+        ]
+
+        bitboard_state.step(with_env_action_index=GameMove["T12"].value)
+        bitboard_state.step(with_env_action_index=GameMove["ElliottCategory"].value)
+
+        np.testing.assert_array_equal(bitboard_state._get_sections_tick_lists()[1][:3], [4, 6, 0])
+        self.assertEqual(bitboard_state.get_current_score(), 10)
+
+    def test_copy_is_independent(self):
+        bitboard_state = BitboardRollAndRakeState()
+        bitboard_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4),
+        ]
+        copied_state = bitboard_state.copy()
+
+        self.assertEqual(copied_state, bitboard_state)
+        self.assertEqual(hash(copied_state), hash(bitboard_state))
+
+        copied_state.step(with_env_action_index=GameMove["T123"].value)
+        copied_state.step(with_env_action_index=GameMove["HarvickCategory"].value)
+
+        self.assertNotEqual(copied_state, bitboard_state)
+        self.assertEqual(bitboard_state.sheet, 0)
+        self.assertEqual(copied_state.get_current_score(), 4)
+        np.testing.assert_array_equal(copied_state._get_sections_tick_lists()[0][:3], [9, 9, 9])
@@ -0,0 +1,49 @@
+import unittest
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.common.dice_array import DiceArray
+from roll_and_rake.envs.model_v0.classes import Color, Die, _make_die
+
+class DiceArrayTest(unittest.TestCase):
+
+    def test_die_views(self):
+        dice_array = DiceArray(_make_die, [1, 2, 3, 4, 5, 6])
+
+        self.assertEqual(dice_array[0], Die(Color.Orange, 1))
+        self.assertEqual(dice_array[-1], Die(Color.Green, 6))
+        self.assertEqual(dice_array[3:5], [Die(Color.Brown, 4), Die(Color.Brown, 5)])
+        self.assertEqual(dice_array, [Die(Color.Orange, 1), Die(Color.Orange, 2), Die(Color.Orange, 3), Die(Color.Brown, 4), Die(Color.Brown, 5), Die(Color.Green, 6)])
+
+    def test_taken_mask(self):
+        dice_array = DiceArray(_make_die, [1, 2, 3, 4, 5, 6])
+
+        dice_array[1] = Die(Color.Orange, 0)
+        self.assertEqual(dice_array.taken_mask, 0b000010)
+
+        dice_array.roll((1, 5), (4, 2))
+        self.assertEqual(dice_array.taken_mask, 0)
+        self.assertEqual(dice_array.get_key(), bytes([1, 4, 3, 4, 5, 2]))
+
+    def test_take_equal_dice(self):
+        dice_array = DiceArray(_make_die, [2, 2, 3, 2, 5, 2])
+
+        # the other orange 2 is taken too, the brown and green 2 are not
+        dice_array.take((Die(Color.Orange, 2),))
+        self.assertEqual(dice_array.get_key(), bytes([0, 0, 3, 2, 5, 2]))
+        self.assertEqual(dice_array.taken_mask, 0b000011)
+
+    def test_copy(self):
+        dice_array = DiceArray(_make_die, [1, 2, 3, 4, 5, 6])
+        copied_dice_array = dice_array.copy()
+
+        dice_array.take((Die(Color.Green, 6),))
+        self.assertEqual(copied_dice_array.get_key(), bytes([1, 2, 3, 4, 5, 6]))
+        self.assertEqual(copied_dice_array.taken_mask, 0)
@@ -0,0 +1,41 @@
+import unittest
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.model_v0.enums import Color, DiceCondition
+from roll_and_rake.envs.model_v0.classes import Die, DiceRequirement
+from roll_and_rake.envs.common.dice_conditions import compile_dice_condition, compile_dice_requirements, get_dice_code
+
+def make_die(color_name, value):
+    return Die(Color[color_name], value)
+
+class DiceConditionsTest(unittest.TestCase):
+
+    def test_dice_code_is_order_independent(self):
+        dice = [Die(Color.Orange, 3), Die(Color.Brown, 1), Die(Color.Orange, 2)]
+
+        self.assertEqual(get_dice_code(dice), get_dice_code(dice[::-1]))
+        self.assertNotEqual(get_dice_code(dice), get_dice_code([Die(Color.Orange, 3), Die(Color.Brown, 2), Die(Color.Orange, 1)]))
+        self.assertEqual(get_dice_code([]), 0)
+        self.assertIsNone(get_dice_code([Die(Color.Orange, 0)]))
+
+    def test_compile_consecutive(self):
+        dice_codes = compile_dice_condition(DiceCondition.Consecutive.value, colors=["Orange", "Orange", "Orange"], die_factory=make_die)
+
+        # 123, 234, 345, 456
+        self.assertEqual(len(dice_codes), 4)
+        self.assertIn(get_dice_code([Die(Color.Orange, 5), Die(Color.Orange, 3), Die(Color.Orange, 4)]), dice_codes)
+        self.assertNotIn(get_dice_code([Die(Color.Orange, 5), Die(Color.Orange, 3), Die(Color.Orange, 3)]), dice_codes)
+
+    def test_compile_dice_requirements_with_tick_condition(self):
+        dice_requirements = [DiceRequirement(["Green"], DiceCondition.NoCondition.value)]
+        dice_codes = compile_dice_requirements(dice_requirements, die_factory=make_die, tick_condition=DiceCondition.IsEqualToTwo.value)
+
+        self.assertEqual(dice_codes, frozenset([get_dice_code([Die(Color.Green, 2)])]))
@@ -0,0 +1,61 @@
+import unittest
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.common.dice_source import DiceSource
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+
+class DiceSourceTest(unittest.TestCase):
+
+    def test_same_seed_same_dice(self):
+        dice_source = DiceSource(3, block_size=8)
+        other_dice_source = DiceSource(3, block_size=8)
+
+        # rolls across the blocks boundaries
+        for dice_number in [6, 1, 5, 6, 3, 6]:
+            values = dice_source.roll(dice_number)
+            self.assertEqual(len(values), dice_number)
+            self.assertTrue(all(1 <= value <= 6 for value in values))
+            self.assertEqual(other_dice_source.roll(dice_number), values)
+
+    def test_reseed(self):
+        dice_source = DiceSource(3)
+        values = dice_source.roll(6)
+        dice_source.roll(6)
+
+        dice_source.seed(3)
+        self.assertEqual(dice_source.roll(6), values)
+
+    def test_spawn_independent_substreams(self):
+        substreams = DiceSource(3).spawn(2)
+        other_substreams = DiceSource(3).spawn(2)
+
+        self.assertEqual(substreams[0].roll(60), other_substreams[0].roll(60))
+        self.assertNotEqual(substreams[0].roll(60), substreams[1].roll(60))
+
+    def test_copy_and_state(self):
+        dice_source = DiceSource(3)
+        dice_source.roll(4)
+        state = dice_source.get_state()
+        copied_dice_source = dice_source.copy()
+
+        values = dice_source.roll(12)
+        self.assertEqual(copied_dice_source.roll(12), values)
+
+        dice_source.set_state(state)
+        self.assertEqual(dice_source.roll(12), values)
+
+    def test_state_reset_seed(self):
+        current_state = RollAndRakeState(seed=5)
+        available_dice = list(current_state.available_dice)
+
+        current_state.reset()
+        current_state.reset(seed=5)
+        self.assertEqual(current_state.available_dice, available_dice)
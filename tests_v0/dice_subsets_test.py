@@ -0,0 +1,33 @@
+import unittest
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.common.dice_subsets import SUBSETS_NUMBER, SUBSET_INDICES, SUBSET_INDICES_ARRAYS, SUBSET_POPCOUNTS, SUBSET_COLOR_SIGNATURES, SUBSET_GETTERS
+
+class DiceSubsetsTest(unittest.TestCase):
+
+    def test_subset_indices(self):
+        self.assertEqual(SUBSETS_NUMBER, 64)
+        self.assertEqual(SUBSET_INDICES[0], ())
+        self.assertEqual(SUBSET_INDICES[18], (1, 4))
+        self.assertEqual(SUBSET_INDICES[63], (0, 1, 2, 3, 4, 5))
+        self.assertEqual(SUBSET_INDICES_ARRAYS[18].tolist(), [1, 4])
+        self.assertEqual(SUBSET_POPCOUNTS[18], 2)
+
+    def test_subset_color_signatures(self):
+        self.assertEqual(SUBSET_COLOR_SIGNATURES[33], ("Green", "Orange"))
+        self.assertEqual(SUBSET_COLOR_SIGNATURES[24], ("Brown", "Brown"))
+
+    def test_subset_getters(self):
+        dice = ["a", "b", "c", "d", "e", "f"]
+
+        self.assertEqual(SUBSET_GETTERS[0](dice), ())
+        self.assertEqual(SUBSET_GETTERS[4](dice), ("c",))
+        self.assertEqual(SUBSET_GETTERS[18](dice), ("b", "e"))
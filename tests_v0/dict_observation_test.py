@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.roll_and_rake_v0 import RollAndRakeEnvV0
+
+class DictObservationTest(unittest.TestCase):
+
+    def assert_same_trajectory(self, *, observation_format, bitboard=False):
+        env = RollAndRakeEnvV0(bitboard=bitboard, observation_format=observation_format)
+        dict_env = RollAndRakeEnvV0(bitboard=bitboard, observation_format=observation_format, dict_observation=True)
+        random_generator = np.random.default_rng(7)
+
+        observation = env.reset(seed=7)
+        dict_observation = dict_env.reset(seed=7)
+        done = False
+        while not done:
+            self.assertTrue(dict_env.observation_space.contains(dict_observation))
+            np.testing.assert_array_equal(np.concatenate([dict_observation["features"], dict_observation["action_mask"]]), observation)
+            np.testing.assert_array_equal(np.flatnonzero(dict_observation["action_mask"]), env.legal_actions)
+
+            action = int(random_generator.choice(env.legal_actions))
+            observation, _, done, _ = env.step(action)
+            dict_observation, _, _, _ = dict_env.step(action)
+
+    def test_same_observations(self):
+        self.assert_same_trajectory(observation_format="float32")
+        self.assert_same_trajectory(observation_format="uint8")
+        self.assert_same_trajectory(observation_format="float32", bitboard=True)
+
+    def test_zero_copy_views(self):
+        env = RollAndRakeEnvV0(dict_observation=True)
+        observation = env.reset(seed=1)
+        buffer = env.game_state.observation_writer.buffer
+        self.assertTrue(np.shares_memory(observation["features"], buffer))
+        self.assertTrue(np.shares_memory(observation["action_mask"], buffer))
+        self.assertFalse(observation["action_mask"].flags.writeable)
+        self.assertEqual(observation["features"].shape, (164, ))
+        self.assertEqual(observation["action_mask"].shape, (142, ))
+
+    def test_packed_not_supported(self):
+        with self.assertRaises(Exception):
+            RollAndRakeEnvV0(observation_format="packed", dict_observation=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import copy
+import tempfile
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.model_v2.classes import Die
+from roll_and_rake.envs.model_v2.enums import Color
+from roll_and_rake.envs.model_v2.expectimax_planner import ExpectimaxPlanner
+from roll_and_rake.envs.model_v2.roll_and_rake_state import RollAndRakeState
+
+class ExpectimaxPlannerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.planner = ExpectimaxPlanner()
+
+    def test_sections_configurations(self):
+        configurations_numbers = [len(section_transitions.configurations) for section_transitions in self.planner.sections_transitions]
+        self.assertEqual(configurations_numbers, [5, 7, 64, 127, 47, 6, 127, 6])
+
+    def test_roll_outcomes_probabilities(self):
+        probabilities = sum(probabilities.sum() for _, _, probabilities in self.planner.roll_outcomes)
+        self.assertAlmostEqual(probabilities, 1)
+
+    def test_value_of_finished_game(self):
+        self.assertEqual(self.planner.get_value(0, 0), 0)
+
+    def test_last_turn_value_is_expected_best_tick(self):
+        current_state = RollAndRakeState()
+        current_state.green_track = 1
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 5),
+            Die(Color.Brown, 6),
+            Die(Color.Green, 4),
+        ]
+        current_state.green_die_value = 4
+
+        self.assertGreater(self.planner.get_value(0, 1), 0)
+        self.assertIn(self.planner.get_best_action(current_state), current_state.get_legal_env_actions_indices())
+
+    def test_horizon_caps_green_track(self):
+        planner = copy.copy(self.planner)
+        planner.horizon = 2
+
+        current_state = RollAndRakeState()
+        current_state.reset(seed=4)
+        action = planner.get_best_action(current_state)
+        self.assertIn(action, current_state.get_legal_env_actions_indices())
+
+        # the same move as the whole game search with only the horizon left after the turn
+        current_state.green_track = current_state.green_die_value + 2
+        self.assertEqual(action, self.planner.get_best_action(current_state))
+
+    def test_save_load(self):
+        self.planner.get_value(0, 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "values.npz")
+            self.planner.save(path)
+            planner = copy.copy(self.planner)
+            planner.values = {}
+            planner.load(path)
+
+            # a table saved for another horizon is rejected
+            other_planner = copy.copy(self.planner)
+            other_planner.horizon = 3
+            other_planner.values = {}
+            with self.assertRaises(Exception):
+                other_planner.load(path)
+            self.assertEqual(other_planner.values, {})
+
+        self.assertEqual(len(planner.values), len(self.planner.values))
+        self.assertAlmostEqual(planner.values[self.planner.get_key(0, 2)], self.planner.get_value(0, 2), places=5)
@@ -0,0 +1,51 @@
+import unittest
+
+import os
+import random
+import sys
+import tempfile
+import numpy as np
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.common.game_record import GameRecord, GameRecorder, get_records_observations, read_records, replay, write_records
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+
+class GameRecordTest(unittest.TestCase):
+
+    def play_game(self, *, seed):
+        random.seed(seed or 0)
+        current_state = RollAndRakeState()
+        game_recorder = GameRecorder(current_state, seed=seed)
+        observations = [current_state.to_observation()]
+        while not current_state.is_done:
+            game_recorder.step(with_env_action_index=random.choice(current_state.get_legal_env_actions_indices()))
+            observations.append(current_state.to_observation())
+        return (game_recorder.get_record(), current_state.get_current_score(), np.array(observations))
+
+    def test_bytes_round_trip(self):
+        for seed in [None, 7]:
+            record, _, _ = self.play_game(seed=seed)
+            self.assertEqual(GameRecord.from_bytes(record.to_bytes()), record)
+
+    def test_replay(self):
+        for seed in [None, 7]:
+            record, score, observations = self.play_game(seed=seed)
+            self.assertEqual(replay(record).get_current_score(), score)
+
+            moves_number = len(record.actions) // 2
+            np.testing.assert_array_equal(replay(record, moves_number=moves_number).to_observation(), observations[moves_number])
+
+    def test_records_file_observations(self):
+        games = [self.play_game(seed=seed) for seed in [None, 7, 8]]
+        records_path = os.path.join(tempfile.mkdtemp(), "records.bin")
+        write_records(records_path, [record for record, _, _ in games])
+        records = list(read_records(records_path))
+
+        observations, records_indices = get_records_observations(records)
+        for record_index, (_, _, game_observations) in enumerate(games):
+            np.testing.assert_array_equal(observations[records_indices == record_index], game_observations)
@@ -0,0 +1,153 @@
+import unittest
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.model_v0.enums import Color, GameMove, GamePhase
+from roll_and_rake.envs.model_v0.classes import Die
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+from roll_and_rake.envs.model_v0.legal_action_tables import get_legal_action_tables
+
+class LegalActionTablesTest(unittest.TestCase):
+
+    def test_harvick_consecutive_dice(self):
+        tables = get_legal_action_tables()
+        dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 5),
+            Die(Color.Brown, 5),
+            Die(Color.Green, 5)
+        ]
+        roll_code, taken_mask = tables.encode_dice(dice)
+
+        self.assertEqual(taken_mask, 0)
+        self.assertEqual(tables.subset_bits[roll_code, 7 - 1], tables.section_bits[0])
+
+    def test_newman_cell_bits(self):
+        tables = get_legal_action_tables()
+
+        self.assertEqual(tables.get_dice_bits([Die(Color.Green, 4)]), tables.cell_bits[3][3])
+        self.assertEqual(tables.get_dice_bits([Die(Color.Brown, 4)]), 0)
+        self.assertEqual(tables.get_dice_bits([]), 0)
+
+    def test_moves_of_the_dice_bits(self):
+        tables = get_legal_action_tables()
+        dice_bits = [tables.section_bits[0] | tables.cell_bits[3][3], 0, tables.cell_bits[3][1]]
+        rows, sections, cells = tables.get_moves(dice_bits)
+
+        np.testing.assert_array_equal(rows, [0, 0, 2])
+        np.testing.assert_array_equal(sections, [0, 3, 3])
+        np.testing.assert_array_equal(cells, [-1, 3, 1])
+
+    def test_taken_dice_are_excluded(self):
+        tables = get_legal_action_tables()
+        dice = [
+            Die(Color.Orange, 0),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 5),
+            Die(Color.Brown, 5),
+            Die(Color.Green, 5)
+        ]
+        roll_code, taken_mask = tables.encode_dice(dice)
+
+        self.assertEqual(taken_mask, 1)
+        self.assertFalse(tables.untaken_subsets[taken_mask, 7 - 1])
+        self.assertTrue(tables.untaken_subsets[taken_mask, 6 - 1])
+
+    def test_full_section_is_not_legal(self):
+        current_state = RollAndRakeState()
+        current_state.rerolls_available = 0
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 0),
+            Die(Color.Brown, 0),
+            Die(Color.Green, 0)
+        ]
+        current_state.sections[0].tick_list[:] = 9
+
+        self.assertEqual(current_state.get_legal_env_actions_indices(), [GameMove["Pass"].value])
+
+    def test_newman_inner_choice(self):
+        current_state = RollAndRakeState()
+        current_state.game_phase = GamePhase.InnerSectionChoice
+        current_state.current_section_index = 3
+        current_state.current_dice_combination = [Die(Color.Green, 2)]
+
+        np.testing.assert_array_equal(current_state.get_legal_env_actions_indices(), [GameMove["NewmanSecond"].value, GameMove["Pass"].value])
+
+        current_state.sections[3].tick_list[1] = 9
+        np.testing.assert_array_equal(current_state.get_legal_env_actions_indices(), [GameMove["Pass"].value])
+
+    def test_legal_actions_mask_follows_the_phase(self):
+        current_state = RollAndRakeState()
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4)
+        ]
+        mask = current_state.get_legal_actions_mask()
+
+        self.assertFalse(mask.flags.writeable)
+        self.assertTrue(mask[GameMove["R1"].value])
+        self.assertTrue(mask[GameMove["T123"].value])
+
+        current_state.step(with_env_action_index=GameMove["T123"].value)
+
+        self.assertEqual(current_state.get_legal_env_actions_indices(), [GameMove["HarvickCategory"].value, GameMove["Pass"].value])
+
+    def test_canonical_subsets(self):
+        tables = get_legal_action_tables()
+        roll_code, taken_mask = tables.encode_dice([
+            Die(Color.Orange, 3),
+            Die(Color.Orange, 3),
+            Die(Color.Orange, 5),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 0),
+            Die(Color.Green, 4)
+        ])
+        canonical_subsets = tables.get_canonical_subsets(roll_code, taken_mask)
+
+        # R1 / R2 pick the same orange 3, R13 / R23 the same orange 3 and 5
+        self.assertEqual(canonical_subsets[GameMove["R2"].value], GameMove["R1"].value + 1)
+        self.assertEqual(canonical_subsets[GameMove["R23"].value], GameMove["R13"].value + 1)
+        self.assertEqual(canonical_subsets[GameMove["R3"].value], GameMove["R3"].value + 1)
+        # the brown 4 and the taken brown die are different dice
+        self.assertEqual(canonical_subsets[GameMove["R5"].value], GameMove["R5"].value + 1)
+
+    def test_canonical_actions_mask(self):
+        current_state = RollAndRakeState(canonical_actions=True)
+        current_state.available_dice = [
+            Die(Color.Orange, 3),
+            Die(Color.Orange, 3),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 3),
+            Die(Color.Brown, 3),
+            Die(Color.Green, 3)
+        ]
+        mask = current_state.get_legal_actions_mask()
+
+        self.assertTrue(mask[GameMove["R1"].value])
+        self.assertFalse(mask[GameMove["R2"].value])
+        self.assertTrue(mask[GameMove["T12"].value])
+        self.assertFalse(mask[GameMove["T23"].value])
+        # one action for every (orange, brown, green) count
+        self.assertEqual(mask[:GameMove["T1"].value].sum(), 4 * 3 * 2 - 1)
+
+        self.assertEqual(current_state.get_canonical_env_action_index(env_action_index=GameMove["T23"].value), GameMove["T12"].value)
+        current_state.step(with_env_action_index=GameMove["T23"].value)
+        self.assertEqual(current_state.game_phase, GamePhase.SectionChoice)
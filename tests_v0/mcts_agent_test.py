@@ -0,0 +1,73 @@
+import unittest
+import random
+import time
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from mcts_agent_v0 import MCTSAgent, MCTSSearch
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+
+class MCTSAgentTest(unittest.TestCase):
+
+    def get_game_state(self):
+        random.seed(3)
+        game_state = RollAndRakeState()
+        game_state.reset(seed=3)
+        return game_state
+
+    def test_search_leaves_game_state_untouched(self):
+        game_state = self.get_game_state()
+        observation = game_state.to_observation()
+        score = game_state.get_current_score()
+        zobrist_hash = game_state.get_zobrist_hash()
+        dice_state = game_state.dice_source.get_state()
+
+        roots_statistics = MCTSSearch().search(game_state=game_state, iterations=50)
+
+        self.assertTrue(set(roots_statistics) <= set(game_state.get_legal_env_actions_indices()))
+        np.testing.assert_array_equal(game_state.to_observation(), observation)
+        self.assertEqual(game_state.get_current_score(), score)
+        self.assertEqual(game_state.get_zobrist_hash(), zobrist_hash)
+        self.assertEqual(game_state.dice_source.get_state(), dice_state)
+
+    def test_iterations_budget(self):
+        game_state = self.get_game_state()
+        roots_statistics = MCTSSearch().search(game_state=game_state, iterations=50)
+
+        # every iteration visits a single root action
+        self.assertEqual(sum(visits for visits, _ in roots_statistics.values()), 50)
+
+    def test_time_budget(self):
+        game_state = self.get_game_state()
+        start = time.perf_counter()
+        roots_statistics = MCTSSearch().search(game_state=game_state, time_budget=0.1)
+        elapsed = time.perf_counter() - start
+
+        self.assertGreater(sum(visits for visits, _ in roots_statistics.values()), 0)
+        # the deadline is checked between iterations, a rollout may run past it
+        self.assertLess(elapsed, 0.1 + 0.1)
+
+    def test_no_budget(self):
+        with self.assertRaises(Exception):
+            MCTSAgent()
+
+    def test_agent_action_is_legal(self):
+        game_state = self.get_game_state()
+        legal_actions = game_state.get_legal_env_actions_indices()
+
+        with MCTSAgent(iterations=50) as mcts_agent:
+            self.assertIn(mcts_agent.get_action_for(game_state=game_state), legal_actions)
+
+        with MCTSAgent(iterations=40, workers=2) as mcts_agent:
+            self.assertIn(mcts_agent.get_action_for(game_state=game_state), legal_actions)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+from roll_and_rake.envs.common.observation_codec import ObservationCodec
+from roll_and_rake.envs.roll_and_rake_v0 import RollAndRakeEnvV0
+
+class ObservationCodecTest(unittest.TestCase):
+
+    def get_observations(self, moves_number=200):
+        game_state = RollAndRakeState()
+        game_state.reset(seed=5)
+        random_generator = np.random.default_rng(5)
+
+        observations = [game_state.to_observation()]
+        for _ in range(moves_number):
+            if game_state.is_done:
+                game_state.reset()
+            legal_actions = game_state.get_legal_env_actions_indices()
+            game_state.step(with_env_action_index=int(random_generator.choice(legal_actions)))
+            observations.append(game_state.to_observation())
+        return (game_state, np.array(observations))
+
+    def test_round_trip(self):
+        game_state, observations = self.get_observations()
+        for observation_format in ["float32", "uint8", "packed"]:
+            observation_codec = ObservationCodec(game_state.observation_writer.scales, observation_format=observation_format)
+            for observation in observations:
+                data = observation_codec.encode(observation)
+                self.assertEqual(data.dtype, observation_codec.dtype)
+                self.assertEqual(data.shape, (observation_codec.size, ))
+                np.testing.assert_array_equal(observation_codec.decode(data), observation)
+
+    def test_batch_decode(self):
+        game_state, observations = self.get_observations()
+        observation_codec = ObservationCodec(game_state.observation_writer.scales, observation_format="packed")
+        data = np.array([observation_codec.encode(observation) for observation in observations])
+        np.testing.assert_array_equal(observation_codec.decode(data), observations)
+
+    def test_env_observation_space(self):
+        for observation_format, size, dtype in [("float32", 306, np.float32), ("uint8", 306, np.uint8), ("packed", 41, np.uint8)]:
+            env = RollAndRakeEnvV0(observation_format=observation_format)
+            observation = env.reset(seed=1)
+            self.assertEqual(env.observation_space.shape, (size, ))
+            self.assertEqual(observation.dtype, dtype)
+            self.assertTrue(env.observation_space.contains(observation))
+
+    def test_unknown_format(self):
+        with self.assertRaises(Exception):
+            ObservationCodec([1], observation_format="float16")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,9 @@ sys.path.append(parent_dir_path)
 from roll_and_rake.envs.model_v0.enums import Color, GameMove, MoveType
 from roll_and_rake.envs.model_v0.classes import ContinuosSection, Die
 from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+from roll_and_rake.envs.model_v2.roll_and_rake_state import RollAndRakeState as V2RollAndRakeState
+from roll_and_rake.envs.common.section_kinds import CONTINUOS_SECTION
+from roll_and_rake.envs.utils_v0.utils import get_sections_metadata
 
 class RollAndRakeStateTest(unittest.TestCase):
 
@@ -372,3 +375,225 @@ class RollAndRakeStateTest(unittest.TestCase):
 
         self.assertTrue(current_state.get_legal_env_actions_indices() == [GameMove["T34"].value, GameMove["T35"].value, GameMove["T45"].value, GameMove["T6"].value, GameMove["T36"].value, GameMove["T46"].value, GameMove["T346"].value, GameMove["T56"].value, GameMove["T356"].value, GameMove["T456"].value, GameMove["Pass"].value])
 
+
+    def test_step_returns_score_delta(self):
+        current_state = RollAndRakeState()
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4),
+        ]
+
+        self.assertEqual(current_state.step(with_env_action_index=GameMove["T123"].value), 0)
+        self.assertEqual(current_state.step(with_env_action_index=GameMove["HarvickCategory"].value), 4)
+        self.assertEqual(current_state.get_current_score(), 4)
+        self.assertEqual(current_state.section_scores[0], current_state.sections[0].get_score())
+
+    def test_refresh_scores(self):
+        current_state = RollAndRakeState()
+        current_state.sections[1].tick_list[:3] = [4, 6, 0]
+        current_state.refresh_scores()
+
+        self.assertEqual(current_state.get_current_score(), 10)
+
+    def test_observation_copy_and_view(self):
+        current_state = RollAndRakeState()
+        observation = current_state.to_observation()
+        observation_view = current_state.to_observation(copy=False)
+
+        self.assertEqual(observation.dtype, np.float32)
+        self.assertFalse(observation_view.flags.writeable)
+        np.testing.assert_array_equal(observation, observation_view)
+
+        current_state.step(with_env_action_index=GameMove["Pass"].value)
+        current_state.to_observation(copy=False)
+
+        self.assertEqual(current_state.to_observation()[:6 * 7].sum(), 6)
+        self.assertFalse(np.shares_memory(observation, observation_view))
+
+    def test_snapshot_restore(self):
+        current_state = RollAndRakeState()
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4),
+        ]
+        snapshot = current_state.snapshot()
+        observation = current_state.to_observation()
+
+        current_state.step(with_env_action_index=GameMove["T123"].value)
+        current_state.step(with_env_action_index=GameMove["HarvickCategory"].value)
+        current_state.restore(snapshot)
+
+        self.assertEqual(current_state.get_current_score(), 0)
+        self.assertEqual(current_state.sections[0].tick_list.sum(), 0)
+        self.assertEqual(current_state.available_dice[0], Die(Color.Orange, 1))
+        np.testing.assert_array_equal(current_state.to_observation(), observation)
+
+    def play_random_moves(self, current_state, random_generator, moves_number=40):
+        dice = []
+        for _ in range(moves_number):
+            if current_state.is_done:
+                break
+            current_state.step(with_env_action_index=int(random_generator.choice(current_state.get_legal_env_actions_indices())))
+            dice.append(current_state.dice.get_key())
+        return dice
+
+    def test_snapshot_restore_dice_state(self):
+        for state_class in [RollAndRakeState, V2RollAndRakeState]:
+            current_state = state_class()
+            current_state.reset(seed=21)
+            snapshot = current_state.snapshot(include_dice_state=True)
+            sheet_snapshot = current_state.snapshot()
+            dice = self.play_random_moves(current_state, np.random.default_rng(1))
+
+            # the same moves after a restore roll the same dice
+            current_state.restore(snapshot)
+            self.assertEqual(self.play_random_moves(current_state, np.random.default_rng(1)), dice)
+
+            # without the dice state the dice source goes on with its stream
+            current_state.restore(sheet_snapshot)
+            self.assertIsNone(sheet_snapshot.random_state)
+            self.assertNotEqual(self.play_random_moves(current_state, np.random.default_rng(1)), dice)
+
+    def test_clone(self):
+        current_state = RollAndRakeState()
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4),
+        ]
+        cloned_state = current_state.clone()
+
+        cloned_state.step(with_env_action_index=GameMove["T123"].value)
+        cloned_state.step(with_env_action_index=GameMove["HarvickCategory"].value)
+
+        self.assertEqual(cloned_state.get_current_score(), 4)
+        self.assertEqual(current_state.get_current_score(), 0)
+        self.assertEqual(current_state.sections[0].tick_list.sum(), 0)
+        self.assertIs(cloned_state.sections[0].accepted_dice_codes, current_state.sections[0].accepted_dice_codes)
+        self.assertTrue(current_state.is_action_legal(env_action_index=GameMove["T123"].value))
+
+    def test_zobrist_hash(self):
+        current_state = RollAndRakeState()
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4),
+        ]
+        snapshot = current_state.snapshot()
+        zobrist_hash = current_state.get_zobrist_hash()
+
+        current_state.step(with_env_action_index=GameMove["T123"].value)
+        self.assertNotEqual(current_state.get_zobrist_hash(), zobrist_hash)
+
+        current_state.step(with_env_action_index=GameMove["HarvickCategory"].value)
+        ticked_hash = current_state.get_zobrist_hash()
+
+        current_state.restore(snapshot)
+        self.assertEqual(current_state.get_zobrist_hash(), zobrist_hash)
+
+        cloned_state = current_state.clone()
+        cloned_state.step(with_env_action_index=GameMove["T123"].value)
+        cloned_state.step(with_env_action_index=GameMove["HarvickCategory"].value)
+        self.assertEqual(cloned_state.get_zobrist_hash(), ticked_hash)
+
+        cloned_state.refresh_scores()
+        self.assertEqual(cloned_state.get_zobrist_hash(), ticked_hash)
+
+    def test_enumerate_afterstates(self):
+        current_state = RollAndRakeState()
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4),
+        ]
+        afterstates = current_state.enumerate_afterstates()
+
+        self.assertIn((GameMove["T123"].value, GameMove["HarvickCategory"].value), afterstates.actions)
+        self.assertEqual(len(set(zip(afterstates.sheets, afterstates.values, [tuple(die.value for die in dice) for dice in afterstates.available_dice]))), len(afterstates.actions))
+
+        for actions, score_delta, sheet in zip(afterstates.actions, afterstates.score_deltas, afterstates.sheets):
+            cloned_state = current_state.clone()
+            self.assertEqual(sum(cloned_state.step(with_env_action_index=action) for action in actions), score_delta)
+            afterstate = cloned_state.enumerate_afterstates()
+            self.assertEqual(cloned_state.game_phase.name, "DiceChoice")
+            self.assertTrue(all(next_sheet & sheet == sheet for next_sheet in afterstate.sheets))
+
+    def test_step_unchecked(self):
+        current_state = RollAndRakeState()
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4),
+        ]
+        cloned_state = current_state.clone()
+
+        for action in [GameMove["T123"].value, GameMove["HarvickCategory"].value]:
+            self.assertEqual(cloned_state.step_unchecked(with_env_action_index=action), current_state.step(with_env_action_index=action))
+
+        self.assertEqual(cloned_state.get_current_score(), 4)
+        self.assertEqual(cloned_state.game_phase, current_state.game_phase)
+        np.testing.assert_array_equal(cloned_state.to_observation(), current_state.to_observation())
+
+    def test_v2_step_unchecked_uses_current_category_moves(self):
+        current_state = V2RollAndRakeState()
+        current_state.reset(seed=9)
+        random_generator = np.random.default_rng(9)
+
+        while not current_state.is_done:
+            action = int(random_generator.choice(current_state.get_legal_env_actions_indices()))
+            self.assertTrue(current_state._are_category_moves_current())
+            checked_state = current_state.clone()
+            self.assertEqual(current_state.step_unchecked(with_env_action_index=action), checked_state.step(with_env_action_index=action))
+            self.assertEqual(current_state.get_current_score(), checked_state.get_current_score())
+            # the roll and the tick of the step outdate the category moves
+            self.assertFalse(current_state._are_category_moves_current())
+
+    def test_v2_step_unchecked_after_changing_dice_in_place(self):
+        current_state = V2RollAndRakeState()
+        current_state.available_dice = [
+            Die(Color.Orange, 1),
+            Die(Color.Orange, 2),
+            Die(Color.Orange, 3),
+            Die(Color.Brown, 4),
+            Die(Color.Brown, 4),
+            Die(Color.Green, 4),
+        ]
+        current_state.get_legal_actions_mask()
+
+        for change_dice in [lambda dice: dice.__setitem__(3, Die(Color.Brown, 6)), lambda dice: dice.set_values([2, 2, 2, 6, 6, 4])]:
+            change_dice(current_state.available_dice)
+            self.assertFalse(current_state._are_category_moves_current())
+            # the clones share the outdated category moves, step_unchecked must not use them
+            for action in current_state.clone().get_legal_env_actions_indices():
+                unchecked_state = current_state.clone()
+                checked_state = current_state.clone()
+                self.assertEqual(unchecked_state.step_unchecked(with_env_action_index=action), checked_state.step(with_env_action_index=action))
+                self.assertEqual([section.tick_list.tolist() for section in unchecked_state.sections], [section.tick_list.tolist() for section in checked_state.sections])
+
+    def test_sections_kinds(self):
+        current_state = RollAndRakeState()
+
+        # the metadata classes come from the top-level model modules, their kinds still match
+        self.assertEqual([section.kind for section in current_state.sections], [section_metadata.kind for section_metadata in get_sections_metadata()])
+        self.assertTrue(all(isinstance(section, ContinuosSection) == (section.kind == CONTINUOS_SECTION) for section in current_state.sections))
+        self.assertEqual([section.stores_die_values for section in current_state.sections], [section_metadata.dice_to_tick_converter.name == "EachValuePerDie" for section_metadata in get_sections_metadata()])
@@ -0,0 +1,28 @@
+import unittest
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.common.row_geometry import RowGeometry, get_row_geometry
+
+class RowGeometryTest(unittest.TestCase):
+
+    def test_row_geometry(self):
+        row_geometry = RowGeometry([3, 4, 2], 2)
+
+        self.assertEqual(row_geometry.row_starts, (0, 3, 7))
+        self.assertEqual(row_geometry.row_ends, (3, 7, 9))
+        self.assertEqual(row_geometry.cells_number, 9)
+        self.assertEqual(row_geometry.full_cell, 8)
+        np.testing.assert_array_equal(row_geometry.cell_rows, [0, 0, 0, 1, 1, 1, 1, 2, 2])
+
+    def test_row_geometry_is_shared(self):
+        self.assertIs(get_row_geometry([3, 3, 3], 3), get_row_geometry((3, 3, 3), 3))
+        self.assertIsNone(get_row_geometry([3, 3, 3]).full_cell)
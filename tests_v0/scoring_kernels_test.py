@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+
+class ScoringKernelsTest(unittest.TestCase):
+
+    def get_random_tick_lists(self, section, sheets_number=200):
+        random_generator = np.random.default_rng(3)
+        return random_generator.choice([0, 0, 1, 2, 3, 4, 5, 6, 9], size=(sheets_number, len(section.tick_list))).astype(float)
+
+    def get_scoring_type_score(self, section, tick_list):
+        if section.scoring_type.name == "HighestRowSum":
+            return section.scoring_type.value(tick_list, section.row_lengths, row_geometry=section.row_geometry)
+        return section.scoring_type.value(tick_list, section.bonuses)
+
+    def test_same_scores_as_scoring_types(self):
+        for section in RollAndRakeState().sections:
+            for tick_list in self.get_random_tick_lists(section):
+                section.tick_list = tick_list
+                self.assertEqual(section.get_score(), self.get_scoring_type_score(section, tick_list))
+
+    def test_batched_scores(self):
+        for section in RollAndRakeState().sections:
+            tick_lists = self.get_random_tick_lists(section)
+            expected_scores = [self.get_scoring_type_score(section, tick_list) for tick_list in tick_lists]
+            np.testing.assert_array_equal(section.get_scores(tick_lists), expected_scores)
@@ -0,0 +1,74 @@
+import unittest
+import tempfile
+import numpy as np
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.common.section_value_tables import SectionValueTable, get_metadata_hash, get_roll_outcomes, get_section_value_tables
+from roll_and_rake.envs.model_v0.classes import Die
+from roll_and_rake.envs.model_v0.enums import Color
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+from roll_and_rake.envs.model_v2.classes import Die as V2Die
+from roll_and_rake.envs.model_v2.enums import Color as V2Color
+
+def _make_die(color_name, value):
+    return Die(Color[color_name], value)
+
+class SectionValueTableTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.roll_outcomes = get_roll_outcomes()
+        cls.sections = RollAndRakeState().sections
+
+    def test_roll_outcomes(self):
+        self.assertEqual(len(self.roll_outcomes), 56 * 21 * 6)
+        self.assertAlmostEqual(sum(probability for _, probability in self.roll_outcomes), 1)
+
+    def test_harvick_table(self):
+        harvick_section = self.sections[0]
+        section_value_table = SectionValueTable.build(harvick_section, roll_outcomes=self.roll_outcomes, die_factory=_make_die, max_turns=4)
+
+        # one more row of three ticks after every consecutive orange roll
+        self.assertEqual(len(section_value_table.configurations), 5)
+        self.assertEqual(section_value_table.values[0, 0], harvick_section.get_score())
+        # a section can always leave a roll unused, more turns are never worth less
+        self.assertTrue(np.all(np.diff(section_value_table.values, axis=1) > -1e-9))
+        self.assertEqual(harvick_section.tick_list.sum(), 0)
+
+    def test_marginal_value(self):
+        newman_section = self.sections[3]
+        section_value_table = SectionValueTable.build(newman_section, roll_outcomes=self.roll_outcomes, die_factory=_make_die, max_turns=4)
+        next_tick_list = newman_section.tick_list.copy()
+        next_tick_list[2] = 9
+
+        self.assertGreater(section_value_table.get_marginal_value(newman_section.tick_list, next_tick_list, 4), 0)
+        self.assertEqual(section_value_table.get_value(newman_section.tick_list, 100), section_value_table.values[0, 4])
+
+    def test_cached_tables(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            section_value_tables = get_section_value_tables(self.sections[2:4], die_factory=_make_die, max_turns=4, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            cached_section_value_tables = get_section_value_tables(self.sections[2:4], die_factory=_make_die, max_turns=4, cache_dir=cache_dir)
+            # other sections get their own tables
+            other_section_value_tables = get_section_value_tables(self.sections[3:5], die_factory=_make_die, max_turns=4, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+        for section_value_table, cached_section_value_table in zip(section_value_tables, cached_section_value_tables):
+            np.testing.assert_array_equal(section_value_table.values, cached_section_value_table.values)
+        np.testing.assert_array_equal(other_section_value_tables[1].values, SectionValueTable.build(self.sections[4], roll_outcomes=self.roll_outcomes, die_factory=_make_die, max_turns=4).values)
+
+    def test_metadata_hash(self):
+        metadata_hash = get_metadata_hash(self.sections, die_factory=_make_die, max_turns=4)
+        self.assertEqual(metadata_hash, get_metadata_hash(RollAndRakeState().sections, die_factory=_make_die, max_turns=4))
+        self.assertNotEqual(metadata_hash, get_metadata_hash(self.sections[::-1], die_factory=_make_die, max_turns=4))
+        self.assertNotEqual(metadata_hash, get_metadata_hash(self.sections[1:], die_factory=_make_die, max_turns=4))
+        self.assertNotEqual(metadata_hash, get_metadata_hash(self.sections, die_factory=_make_die, max_turns=5))
+        self.assertNotEqual(metadata_hash, get_metadata_hash(self.sections, die_factory=lambda color_name, value: V2Die(V2Color[color_name], value), max_turns=4))
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from functools import reduce
+from operator import xor
+
+import os
+import sys
+
+parent_dir_path = os.path.abspath(os.path.join(
+                  os.path.dirname(__file__),
+                  os.pardir)
+)
+sys.path.append(parent_dir_path)
+
+from roll_and_rake.envs.common.zobrist import ZobristKeys, get_zobrist_keys
+from roll_and_rake.envs.model_v0.enums import Color
+from roll_and_rake.envs.model_v0.classes import Die
+from roll_and_rake.envs.model_v0.roll_and_rake_state import RollAndRakeState
+
+class ZobristKeysTest(unittest.TestCase):
+
+    def test_keys_are_stable(self):
+        zobrist_keys = ZobristKeys([3, 4], features_number=2)
+        other_zobrist_keys = ZobristKeys([3, 4], features_number=2)
+
+        self.assertEqual(zobrist_keys.dice_keys, other_zobrist_keys.dice_keys)
+        self.assertIs(get_zobrist_keys([3, 4], 2), get_zobrist_keys((3, 4), 2))
+
+    def test_empty_cells_hash(self):
+        zobrist_keys = ZobristKeys([3, 4], features_number=2)
+
+        self.assertEqual(zobrist_keys.get_cells_hash(1, np.zeros(4)), 0)
+        self.assertNotEqual(zobrist_keys.get_cells_hash(1, np.array([0, 9, 0, 0])), zobrist_keys.get_cells_hash(1, np.array([0, 0, 9, 0])))
+
+    def test_combination_hash_ignores_dice_order(self):
+        zobrist_keys = ZobristKeys([3, 4], features_number=2)
+        dice = [Die(Color.Orange, 2), Die(Color.Orange, 2), Die(Color.Brown, 5)]
+
+        self.assertEqual(zobrist_keys.get_combination_hash(dice), zobrist_keys.get_combination_hash(dice[::-1]))
+        self.assertNotEqual(zobrist_keys.get_combination_hash(dice), zobrist_keys.get_combination_hash(dice[1:]))
+
+    def test_ticks_hash(self):
+        zobrist_keys = ZobristKeys([3, 4], features_number=2)
+        tick_list = np.array([0, 9, 0, 0])
+        next_tick_list = np.array([0, 3, 4, 0])
+
+        ticks_hash = zobrist_keys.get_ticks_hash(1, [(1, 9), (2, 0)], next_tick_list)
+        self.assertEqual(zobrist_keys.get_cells_hash(1, tick_list) ^ ticks_hash, zobrist_keys.get_cells_hash(1, next_tick_list))
+
+    def test_incremental_sheet_hash(self):
+        current_state = RollAndRakeState()
+        current_state.reset(seed=11)
+        random_generator = np.random.default_rng(11)
+
+        while not current_state.is_done:
+            current_state.step(with_env_action_index=int(random_generator.choice(current_state.get_legal_env_actions_indices())))
+            sections_hashes = [current_state.zobrist_keys.get_cells_hash(index, section.tick_list) for index, section in enumerate(current_state.sections)]
+            self.assertEqual(current_state._sections_hashes, sections_hashes)
+            self.assertEqual(current_state._sheet_hash, reduce(xor, sections_hashes, 0))
@@ -8,7 +8,8 @@ import numpy as np
 import gym
 import tensorflow_probability as tfp
 
-env = gym.make("RollAndRake-v1")
+# the features and the legal actions mask as views over the game state buffer
+env = gym.make("RollAndRake-v1", dict_observation=True)
 
 class ActorModel(tf.keras.Model):
     def __init__(self, action_space):
@@ -43,8 +44,8 @@ class ActorModel(tf.keras.Model):
 # https://github.com/abhisheksuran/Reinforcement_Learning/blob/master/Reinforce_(PG)_ReUploaded.ipynb
 
 class Agent(object):
-    def __init__(self, state_space, action_space):
-        self.state_space = state_space
+    def __init__(self, features_space, action_space):
+        self.features_space = features_space
         self.action_space = action_space
 
         self._actor = ActorModel(action_space=action_space)
@@ -57,11 +58,8 @@ class Agent(object):
         self.gamma = 0.5
 
     def get_obs_legal_actions(self, observation):
-        obs = tf.slice(observation,[0], [self.state_space - self.action_space])
-        obs = tf.reshape(obs, shape=(1, self.state_space - self.action_space))
-        legal_actions = tf.slice(observation,[self.state_space - self.action_space], [self.action_space])
-        legal_actions = tf.reshape(legal_actions, shape=(1, self.action_space))
-        return obs, legal_actions
+        # batches of one observation
+        return observation["features"][np.newaxis], observation["action_mask"][np.newaxis]
 
     def mask_illegal_actions_from(self, probs, legal_actions_indices):
         probs = probs.numpy()[0]
@@ -72,7 +70,7 @@ class Agent(object):
     def act(self, state):
         obs, legal_actions = self.get_obs_legal_actions(state)
         probs = self._actor(obs, legal_actions)
-        legal_actions_indices = state[self.state_space-self.action_space:]
+        legal_actions_indices = state["action_mask"]
         mask_probs = self.mask_illegal_actions_from(probs, legal_actions_indices)
         # print("probs:")
         # print(probs)
@@ -99,7 +97,7 @@ class Agent(object):
         discounted_rewards.reverse()
 
         for state, reward, action in zip(states, discounted_rewards, actions):
-            obs, legal_actions = self.get_obs_legal_actions(state)
+            obs, legal_actions = map(tf.convert_to_tensor, self.get_obs_legal_actions(state))
             # print("fitting:")
             # print(f"reward {reward}")
             
@@ -119,7 +117,7 @@ class Agent(object):
     def save_model(self):
         self._actor.save_weights('actor_model_v1_zero_five.h5')
 
-agent = Agent(state_space=env.observation_space.shape[0], action_space=env.action_space.n)
+agent = Agent(features_space=env.observation_space["features"].shape[0], action_space=env.action_space.n)
 last_hundred_rewards = collections.deque(maxlen=10)
 
 for episode in range(1, 1_000_000 + 1):
@@ -136,9 +134,10 @@ for episode in range(1, 1_000_000 + 1):
     action = agent.act(state)
     if action not in env.legal_actions:
         action = int(np.random.choice(env.legal_actions, size=1))
+    # the observation views are rewritten by the step, the state is copied before it
+    states.append({name: values.copy() for name, values in state.items()})
     next_state, reward, done, _ = env.step(action)
     rewards.append(reward)
-    states.append(state)
     actions.append(action)
     state = next_state
     total_reward += reward